@@ -0,0 +1,383 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit
+
+# diretório compartilhado pelos scripts dos desafios; CACHE_HTTP_DIR sobrepõe
+DIRETORIO_PADRAO = os.getenv('CACHE_HTTP_DIR',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_http'))
+TTL_PADRAO = int(os.getenv('CACHE_HTTP_TTL', '300'))
+LIMITE_BYTES_PADRAO = int(os.getenv('CACHE_HTTP_LIMITE_MB', '256')) * 1024 * 1024
+
+# cabeçalhos guardados com a entrada: validação, paginação e tipo do conteúdo
+CABECALHOS_GUARDADOS = ('ETag', 'Last-Modified', 'Link', 'Content-Type', 'Cache-Control')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    chave TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    hash_conteudo TEXT NOT NULL,
+    cabecalhos TEXT NOT NULL,
+    expira_em REAL NOT NULL,
+    ultimo_acesso REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS objetos (
+    hash_conteudo TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entradas_acesso ON entradas (ultimo_acesso);
+"""
+
+
+def _diretivas(cache_control):
+    diretivas = {}
+    for parte in (cache_control or '').split(','):
+        nome, _, valor = parte.strip().partition('=')
+        if nome:
+            diretivas[nome.lower()] = valor.strip('"')
+    return diretivas
+
+
+def _links(cabecalho_link):
+    """Mesmo formato de requests.Response.links: {'next': {'url': ...}}"""
+    links = {}
+    for url, rel in re.findall(r'<([^>]*)>\s*;\s*rel="?([^",;]+)"?', cabecalho_link or ''):
+        links[rel] = {'url': url, 'rel': rel}
+    return links
+
+
+class RespostaCache:
+    """Resposta servida pelo CacheHTTP; `dados` decodifica o JSON uma única vez"""
+
+    def __init__(self, status, conteudo, cabecalhos, origem, url, decodificar=None):
+        self.status_code = status
+        self.conteudo = conteudo
+        self.headers = cabecalhos
+        # 'cache' (fresca, sem rede), 'revalidado' (304) ou 'rede'
+        self.origem = origem
+        self.url = url
+        self._decodificar = decodificar
+        self._dados = None
+        self._decodificado = False
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300 or self.status_code == 304
+
+    @property
+    def links(self):
+        return _links(self.headers.get('Link'))
+
+    @property
+    def dados(self):
+        if not self._decodificado:
+            if self._decodificar is not None:
+                self._dados = self._decodificar()
+            else:
+                self._dados = json.loads(self.conteudo) if self.conteudo.strip() else None
+            self._decodificado = True
+        return self._dados
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f'HTTP {self.status_code} em {self.url}')
+
+
+class CacheHTTP:
+    """Cache HTTP em disco para GETs de APIs JSON, compartilhado entre processos.
+
+    Os corpos ficam em `objetos/` endereçados pelo SHA-256 (respostas iguais de
+    URLs diferentes ocupam um arquivo só) e um índice SQLite guarda, por URL, o
+    hash, os cabeçalhos de validação e a validade. Respeita Cache-Control
+    (no-store, no-cache, max-age) e Expires; sem eles vale `ttl`. Entradas
+    vencidas são revalidadas com If-None-Match/If-Modified-Since e, acima de
+    `limite_bytes`, as menos usadas recentemente são removidas.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, ttl=TTL_PADRAO, limite_bytes=LIMITE_BYTES_PADRAO,
+                 ttl_minimo=0, decodificados_em_memoria=64):
+        self.diretorio = diretorio
+        self.ttl = ttl
+        # ttl_minimo > 0 estende respostas de vida curta (ex.: max-age=60) em desenvolvimento
+        self.ttl_minimo = ttl_minimo
+        self.limite_bytes = limite_bytes
+        self.contadores = {'acertos': 0, 'revalidados': 0, 'faltas': 0, 'nao_armazenaveis': 0,
+                           'bytes_rede': 0, 'bytes_cache': 0, 'despejos': 0}
+        self._decodificados = OrderedDict()
+        self._limite_decodificados = decodificados_em_memoria
+        self._trava = threading.Lock()
+
+        os.makedirs(os.path.join(diretorio, 'objetos'), exist_ok=True)
+        self._conexao = sqlite3.connect(os.path.join(diretorio, 'indice.sqlite'),
+                                        check_same_thread=False, timeout=30)
+        self._conexao.row_factory = sqlite3.Row
+        with self._trava, self._conexao:
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.executescript(ESQUEMA)
+
+    # chave ------------------------------------------------------------------
+
+    @staticmethod
+    def chave(url, cabecalhos=None):
+        """URL normalizada e, só se houver Authorization, um resumo do token.
+
+        Accept não entra: todos os scripts pedem o mesmo JSON, então dia_4 e
+        teste1 (que manda o Accept do GitHub) reaproveitam as mesmas entradas.
+        Tokens diferentes continuam em entradas separadas.
+        """
+        partes = urlsplit(url)
+        base = urlunsplit((partes.scheme.lower(), partes.netloc.lower(), partes.path or '/',
+                           partes.query, ''))
+        cabecalhos = {k.lower(): v for k, v in (cabecalhos or {}).items()}
+        if cabecalhos.get('authorization'):
+            base += '\n' + hashlib.sha256(cabecalhos['authorization'].encode()).hexdigest()[:16]
+        return hashlib.sha256(base.encode()).hexdigest()
+
+    def _contar(self, **valores):
+        # coletores em threads compartilham a mesma instância
+        with self._trava:
+            for nome, valor in valores.items():
+                self.contadores[nome] += valor
+
+    def _caminho_objeto(self, hash_conteudo):
+        return os.path.join(self.diretorio, 'objetos', hash_conteudo[:2], f'{hash_conteudo}.bin')
+
+    # leitura e gravação -------------------------------------------------------
+
+    def _buscar(self, chave):
+        with self._trava:
+            return self._conexao.execute('SELECT * FROM entradas WHERE chave = ?', (chave,)).fetchone()
+
+    def _ler_objeto(self, hash_conteudo):
+        try:
+            with open(self._caminho_objeto(hash_conteudo), 'rb') as arquivo:
+                return arquivo.read()
+        except OSError:
+            return None
+
+    def _validade(self, cabecalhos, agora):
+        diretivas = _diretivas(cabecalhos.get('Cache-Control'))
+        if 'no-store' in diretivas:
+            return None
+        if 'no-cache' in diretivas:
+            duracao = 0
+        elif diretivas.get('max-age', '').isdigit():
+            duracao = int(diretivas['max-age'])
+        elif cabecalhos.get('Expires'):
+            try:
+                duracao = parsedate_to_datetime(cabecalhos['Expires']).timestamp() - agora
+            except (TypeError, ValueError):
+                duracao = 0
+        else:
+            duracao = self.ttl
+        return agora + max(duracao, self.ttl_minimo)
+
+    def _gravar(self, chave, url, conteudo, cabecalhos, agora):
+        expira_em = self._validade(cabecalhos, agora)
+        if expira_em is None:
+            self._contar(nao_armazenaveis=1)
+            return None
+
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        caminho = self._caminho_objeto(hash_conteudo)
+        if not os.path.exists(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+
+        guardados = {k: cabecalhos[k] for k in CABECALHOS_GUARDADOS if cabecalhos.get(k)}
+        with self._trava, self._conexao:
+            self._conexao.execute(
+                'INSERT OR IGNORE INTO objetos (hash_conteudo, tamanho) VALUES (?, ?)',
+                (hash_conteudo, len(conteudo)))
+            self._conexao.execute(
+                'INSERT INTO entradas (chave, url, hash_conteudo, cabecalhos, expira_em, ultimo_acesso) '
+                'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (chave) DO UPDATE SET '
+                'hash_conteudo = excluded.hash_conteudo, cabecalhos = excluded.cabecalhos, '
+                'expira_em = excluded.expira_em, ultimo_acesso = excluded.ultimo_acesso',
+                (chave, url, hash_conteudo, json.dumps(guardados), expira_em, agora))
+        self._despejar()
+        return hash_conteudo
+
+    def _tocar(self, chave, agora, expira_em=None):
+        with self._trava, self._conexao:
+            if expira_em is None:
+                self._conexao.execute('UPDATE entradas SET ultimo_acesso = ? WHERE chave = ?',
+                                      (agora, chave))
+            else:
+                self._conexao.execute('UPDATE entradas SET ultimo_acesso = ?, expira_em = ? '
+                                      'WHERE chave = ?', (agora, expira_em, chave))
+
+    def _despejar(self):
+        """Remove as entradas menos usadas recentemente até o total caber em `limite_bytes`"""
+        with self._trava, self._conexao:
+            total = self._conexao.execute('SELECT COALESCE(SUM(tamanho), 0) FROM objetos').fetchone()[0]
+            if total <= self.limite_bytes:
+                return
+            candidatas = self._conexao.execute(
+                'SELECT chave, hash_conteudo FROM entradas ORDER BY ultimo_acesso').fetchall()
+            orfaos = []
+            for entrada in candidatas:
+                if total <= self.limite_bytes:
+                    break
+                self._conexao.execute('DELETE FROM entradas WHERE chave = ?', (entrada['chave'],))
+                self.contadores['despejos'] += 1
+                ainda_usado = self._conexao.execute(
+                    'SELECT 1 FROM entradas WHERE hash_conteudo = ? LIMIT 1',
+                    (entrada['hash_conteudo'],)).fetchone()
+                if ainda_usado is None:
+                    tamanho = self._conexao.execute(
+                        'SELECT tamanho FROM objetos WHERE hash_conteudo = ?',
+                        (entrada['hash_conteudo'],)).fetchone()
+                    self._conexao.execute('DELETE FROM objetos WHERE hash_conteudo = ?',
+                                          (entrada['hash_conteudo'],))
+                    total -= tamanho[0] if tamanho else 0
+                    orfaos.append(entrada['hash_conteudo'])
+        for hash_conteudo in orfaos:
+            try:
+                os.remove(self._caminho_objeto(hash_conteudo))
+            except OSError:
+                pass
+
+    def _resposta(self, status, conteudo, cabecalhos, origem, url, hash_conteudo):
+        if hash_conteudo is None:
+            return RespostaCache(status, conteudo, cabecalhos, origem, url)
+
+        def decodificar():
+            # o mesmo corpo (mesmo hash) é decodificado uma vez por processo
+            with self._trava:
+                if hash_conteudo in self._decodificados:
+                    self._decodificados.move_to_end(hash_conteudo)
+                    return self._decodificados[hash_conteudo]
+            dados = json.loads(conteudo) if conteudo.strip() else None
+            with self._trava:
+                self._decodificados[hash_conteudo] = dados
+                while len(self._decodificados) > self._limite_decodificados:
+                    self._decodificados.popitem(last=False)
+            return dados
+
+        return RespostaCache(status, conteudo, cabecalhos, origem, url, decodificar)
+
+    # fluxo de uma requisição --------------------------------------------------
+
+    def _preparar(self, url, cabecalhos):
+        """(chave, entrada, conteúdo em cache, resposta pronta se a entrada ainda vale)"""
+        chave = self.chave(url, cabecalhos)
+        entrada = self._buscar(chave)
+        if entrada is None:
+            return chave, None, None, None
+
+        conteudo = self._ler_objeto(entrada['hash_conteudo'])
+        if conteudo is None:
+            # objeto removido por outro processo: trata como falta
+            return chave, None, None, None
+
+        agora = time.time()
+        if entrada['expira_em'] > agora:
+            self._tocar(chave, agora)
+            self._contar(acertos=1, bytes_cache=len(conteudo))
+            resposta = self._resposta(200, conteudo, json.loads(entrada['cabecalhos']), 'cache',
+                                      url, entrada['hash_conteudo'])
+            return chave, entrada, conteudo, resposta
+        return chave, entrada, conteudo, None
+
+    @staticmethod
+    def _condicionais(entrada):
+        guardados = json.loads(entrada['cabecalhos']) if entrada is not None else {}
+        condicionais = {}
+        if guardados.get('ETag'):
+            condicionais['If-None-Match'] = guardados['ETag']
+        if guardados.get('Last-Modified'):
+            condicionais['If-Modified-Since'] = guardados['Last-Modified']
+        return condicionais
+
+    def _concluir(self, chave, entrada, conteudo_cache, url, status, conteudo, cabecalhos):
+        agora = time.time()
+        if status == 304 and entrada is not None:
+            guardados = json.loads(entrada['cabecalhos'])
+            guardados.update({k: cabecalhos[k] for k in CABECALHOS_GUARDADOS if cabecalhos.get(k)})
+            expira_em = self._validade(guardados, agora)
+            self._tocar(chave, agora, expira_em if expira_em is not None else agora)
+            self._contar(revalidados=1, bytes_cache=len(conteudo_cache))
+            return self._resposta(200, conteudo_cache, guardados, 'revalidado', url,
+                                  entrada['hash_conteudo'])
+
+        self._contar(faltas=1, bytes_rede=len(conteudo))
+        hash_conteudo = None
+        if status == 200:
+            hash_conteudo = self._gravar(chave, url, conteudo, cabecalhos, agora)
+        return self._resposta(status, conteudo, dict(cabecalhos), 'rede', url, hash_conteudo)
+
+    def obter(self, sessao, url, headers=None, timeout=10):
+        """GET via `sessao` (requests.Session ou o módulo requests) passando pelo cache"""
+        base = dict(getattr(sessao, 'headers', None) or {})
+        base.update(headers or {})
+        chave, entrada, conteudo_cache, pronta = self._preparar(url, base)
+        if pronta is not None:
+            return pronta
+
+        resposta = sessao.get(url, headers={**(headers or {}), **self._condicionais(entrada)},
+                              timeout=timeout)
+        return self._concluir(chave, entrada, conteudo_cache, url, resposta.status_code,
+                              resposta.content, resposta.headers)
+
+    async def obter_async(self, sessao, url, headers=None):
+        """Mesmo fluxo de `obter` para uma aiohttp.ClientSession"""
+        base = dict(getattr(sessao, 'headers', None) or {})
+        base.update(headers or {})
+        chave, entrada, conteudo_cache, pronta = self._preparar(url, base)
+        if pronta is not None:
+            return pronta
+
+        async with sessao.get(url, headers={**(headers or {}), **self._condicionais(entrada)}) as resposta:
+            conteudo = await resposta.read()
+            return self._concluir(chave, entrada, conteudo_cache, url, resposta.status,
+                                  conteudo, resposta.headers)
+
+    # manutenção --------------------------------------------------------------
+
+    def estatisticas(self):
+        with self._trava:
+            entradas, tamanho = self._conexao.execute(
+                'SELECT (SELECT COUNT(*) FROM entradas), (SELECT COALESCE(SUM(tamanho), 0) FROM objetos)'
+            ).fetchone()
+        consultas = self.contadores['acertos'] + self.contadores['revalidados'] + self.contadores['faltas']
+        taxa = (self.contadores['acertos'] + self.contadores['revalidados']) / consultas if consultas else 0.0
+        return {**self.contadores, 'taxa_acerto': round(taxa, 3), 'entradas': entradas,
+                'bytes_em_disco': tamanho}
+
+    def resumo(self):
+        e = self.estatisticas()
+        return (f"cache HTTP: {e['acertos']} acertos, {e['revalidados']} revalidados (304), "
+                f"{e['faltas']} faltas | {e['bytes_rede']} bytes da rede, {e['bytes_cache']} do cache | "
+                f"{e['entradas']} entradas, {e['bytes_em_disco']} bytes em disco")
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+
+def adicionar_argumentos(parser):
+    """Opções de cache comuns aos scripts que usam o CacheHTTP"""
+    parser.add_argument('--cache-dir', default=DIRETORIO_PADRAO, help='diretório do cache HTTP')
+    parser.add_argument('--cache-ttl', type=int, default=TTL_PADRAO,
+                        help='validade (s) de respostas sem Cache-Control/Expires')
+    parser.add_argument('--cache-ttl-minimo', type=int, default=0,
+                        help='validade mínima (s), acima do max-age do servidor, para desenvolvimento')
+    parser.add_argument('--cache-limite-mb', type=int, default=LIMITE_BYTES_PADRAO // (1024 * 1024))
+    parser.add_argument('--sem-cache', action='store_true', help='desativa o cache HTTP')
+
+
+def cache_dos_argumentos(args):
+    if args.sem_cache:
+        return None
+    return CacheHTTP(args.cache_dir, args.cache_ttl, args.cache_limite_mb * 1024 * 1024,
+                     args.cache_ttl_minimo)
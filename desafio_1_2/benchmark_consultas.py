@@ -0,0 +1,133 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from gerenciador_conexoes import obter_gerenciador, DB_HOMOLOGACAO
+
+TABELA_PLANA = 'jobs_ai_plano'
+
+# (consulta no layout antigo: heap sem índices e skills em TEXT, consulta no layout novo)
+CONSULTAS: Dict[str, Tuple[str, str]] = {
+    'skill_e_pais': (
+        f"SELECT count(*) FROM {TABELA_PLANA} "
+        "WHERE required_skills ILIKE %(padrao_skill)s AND company_location = %(pais)s",
+        "SELECT count(*) FROM jobs_ai j JOIN job_skills s USING (job_id) "
+        "WHERE s.skill = %(skill)s AND j.company_location = %(pais)s",
+    ),
+    'nivel_e_industria': (
+        f"SELECT avg(salary_usd) FROM {TABELA_PLANA} "
+        "WHERE experience_level = %(nivel)s AND industry = %(industria)s",
+        "SELECT avg(salary_usd) FROM jobs_ai "
+        "WHERE experience_level = %(nivel)s AND industry = %(industria)s",
+    ),
+    'mes_por_pais': (
+        f"SELECT company_location, count(*) FROM {TABELA_PLANA} "
+        "WHERE posting_date >= %(inicio)s AND posting_date < %(fim)s GROUP BY 1",
+        "SELECT company_location, count(*) FROM jobs_ai "
+        "WHERE posting_date >= %(inicio)s AND posting_date < %(fim)s GROUP BY 1",
+    ),
+}
+
+def preparar_tabela_plana(cursor, recriar: bool = False) -> None:
+    """Cópia de jobs_ai no layout anterior (heap sem índices), usada como linha de base"""
+    if recriar:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABELA_PLANA}")
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABELA_PLANA} AS SELECT * FROM jobs_ai")
+    cursor.execute(f"ANALYZE {TABELA_PLANA}")
+    cursor.execute("ANALYZE jobs_ai")
+    cursor.execute("ANALYZE job_skills")
+
+def medir_consulta(cursor, consulta: str, parametros: Dict[str, Any],
+                   repeticoes: int) -> Dict[str, float]:
+    # a primeira execução aquece cache e plano e fica de fora
+    cursor.execute(consulta, parametros)
+    cursor.fetchall()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        cursor.execute(consulta, parametros)
+        cursor.fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    tempos.sort()
+    return {
+        'mediana_ms': round(statistics.median(tempos), 3),
+        'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 3),
+    }
+
+def executar_benchmark(banco: str, parametros: Dict[str, Any], repeticoes: int = 20,
+                       recriar_plana: bool = False) -> Dict[str, Any]:
+    # CREATE TABLE ... AS e ANALYZE precisam persistir depois que a conexão volta ao pool
+    conexao = obter_gerenciador().conexao_bruta(banco, autocommit=True)
+    try:
+        with conexao.cursor() as cursor:
+            preparar_tabela_plana(cursor, recriar_plana)
+            resultados = {}
+            for nome, (antes, depois) in CONSULTAS.items():
+                resultados[nome] = {
+                    'antes': medir_consulta(cursor, antes, parametros, repeticoes),
+                    'depois': medir_consulta(cursor, depois, parametros, repeticoes),
+                }
+    finally:
+        conexao.close()
+
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'banco': banco,
+        'repeticoes': repeticoes,
+        'parametros': {k: str(v) for k, v in parametros.items()},
+        'resultados': resultados,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compara consultas analíticas em jobs_ai antes e depois de partições e índices")
+    parser.add_argument('--banco', default=DB_HOMOLOGACAO,
+                        help="banco onde jobs_ai já foi carregada (padrão: o provisionado pelo dbcreate)")
+    parser.add_argument('--skill', default='pytorch')
+    parser.add_argument('--pais', default='canada')
+    parser.add_argument('--nivel', default='se')
+    parser.add_argument('--industria', default='technology')
+    parser.add_argument('--mes', default='2024-10', help="mês no formato AAAA-MM")
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--recriar-plana', action='store_true',
+                        help=f"recria {TABELA_PLANA} a partir do conteúdo atual de jobs_ai")
+    parser.add_argument('--saida', help="arquivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    inicio = date.fromisoformat(f"{args.mes}-01")
+    fim = inicio.replace(year=inicio.year + 1, month=1) if inicio.month == 12 \
+        else inicio.replace(month=inicio.month + 1)
+    parametros = {
+        'skill': args.skill.lower(),
+        'padrao_skill': f"%{args.skill}%",
+        'pais': args.pais.lower(),
+        'nivel': args.nivel.lower(),
+        'industria': args.industria.lower(),
+        'inicio': inicio,
+        'fim': fim,
+    }
+
+    relatorio = executar_benchmark(args.banco, parametros, args.repeticoes, args.recriar_plana)
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False),
+                                    encoding='utf-8')
+        print(f"Resultados salvos em {args.saida}")
+
+    print(f"{'consulta':<20} {'antes (mediana)':>16} {'depois (mediana)':>17} {'ganho':>8}")
+    for nome, medidas in relatorio['resultados'].items():
+        antes = medidas['antes']['mediana_ms']
+        depois = medidas['depois']['mediana_ms']
+        ganho = antes / depois if depois > 0 else float('inf')
+        print(f"{nome:<20} {antes:>13.2f} ms {depois:>14.2f} ms {ganho:>7.1f}x")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from dia2 import configurar_logging, ExtractorCSV, TransformadorDados, ConectorBancoDados
+from instrumentacao import resetar_pico_rss, pico_rss_mb
+
+COLUNAS_DATASET = [
+    'job_id', 'job_title', 'salary_usd', 'salary_currency', 'experience_level',
+    'employment_type', 'company_location', 'company_size', 'employee_residence',
+    'remote_ratio', 'required_skills', 'education_required', 'years_experience',
+    'industry', 'posting_date', 'application_deadline', 'job_description_length',
+    'benefits_score', 'company_name'
+]
+
+VOCABULARIO = {
+    'job_title': ['AI Research Scientist', 'AI Software Engineer', 'AI Specialist', 'NLP Engineer',
+                  'AI Consultant', 'AI Architect', 'Principal Data Scientist', 'Data Analyst',
+                  'Autonomous Systems Engineer', 'AI Product Manager', 'Machine Learning Engineer',
+                  'Head of AI', 'Data Engineer', 'Robotics Engineer', 'Computer Vision Engineer',
+                  'Deep Learning Engineer', 'ML Ops Engineer', 'Research Scientist',
+                  'Machine Learning Researcher', 'Data Scientist'],
+    'salary_currency': ['USD', 'EUR', 'GBP'],
+    'experience_level': ['EN', 'MI', 'SE', 'EX'],
+    'employment_type': ['FT', 'PT', 'CT', 'FL'],
+    'company_location': ['Australia', 'Austria', 'Canada', 'China', 'Denmark', 'Finland', 'France',
+                         'Germany', 'India', 'Ireland', 'Israel', 'Japan', 'Netherlands', 'Norway',
+                         'Singapore', 'South Korea', 'Sweden', 'Switzerland', 'United Kingdom',
+                         'United States'],
+    'company_size': ['S', 'M', 'L'],
+    'education_required': ['Associate', 'Bachelor', 'Master', 'PhD'],
+    'industry': ['Automotive', 'Consulting', 'Education', 'Energy', 'Finance', 'Gaming',
+                 'Government', 'Healthcare', 'Manufacturing', 'Media', 'Real Estate', 'Retail',
+                 'Technology', 'Telecommunications', 'Transportation'],
+    'company_name': ['Smart Analytics', 'TechCorp Inc', 'Autonomous Tech', 'Future Systems',
+                     'Advanced Robotics', 'Neural Networks Co', 'DataVision Ltd', 'Cloud AI Solutions',
+                     'Quantum Labs', 'Predictive Systems', 'AI Innovations', 'Algorithmic Solutions',
+                     'Cognitive Computing', 'Digital Transformation LLC', 'Machine Intelligence Group',
+                     'DeepTech Ventures'],
+}
+
+SKILLS = ['Python', 'SQL', 'TensorFlow', 'PyTorch', 'Kubernetes', 'Docker', 'AWS', 'Azure', 'GCP',
+          'Linux', 'NLP', 'Deep Learning', 'Mathematics', 'Statistics', 'Tableau', 'Spark',
+          'Hadoop', 'Scala', 'R', 'Java', 'Git', 'MLOps', 'Computer Vision', 'Data Visualization']
+
+ESCALAS_PADRAO = [10_000, 100_000, 1_000_000, 10_000_000]
+
+def gerar_dataset(caminho: str, linhas: int, semente: int = 42, tamanho_lote: int = 200_000,
+                  fracao_duplicadas: float = 0.01) -> str:
+    """Gera um CSV sintético com o mesmo esquema de 19 colunas do ai_job_dataset.csv.
+
+    As linhas são escritas em lotes, então a memória não cresce com a escala.
+    Uma fração de cada lote é repetida para exercitar a remoção de duplicatas.
+    """
+    rng = np.random.default_rng(semente)
+    Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+    inicio_datas = np.datetime64('2024-01-01')
+
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        escritos = 0
+        while escritos < linhas:
+            n = min(tamanho_lote, linhas - escritos)
+            ids = np.arange(escritos + 1, escritos + n + 1)
+
+            lote = {'job_id': [f"AI{i:05d}" for i in ids]}
+            for col, valores in VOCABULARIO.items():
+                lote[col] = np.asarray(valores)[rng.integers(0, len(valores), n)]
+            lote['employee_residence'] = np.asarray(VOCABULARIO['company_location'])[
+                rng.integers(0, len(VOCABULARIO['company_location']), n)]
+            lote['salary_usd'] = rng.integers(32_000, 400_000, n)
+            lote['remote_ratio'] = rng.choice([0, 50, 100], n)
+            lote['years_experience'] = rng.integers(0, 20, n)
+            lote['job_description_length'] = rng.integers(500, 2500, n)
+            lote['benefits_score'] = np.round(rng.uniform(5, 10, n), 1)
+
+            postagem = inicio_datas + rng.integers(0, 485, n).astype('timedelta64[D]')
+            lote['posting_date'] = postagem.astype(str)
+            lote['application_deadline'] = (postagem + rng.integers(14, 90, n).astype('timedelta64[D]')).astype(str)
+
+            qtd_skills = rng.integers(3, 6, n)
+            skills = np.asarray(SKILLS)[rng.integers(0, len(SKILLS), (n, 5))]
+            lote['required_skills'] = [', '.join(linha[:k]) for linha, k in zip(skills, qtd_skills)]
+
+            df = pd.DataFrame(lote)[COLUNAS_DATASET]
+            duplicadas = int(n * fracao_duplicadas)
+            if duplicadas > 0:
+                df = pd.concat([df.iloc[:n - duplicadas], df.iloc[:duplicadas]])
+
+            df.to_csv(arquivo, index=False, header=escritos == 0)
+            escritos += n
+
+    return caminho
+
+def medir(funcao, linhas: int):
+    """Executa `funcao()` e devolve (resultado, métricas de tempo, memória e vazão)"""
+    resetar_pico_rss()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    metricas = {
+        'tempo_s': round(duracao, 6),
+        'pico_rss_mb': pico_rss_mb(),
+        'linhas': linhas,
+        'linhas_por_s': round(linhas / duracao, 1) if duracao > 0 else None,
+    }
+    return resultado, metricas
+
+class BenchmarkETL:
+
+    ETAPAS_TRANSFORMACAO = ['_tratar_valores_nulos', '_remover_duplicatas',
+                            '_padronizar_dados', '_validar_dados_finais']
+
+    def __init__(self, logger: logging.Logger, url_banco: Optional[str] = None,
+                 modo_carga: str = 'to_sql', tabela: str = 'ai_jobs_benchmark'):
+        self.logger = logger
+        self.url_banco = url_banco
+        self.modo_carga = modo_carga
+        self.tabela = tabela
+
+    def _criar_conector(self, diretorio: str) -> ConectorBancoDados:
+        conector = ConectorBancoDados(SimpleNamespace(logger=self.logger))
+        url = self.url_banco or f"sqlite:///{Path(diretorio) / 'benchmark.db'}"
+        conector.engine = create_engine(url)
+        return conector
+
+    def executar_escala(self, linhas: int, diretorio: str) -> Dict[str, Any]:
+        caminho_csv = os.path.join(diretorio, f"ai_jobs_{linhas}.csv")
+        self.logger.info(f"Gerando dataset sintético com {linhas} linhas")
+        gerar_dataset(caminho_csv, linhas)
+
+        resultados: Dict[str, Any] = {}
+        extractor = ExtractorCSV(self.logger)
+        transformador = TransformadorDados(self.logger)
+
+        df, resultados['extracao'] = medir(lambda: extractor.extrair_dados(caminho_csv), linhas)
+        if df is None:
+            raise RuntimeError(f"Extração falhou para {caminho_csv}")
+
+        for etapa in self.ETAPAS_TRANSFORMACAO:
+            linhas_entrada = len(df)
+            df, resultados[f"transformacao.{etapa}"] = medir(
+                lambda: getattr(transformador, etapa)(df), linhas_entrada)
+            if df is None:
+                raise RuntimeError(f"Etapa {etapa} devolveu None")
+
+        conector = self._criar_conector(diretorio)
+        try:
+            if self.modo_carga == 'copy':
+                carga = lambda: conector.carregar_dados_copy(df, 'jobs_ai')
+            else:
+                carga = lambda: conector.carregar_dados(df, self.tabela)
+            sucesso, resultados['carga'] = medir(carga, len(df))
+            if not sucesso:
+                raise RuntimeError("Carga falhou")
+        finally:
+            # engine próprio do benchmark, fora do pool compartilhado
+            conector.engine.dispose()
+            conector.desconectar()
+
+        return resultados
+
+    def executar(self, escalas: List[int]) -> Dict[str, Any]:
+        relatorio = {
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_atual(),
+            'python': sys.version.split()[0],
+            'pandas': pd.__version__,
+            'banco': self.url_banco or 'sqlite',
+            'resultados': {},
+        }
+        with tempfile.TemporaryDirectory(prefix='bench_etl_') as diretorio:
+            for linhas in escalas:
+                relatorio['resultados'][str(linhas)] = self.executar_escala(linhas, diretorio)
+                for arquivo in Path(diretorio).glob('*.csv'):
+                    arquivo.unlink()
+        return relatorio
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar_resultados(atual: Dict[str, Any], referencia: Dict[str, Any],
+                        limite_regressao: float, tempo_minimo: float = 0.01) -> List[str]:
+    """Lista as etapas cujo tempo piorou mais que `limite_regressao` (0.10 = 10%).
+
+    Etapas abaixo de `tempo_minimo` segundos na referência são ignoradas, pois o ruído domina.
+    """
+    regressoes = []
+    for escala, etapas in atual['resultados'].items():
+        etapas_referencia = referencia.get('resultados', {}).get(escala, {})
+        for etapa, metricas in etapas.items():
+            base = etapas_referencia.get(etapa)
+            if not base or base['tempo_s'] < tempo_minimo:
+                continue
+            variacao = metricas['tempo_s'] / base['tempo_s'] - 1
+            if variacao > limite_regressao:
+                regressoes.append(f"{escala} linhas / {etapa}: {base['tempo_s']:.3f}s -> "
+                                  f"{metricas['tempo_s']:.3f}s (+{variacao:.0%})")
+    return regressoes
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do ETL de vagas de IA")
+    parser.add_argument('--linhas', type=int, nargs='+', default=ESCALAS_PADRAO[:2],
+                        help="escalas a medir (padrão: 10000 100000)")
+    parser.add_argument('--saida', default='bench_etl.json', help="arquivo JSON de resultados")
+    parser.add_argument('--referencia', help="JSON de uma execução anterior para comparação")
+    parser.add_argument('--limite-regressao', type=float, default=0.10,
+                        help="piora relativa máxima aceita por etapa (padrão: 0.10)")
+    parser.add_argument('--url-banco', help="URL SQLAlchemy do banco (padrão: SQLite temporário)")
+    parser.add_argument('--modo-carga', choices=['to_sql', 'copy'], default='to_sql',
+                        help="'copy' exige PostgreSQL com a tabela jobs_ai criada")
+    args = parser.parse_args(argv)
+
+    logger = configurar_logging("WARNING")
+    relatorio = BenchmarkETL(logger, args.url_banco, args.modo_carga).executar(args.linhas)
+
+    Path(args.saida).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"Resultados salvos em {args.saida}")
+
+    for escala, etapas in relatorio['resultados'].items():
+        print(f"\n{escala} linhas")
+        for etapa, metricas in etapas.items():
+            print(f"  {etapa:<40} {metricas['tempo_s']:>9.3f}s  "
+                  f"{metricas['linhas_por_s'] or 0:>12,.0f} linhas/s  "
+                  f"pico {metricas['pico_rss_mb'] or 0:>8.1f} MB")
+
+    if args.referencia:
+        referencia = json.loads(Path(args.referencia).read_text(encoding='utf-8'))
+        regressoes = comparar_resultados(relatorio, referencia, args.limite_regressao)
+        if regressoes:
+            print("\nRegressões acima do limite:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            return 1
+        print("\nNenhuma regressão acima do limite")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional, List, Iterator, Dict
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+class CacheColunar:
+    """Snapshot Arrow IPC (memory-mapped) do CSV extraído.
+
+    A chave é tamanho + mtime do arquivo de origem; se só o mtime mudou, o hash
+    de conteúdo decide se o snapshot continua válido, sem reparsear o CSV.
+    """
+
+    TAMANHO_BLOCO_HASH = 1024 * 1024
+
+    def __init__(self, diretorio: str, logger: logging.Logger):
+        self.diretorio = Path(diretorio)
+        self.logger = logger
+
+    @staticmethod
+    def disponivel() -> bool:
+        return pa is not None
+
+    def _caminhos(self, caminho_csv: str) -> tuple:
+        caminho_absoluto = str(Path(caminho_csv).resolve())
+        sufixo = hashlib.blake2b(caminho_absoluto.encode('utf-8'), digest_size=8).hexdigest()
+        base = f"{Path(caminho_csv).stem}.{sufixo}"
+        return self.diretorio / f"{base}.arrow", self.diretorio / f"{base}.json"
+
+    def _hash_conteudo(self, caminho_csv: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(caminho_csv, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(self.TAMANHO_BLOCO_HASH), b''):
+                digest.update(bloco)
+        return digest.hexdigest()
+
+    def _ler_manifesto(self, caminho_manifesto: Path) -> Optional[dict]:
+        try:
+            return json.loads(caminho_manifesto.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def _snapshot_valido(self, caminho_csv: str, caminho_snapshot: Path,
+                         caminho_manifesto: Path) -> bool:
+        manifesto = self._ler_manifesto(caminho_manifesto)
+        if manifesto is None or not caminho_snapshot.exists():
+            return False
+
+        estado = os.stat(caminho_csv)
+        if manifesto['tamanho'] != estado.st_size:
+            return False
+        if manifesto['mtime_ns'] == estado.st_mtime_ns:
+            return True
+
+        # arquivo tocado mas possivelmente igual: confere o conteúdo antes de descartar
+        if manifesto['hash_conteudo'] != self._hash_conteudo(caminho_csv):
+            return False
+
+        manifesto['mtime_ns'] = estado.st_mtime_ns
+        caminho_manifesto.write_text(json.dumps(manifesto), encoding='utf-8')
+        return True
+
+    def _abrir_tabela(self, caminho_csv: str, colunas: Optional[List[str]] = None):
+        """Tabela Arrow do snapshot, mapeada em memória, ou None se ele não vale mais"""
+        if not self.disponivel():
+            return None
+
+        caminho_snapshot, caminho_manifesto = self._caminhos(caminho_csv)
+        try:
+            if not self._snapshot_valido(caminho_csv, caminho_snapshot, caminho_manifesto):
+                self.logger.info("Cache colunar ausente ou desatualizado")
+                return None
+
+            # read_all sobre o memory_map não copia os buffers: as fatias apontam para o arquivo
+            tabela = pa.ipc.open_file(pa.memory_map(str(caminho_snapshot), 'r')).read_all()
+            if colunas is not None:
+                tabela = tabela.select([c for c in colunas if c in tabela.column_names])
+            return tabela
+
+        except Exception as e:
+            self.logger.warning(f"Não foi possível ler o cache colunar {caminho_snapshot}: {e}")
+            return None
+
+    @staticmethod
+    def _como_categorias(df: pd.DataFrame, categorias: Optional[List[str]]) -> pd.DataFrame:
+        # snapshots gravados em chunks guardam as categorias como texto
+        ajustes = {c: df[c].astype('category') for c in categorias or []
+                   if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)}
+        return df.assign(**ajustes) if ajustes else df
+
+    def carregar(self, caminho_csv: str,
+                 categorias: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Lê o snapshot inteiro se ele ainda corresponde ao CSV"""
+        tabela = self._abrir_tabela(caminho_csv)
+        if tabela is None:
+            return None
+
+        df = self._como_categorias(tabela.to_pandas(), categorias)
+        self.logger.info(f"Dados carregados do cache colunar: {df.shape[0]} linhas, "
+                       f"{df.shape[1]} colunas")
+        return df
+
+    def carregar_em_chunks(self, caminho_csv: str, tamanho_chunk: int,
+                           colunas: Optional[List[str]] = None,
+                           categorias: Optional[List[str]] = None) -> Optional[Iterator[pd.DataFrame]]:
+        """Chunks do snapshot com os mesmos limites e índice de read_csv(chunksize=...).
+
+        Só as `colunas` pedidas são materializadas, uma fatia por vez; colunas em
+        `categorias` voltam como 'category', como na leitura do CSV. None se o
+        snapshot não vale para o arquivo atual.
+        """
+        tabela = self._abrir_tabela(caminho_csv, colunas)
+        if tabela is None:
+            return None
+
+        self.logger.info(f"Chunks servidos do cache colunar: {tabela.num_rows} linhas, "
+                       f"{tabela.num_columns} colunas")
+
+        def gerar() -> Iterator[pd.DataFrame]:
+            for inicio in range(0, tabela.num_rows, tamanho_chunk):
+                df = tabela.slice(inicio, tamanho_chunk).to_pandas()
+                df.index = pd.RangeIndex(inicio, inicio + len(df))
+                yield self._como_categorias(df, categorias)
+
+        return gerar()
+
+    def gravador(self, caminho_csv: str) -> Optional['GravadorSnapshot']:
+        """Grava o snapshot chunk a chunk durante uma leitura em streaming do CSV"""
+        if not self.disponivel():
+            return None
+        return GravadorSnapshot(self, caminho_csv)
+
+    def _publicar(self, caminho_csv: str, temporario: Path, estado: os.stat_result) -> None:
+        """Troca o snapshot e grava o manifesto com o estado do CSV lido"""
+        caminho_snapshot, caminho_manifesto = self._caminhos(caminho_csv)
+        os.replace(temporario, caminho_snapshot)
+        manifesto = {
+            'origem': str(Path(caminho_csv).resolve()),
+            'tamanho': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns,
+            'hash_conteudo': self._hash_conteudo(caminho_csv),
+        }
+        caminho_manifesto.write_text(json.dumps(manifesto), encoding='utf-8')
+        self.logger.info(f"Cache colunar gravado em {caminho_snapshot}")
+
+    def salvar(self, caminho_csv: str, df: pd.DataFrame) -> bool:
+        if not self.disponivel():
+            self.logger.warning("pyarrow não instalado, cache colunar desativado")
+            return False
+
+        caminho_snapshot, _ = self._caminhos(caminho_csv)
+        temporario = caminho_snapshot.with_name(caminho_snapshot.name + '.tmp')
+
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            estado = os.stat(caminho_csv)
+
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(str(temporario), 'wb') as destino:
+                with pa.ipc.new_file(destino, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+            self._publicar(caminho_csv, temporario, estado)
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gravar o cache colunar: {e}")
+            if temporario.exists():
+                temporario.unlink()
+            return False
+
+
+class GravadorSnapshot:
+    """Acumula os chunks de uma leitura em streaming num arquivo Arrow IPC temporário.
+
+    Categorias viram texto (cada chunk tem seu próprio dicionário). Se um chunk
+    não couber no esquema do primeiro (ex.: coluna inteira que ganha nulos), o
+    snapshot é abandonado e a leitura segue normalmente.
+    """
+
+    def __init__(self, cache: CacheColunar, caminho_csv: str):
+        self.cache = cache
+        self.caminho_csv = caminho_csv
+        self.estado = os.stat(caminho_csv)
+        caminho_snapshot, _ = cache._caminhos(caminho_csv)
+        self.temporario = caminho_snapshot.with_name(caminho_snapshot.name + '.tmp')
+        self._destino = None
+        self._escritor = None
+        self._esquema = None
+        self.ativo = True
+
+    def _tabela(self, chunk: pd.DataFrame):
+        categoricas: Dict[str, pd.Series] = {
+            c: chunk[c].astype(object) for c in chunk.columns
+            if isinstance(chunk[c].dtype, pd.CategoricalDtype)
+        }
+        df = chunk.assign(**categoricas) if categoricas else chunk
+        return pa.Table.from_pandas(df, schema=self._esquema, preserve_index=False)
+
+    def adicionar(self, chunk: pd.DataFrame) -> None:
+        if not self.ativo:
+            return
+        try:
+            tabela = self._tabela(chunk)
+            if self._escritor is None:
+                self.cache.diretorio.mkdir(parents=True, exist_ok=True)
+                self._esquema = tabela.schema
+                self._destino = pa.OSFile(str(self.temporario), 'wb')
+                self._escritor = pa.ipc.new_file(self._destino, self._esquema)
+            self._escritor.write_table(tabela)
+        except Exception as e:
+            self.cache.logger.warning(f"Cache colunar abandonado durante a leitura em chunks: {e}")
+            self.descartar()
+
+    def concluir(self) -> bool:
+        if not self.ativo or self._escritor is None:
+            self.descartar()
+            return False
+        try:
+            self._escritor.close()
+            self._destino.close()
+            if os.stat(self.caminho_csv).st_mtime_ns != self.estado.st_mtime_ns:
+                raise ValueError("o CSV mudou durante a leitura")
+            self.cache._publicar(self.caminho_csv, self.temporario, self.estado)
+            self.ativo = False
+            return True
+        except Exception as e:
+            self.cache.logger.warning(f"Não foi possível gravar o cache colunar: {e}")
+            self.descartar()
+            return False
+
+    def descartar(self) -> None:
+        self.ativo = False
+        for recurso in (self._escritor, self._destino):
+            try:
+                if recurso is not None:
+                    recurso.close()
+            except Exception:
+                pass
+        self._escritor = self._destino = None
+        if self.temporario.exists():
+            self.temporario.unlink()
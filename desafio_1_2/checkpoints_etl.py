@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id TEXT PRIMARY KEY,
+    arquivo TEXT NOT NULL,
+    tamanho_arquivo INTEGER NOT NULL,
+    modificado_ns INTEGER NOT NULL,
+    parametros TEXT NOT NULL,
+    status TEXT NOT NULL,
+    iniciada_em TEXT NOT NULL,
+    atualizada_em TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chunks (
+    execucao TEXT NOT NULL REFERENCES execucoes (id),
+    numero INTEGER NOT NULL,
+    estagio TEXT NOT NULL,
+    linhas_extraidas INTEGER,
+    hash_extraido TEXT,
+    linhas_transformadas INTEGER,
+    hash_transformado TEXT,
+    linhas_carregadas INTEGER,
+    atualizado_em TEXT NOT NULL,
+    PRIMARY KEY (execucao, numero)
+);
+"""
+
+# colunas de `chunks` preenchidas por cada estágio: (linhas, hash)
+COLUNAS_ESTAGIO = {
+    'extraido': ('linhas_extraidas', 'hash_extraido'),
+    'transformado': ('linhas_transformadas', 'hash_transformado'),
+    'carregado': ('linhas_carregadas', None),
+}
+
+def hash_chunk(df) -> Optional[str]:
+    """Hash do conteúdo do chunk, independente do índice e das categorias do DataFrame"""
+    if df is None:
+        return None
+    # pandas só aqui: o CLI consulta o registro antes de decidir se a execução é necessária
+    import pandas as pd
+
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+def _agora() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+class RegistroCheckpoints:
+    """Progresso das execuções do ETL por arquivo e chunk, num arquivo SQLite local.
+
+    Uma execução interrompida é retomada quando o arquivo de entrada (caminho,
+    tamanho e mtime) e os parâmetros que definem os chunks são os mesmos. Cada
+    chunk passa por 'extraido', 'transformado' e 'carregado', com contagem de
+    linhas e hash do conteúdo, para conferir que a nova leitura é a mesma.
+    """
+
+    def __init__(self, caminho: str, logger: logging.Logger):
+        self.caminho = caminho
+        self.logger = logger
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        # estágios do pipeline registram de threads diferentes
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        self._trava = threading.Lock()
+        with self._trava, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.executescript(ESQUEMA)
+
+    def _assinatura(self, arquivo: str, parametros: Dict[str, Any]) -> Tuple[str, int, int, str]:
+        caminho = str(Path(arquivo).resolve())
+        info = os.stat(caminho)
+        return caminho, info.st_size, info.st_mtime_ns, json.dumps(parametros, sort_keys=True, default=str)
+
+    def concluida_sem_mudancas(self, arquivo: str, parametros: Dict[str, Any]) -> bool:
+        """Se a última execução concluída já carregou este arquivo, inalterado, com os mesmos parâmetros"""
+        caminho, tamanho, modificado_ns, parametros_json = self._assinatura(arquivo, parametros)
+        with self._trava:
+            ultima = self._conexao.execute(
+                "SELECT tamanho_arquivo, modificado_ns, parametros FROM execucoes "
+                "WHERE arquivo = ? AND status = 'concluida' ORDER BY atualizada_em DESC LIMIT 1",
+                (caminho,)
+            ).fetchone()
+        return ultima is not None and tuple(ultima) == (tamanho, modificado_ns, parametros_json)
+
+    def iniciar_execucao(self, arquivo: str, parametros: Dict[str, Any]) -> Tuple[str, bool]:
+        """(id da execução, retomada); abandona execuções incompatíveis do mesmo arquivo"""
+        caminho, tamanho, modificado_ns, parametros_json = self._assinatura(arquivo, parametros)
+
+        with self._trava, self._conexao:
+            pendente = self._conexao.execute(
+                "SELECT id, tamanho_arquivo, modificado_ns, parametros FROM execucoes "
+                "WHERE arquivo = ? AND status = 'em_andamento' ORDER BY iniciada_em DESC LIMIT 1",
+                (caminho,)
+            ).fetchone()
+
+            if pendente is not None:
+                if (pendente['tamanho_arquivo'], pendente['modificado_ns'], pendente['parametros']) == \
+                        (tamanho, modificado_ns, parametros_json):
+                    self._conexao.execute("UPDATE execucoes SET atualizada_em = ? WHERE id = ?",
+                                          (_agora(), pendente['id']))
+                    return pendente['id'], True
+                self.logger.warning(f"Execução {pendente['id']} abandonada: arquivo ou parâmetros "
+                                    f"mudaram desde a interrupção")
+                self._conexao.execute("UPDATE execucoes SET status = 'abandonada', atualizada_em = ? "
+                                      "WHERE id = ?", (_agora(), pendente['id']))
+
+            execucao = uuid.uuid4().hex
+            self._conexao.execute(
+                "INSERT INTO execucoes (id, arquivo, tamanho_arquivo, modificado_ns, parametros, "
+                "status, iniciada_em, atualizada_em) VALUES (?, ?, ?, ?, ?, 'em_andamento', ?, ?)",
+                (execucao, caminho, tamanho, modificado_ns, parametros_json, _agora(), _agora())
+            )
+            return execucao, False
+
+    def chunks(self, execucao: str) -> Dict[int, Dict[str, Any]]:
+        with self._trava:
+            linhas = self._conexao.execute("SELECT * FROM chunks WHERE execucao = ?",
+                                           (execucao,)).fetchall()
+        return {linha['numero']: dict(linha) for linha in linhas}
+
+    def registrar(self, execucao: str, numero: int, estagio: str, linhas: int,
+                  hash_conteudo: Optional[str] = None) -> None:
+        coluna_linhas, coluna_hash = COLUNAS_ESTAGIO[estagio]
+        colunas = ['execucao', 'numero', 'estagio', 'atualizado_em', coluna_linhas]
+        valores = [execucao, numero, estagio, _agora(), linhas]
+        if coluna_hash is not None:
+            colunas.append(coluna_hash)
+            valores.append(hash_conteudo)
+        atualizacoes = ', '.join(f"{c} = excluded.{c}" for c in colunas[2:])
+
+        with self._trava, self._conexao:
+            self._conexao.execute(
+                f"INSERT INTO chunks ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))}) "
+                f"ON CONFLICT (execucao, numero) DO UPDATE SET {atualizacoes}",
+                valores
+            )
+
+    def concluir_execucao(self, execucao: str) -> None:
+        with self._trava, self._conexao:
+            self._conexao.execute("UPDATE execucoes SET status = 'concluida', atualizada_em = ? "
+                                  "WHERE id = ?", (_agora(), execucao))
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._conexao.close()
@@ -0,0 +1,215 @@
+import time
+
+INICIO = time.perf_counter()
+
+import argparse
+import csv
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+# tempo máximo do início do módulo até o despacho do subcomando; nada pesado é importado antes
+META_INICIALIZACAO_MS = float(os.getenv('META_INICIALIZACAO_MS', '50'))
+MODULOS_PESADOS = ('pandas', 'numpy', 'sqlalchemy', 'psycopg2', 'pyarrow')
+
+class TemposImportacao:
+    """Mede as importações feitas sob demanda por cada subcomando"""
+
+    def __init__(self):
+        self.modulos: Dict[str, float] = {}
+
+    def importar(self, nome: str):
+        inicio = time.perf_counter()
+        modulo = importlib.import_module(nome)
+        self.modulos.setdefault(nome, (time.perf_counter() - inicio) * 1000)
+        return modulo
+
+    def relatorio(self, inicializacao_ms: float) -> List[str]:
+        situacao = "OK" if inicializacao_ms <= META_INICIALIZACAO_MS else "ACIMA DA META"
+        linhas = [f"Inicialização do CLI: {inicializacao_ms:.1f} ms "
+                  f"(meta {META_INICIALIZACAO_MS:.0f} ms) {situacao}"]
+        for nome, ms in self.modulos.items():
+            linhas.append(f"  importação de {nome:<20} {ms:>9.1f} ms")
+        carregados = [m for m in MODULOS_PESADOS if m in sys.modules]
+        linhas.append(f"Dependências pesadas carregadas: {', '.join(carregados) or 'nenhuma'}")
+        return linhas
+
+def _aplicar_opcoes(args: argparse.Namespace) -> None:
+    # ConfiguracaoETL lê tudo do ambiente; as opções da linha de comando têm precedência
+    opcoes = {
+        'CAMINHO_CSV': args.csv,
+        'TAMANHO_CHUNK': args.chunk,
+        'MODO_CARGA': args.modo_carga,
+        'WORKERS_ETL': args.workers,
+        'CHECKPOINT_ETL': args.checkpoint,
+        'PIPELINE_ETL': '1' if getattr(args, 'pipeline', False) else None,
+    }
+    for variavel, valor in opcoes.items():
+        if valor is not None:
+            os.environ[variavel] = str(valor)
+
+def comando_provision(args: argparse.Namespace, tempos: TemposImportacao) -> int:
+    tempos.importar('dbcreate').main()
+    return 0
+
+def comando_run(args: argparse.Namespace, tempos: TemposImportacao) -> int:
+    _aplicar_opcoes(args)
+
+    if args.se_alterado:
+        config = tempos.importar('configuracao_etl').ConfiguracaoETL()
+        if not config.arquivo_checkpoint:
+            config.logger.error("--se-alterado exige CHECKPOINT_ETL (ou --checkpoint)")
+            return 2
+        registro = tempos.importar('checkpoints_etl').RegistroCheckpoints(
+            config.arquivo_checkpoint, config.logger)
+        try:
+            inalterado = registro.concluida_sem_mudancas(config.caminho_csv,
+                                                         config.parametros_execucao())
+        except OSError:
+            # arquivo ausente: a execução normal registra o erro
+            inalterado = False
+        finally:
+            registro.fechar()
+        if inalterado:
+            config.logger.info("Entrada inalterada desde a última carga concluída; nada a fazer")
+            return 0
+
+    Path("logs").mkdir(exist_ok=True)
+    pipeline = tempos.importar('dia2').PipelineETL()
+    return 0 if pipeline.executar() else 1
+
+def _verificar_config(config) -> List[Tuple[str, str]]:
+    resultados = []
+
+    def checar(condicao: bool, mensagem: str, nivel_falha: str = 'FALHA') -> None:
+        resultados.append(('OK' if condicao else nivel_falha, mensagem))
+
+    checar(config.modo_carga in ('to_sql', 'copy', 'incremental'),
+           f"MODO_CARGA '{config.modo_carga}' em to_sql, copy ou incremental")
+    checar(config.tamanho_chunk >= 0, f"TAMANHO_CHUNK {config.tamanho_chunk} não negativo")
+    checar(config.workers >= 1, f"WORKERS_ETL {config.workers} maior ou igual a 1")
+    checar(config.dedup_modo in ('exato', 'quase'), f"DEDUP_MODO '{config.dedup_modo}' em exato ou quase")
+    checar(config.dedup_vistos in ('exato', 'bloom'),
+           f"DEDUP_VISTOS '{config.dedup_vistos}' em exato ou bloom")
+    checar(0 < config.dedup_limiar <= 1, f"DEDUP_LIMIAR {config.dedup_limiar} em (0, 1]")
+    if config.pipeline:
+        checar(config.tamanho_chunk > 0 and config.workers == 1,
+               "PIPELINE_ETL usado com TAMANHO_CHUNK > 0 e WORKERS_ETL=1", 'AVISO')
+    if config.arquivo_checkpoint:
+        checar(config.tamanho_chunk > 0 and config.workers == 1
+               and config.modo_carga in ('copy', 'incremental'),
+               "CHECKPOINT_ETL usado com TAMANHO_CHUNK > 0, WORKERS_ETL=1 e MODO_CARGA copy/incremental",
+               'AVISO')
+    return resultados
+
+def _verificar_csv(config) -> List[Tuple[str, str]]:
+    caminho = Path(config.caminho_csv)
+    if not caminho.is_file():
+        return [('FALHA', f"CSV de entrada {caminho} existe")]
+
+    cabecalho = None
+    for encoding in dict.fromkeys([config.encoding_csv, 'utf-8', 'latin1']):
+        try:
+            with open(caminho, newline='', encoding=encoding) as arquivo:
+                cabecalho = next(csv.reader(arquivo), None)
+            break
+        except UnicodeDecodeError:
+            continue
+    if not cabecalho:
+        return [('FALHA', f"CSV {caminho} tem cabeçalho legível")]
+
+    resultados = [('OK', f"CSV {caminho}: {len(cabecalho)} colunas, {caminho.stat().st_size} bytes")]
+    if config.modo_carga in ('copy', 'incremental'):
+        from dbcreate import colunas_jobs_ai, colunas_obrigatorias_jobs_ai
+
+        faltando = [c for c in colunas_obrigatorias_jobs_ai() if c not in cabecalho]
+        resultados.append(('FALHA' if faltando else 'OK',
+                           f"colunas NOT NULL de {config.tabela_tipada} no CSV"
+                           + (f" (faltando: {', '.join(faltando)})" if faltando else "")))
+        extras = [c for c in colunas_jobs_ai() if c not in cabecalho and c != 'content_hash']
+        if extras:
+            resultados.append(('AVISO', f"colunas da tabela ausentes no CSV ficarão nulas: "
+                                        f"{', '.join(extras)}"))
+    return resultados
+
+def comando_validate(args: argparse.Namespace, tempos: TemposImportacao) -> int:
+    """Confere configuração, CSV e (com --banco) a conexão, sem executar o ETL"""
+    _aplicar_opcoes(args)
+    config = tempos.importar('configuracao_etl').ConfiguracaoETL()
+    resultados = _verificar_config(config) + _verificar_csv(config)
+
+    if args.banco:
+        try:
+            gerenciador = tempos.importar('gerenciador_conexoes').obter_gerenciador(
+                config.bd_host, config.bd_porta, config.bd_usuario, config.bd_senha)
+            with gerenciador.conexao(config.bd_nome):
+                pass
+            resultados.append(('OK', f"conexão com o banco '{config.bd_nome}'"))
+            gerenciador.descartar()
+        except Exception as e:
+            resultados.append(('FALHA', f"conexão com o banco '{config.bd_nome}': {e}"))
+
+    for nivel, mensagem in resultados:
+        print(f"[{nivel}] {mensagem}")
+    return 1 if any(nivel == 'FALHA' for nivel, _ in resultados) else 0
+
+def comando_bench(args: argparse.Namespace, tempos: TemposImportacao) -> int:
+    modulo = {'etl': 'benchmark_etl', 'consultas': 'benchmark_consultas'}[args.alvo]
+    return tempos.importar(modulo).main(args.argumentos)
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description="ETL de vagas de IA (jobs_ai)")
+    parser.add_argument('--tempos', action='store_true',
+                        help="mostra o tempo de inicialização e das importações sob demanda")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    subcomandos.add_parser('provision', help="cria o banco de homologação, jobs_ai e índices")
+
+    opcoes_etl = argparse.ArgumentParser(add_help=False)
+    opcoes_etl.add_argument('--csv', help="arquivo de entrada (CAMINHO_CSV)")
+    opcoes_etl.add_argument('--chunk', type=int, help="linhas por chunk (TAMANHO_CHUNK)")
+    opcoes_etl.add_argument('--modo-carga', choices=['to_sql', 'copy', 'incremental'],
+                            help="MODO_CARGA")
+    opcoes_etl.add_argument('--workers', type=int, help="WORKERS_ETL")
+    opcoes_etl.add_argument('--checkpoint', help="arquivo SQLite de checkpoints (CHECKPOINT_ETL)")
+
+    run = subcomandos.add_parser('run', parents=[opcoes_etl], help="executa o ETL")
+    run.add_argument('--pipeline', action='store_true', help="sobrepõe as etapas (PIPELINE_ETL)")
+    run.add_argument('--se-alterado', action='store_true',
+                     help="não faz nada se o CSV e os parâmetros não mudaram desde a última "
+                          "carga concluída (exige checkpoints)")
+
+    validate = subcomandos.add_parser('validate', parents=[opcoes_etl],
+                                      help="confere configuração e CSV sem executar o ETL")
+    validate.add_argument('--banco', action='store_true', help="testa também a conexão com o banco")
+
+    bench = subcomandos.add_parser('bench', help="benchmarks (argumentos repassados ao script)")
+    bench.add_argument('alvo', choices=['etl', 'consultas'])
+    bench.add_argument('argumentos', nargs=argparse.REMAINDER)
+    return parser
+
+COMANDOS = {
+    'provision': comando_provision,
+    'run': comando_run,
+    'validate': comando_validate,
+    'bench': comando_bench,
+}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    tempos = TemposImportacao()
+    inicializacao_ms = (time.perf_counter() - INICIO) * 1000
+
+    try:
+        return COMANDOS[args.comando](args, tempos)
+    except KeyboardInterrupt:
+        print("\nProcesso interrompido pelo usuário")
+        return 1
+    finally:
+        if args.tempos:
+            print('\n'.join(tempos.relatorio(inicializacao_ms)), file=sys.stderr)
+
+if __name__ == '__main__':
+    sys.exit(main())
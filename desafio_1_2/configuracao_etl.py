@@ -0,0 +1,126 @@
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+def configurar_logging(nivel_log: str = "INFO", arquivo_log: Optional[str] = None) -> logging.Logger:
+    logger = logging.getLogger('ETL_Pipeline')
+    logger.setLevel(getattr(logging, nivel_log.upper()))
+    
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    
+    formatter = logging.Formatter(
+        '[%(asctime)s] [%(levelname)s] [ETL] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+    
+    if arquivo_log:
+        try:
+            Path(arquivo_log).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(arquivo_log, encoding='utf-8')
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
+        except Exception as e:
+            logger.warning(f"Não foi possível criar arquivo de log {arquivo_log}: {e}")
+    
+    return logger
+
+class ConfiguracaoETL:
+    
+    def __init__(self):
+        self.logger = configurar_logging()
+        self._carregar_credenciais_db()
+        self._configurar_parametros()
+    
+    def _carregar_credenciais_db(self) -> None:
+        try:
+            from connection import (
+                DB_HOST, DB_HOMOLOGACAO, DB_USER, DB_PASSWORD, DB_PORT
+            )
+            self.bd_host = DB_HOST
+            # o ETL carrega no banco provisionado pelo dbcreate, onde estão jobs_ai e job_skills
+            self.bd_nome = os.getenv('DB_ETL', DB_HOMOLOGACAO)
+            self.bd_usuario = DB_USER
+            self.bd_senha = DB_PASSWORD
+            self.bd_porta = DB_PORT
+            self.logger.info("Credenciais do banco carregadas do módulo connection")
+            
+        except ImportError as e:
+            self.logger.warning(f"Não foi possível importar credenciais de 'connection.py': {e}")
+            self.logger.info("Usando credenciais padrão (desenvolvimento)")
+            
+            self.bd_host = os.getenv('DB_HOST', 'localhost')
+            self.bd_nome = os.getenv('DB_ETL', os.getenv('DB_HOMOLOGACAO', 'dia1'))
+            self.bd_usuario = os.getenv('DB_USER', 'postgres')
+            self.bd_senha = os.getenv('DB_PASSWORD', '123')
+            self.bd_porta = os.getenv('DB_PORT', '5432')
+    
+    def _configurar_parametros(self) -> None:
+        """Configura parâmetros do ETL"""
+        self.caminho_csv = os.getenv('CAMINHO_CSV', '../desafio100dias/arquivos_diversos/ai_job_dataset.csv')
+        self.nome_tabela = os.getenv('NOME_TABELA', 'ai_jobs')
+        self.encoding_csv = os.getenv('ENCODING_CSV', 'utf-8')
+        # 0 desativa o modo em chunks e mantém a carga do arquivo inteiro em memória
+        self.tamanho_chunk = int(os.getenv('TAMANHO_CHUNK', '0'))
+        # PIPELINE_ETL=1 sobrepõe leitura, transformação e carga dos chunks em threads ligadas
+        # por filas de até PIPELINE_FILA chunks; PIPELINE_PROCESSO=1 transforma num processo à parte
+        self.pipeline = os.getenv('PIPELINE_ETL', '0') == '1'
+        self.pipeline_fila = int(os.getenv('PIPELINE_FILA', '2'))
+        self.pipeline_processo = os.getenv('PIPELINE_PROCESSO', '0') == '1'
+        # arquivo SQLite com o progresso por chunk (modo em chunks, MODO_CARGA copy ou incremental);
+        # uma execução interrompida com o mesmo arquivo e parâmetros é retomada; vazio desativa
+        self.arquivo_checkpoint = os.getenv('CHECKPOINT_ETL', '')
+        # 'to_sql' (tabela inferida pelo pandas), 'copy' (COPY FROM STDIN na tabela tipada)
+        # ou 'incremental' (upsert por job_id na tabela tipada)
+        self.modo_carga = os.getenv('MODO_CARGA', 'to_sql')
+        self.tabela_tipada = os.getenv('TABELA_TIPADA', 'jobs_ai')
+        # acima de 1, extração e transformação rodam em partições num ProcessPoolExecutor
+        self.workers = int(os.getenv('WORKERS_ETL', '1'))
+        # diretório do snapshot Arrow do CSV extraído; vazio desativa o cache
+        self.dir_cache = os.getenv('DIR_CACHE_ETL', '')
+        # relatório de métricas por etapa (JSON lines e textfile do Prometheus, ambos opcionais)
+        self.arquivo_metricas = os.getenv('METRICAS_JSONL', '')
+        self.arquivo_prometheus = os.getenv('METRICAS_PROMETHEUS', '')
+        # 'cprofile' ou 'tracemalloc' ativam o perfilamento desta execução
+        self.modo_perfil = os.getenv('PERFIL_ETL', '')
+        self.destino_perfil = os.getenv('PERFIL_DESTINO', '')
+        # validação contra o esquema jobs_ai antes da carga; linhas inválidas vão para quarentena
+        self.validar_esquema = os.getenv('VALIDAR_ESQUEMA', '1') == '1'
+        self.arquivo_quarentena = os.getenv('ARQUIVO_QUARENTENA', 'logs/quarentena_jobs_ai.csv')
+        # diretório do índice invertido de skills gerado a partir das linhas carregadas; vazio desativa
+        self.dir_indice_skills = os.getenv('INDICE_SKILLS', '')
+        # deduplicação: colunas da chave (vazio = todas) menos as ignoradas, ex.
+        # DEDUP_IGNORAR=job_id,posting_date,application_deadline pega repostagens;
+        # DEDUP_MODO=quase soma MinHash/LSH sobre título, empresa e skills, com
+        # DEDUP_LIMIAR como similaridade mínima estimada para descartar a linha;
+        # DEDUP_VISTOS=bloom troca o conjunto exato (com despejo em disco) por um filtro de Bloom
+        self.dedup_chaves = [c.strip() for c in os.getenv('DEDUP_CHAVES', '').split(',') if c.strip()]
+        self.dedup_ignorar = [c.strip() for c in os.getenv('DEDUP_IGNORAR', '').split(',') if c.strip()]
+        self.dedup_modo = os.getenv('DEDUP_MODO', 'exato')
+        self.dedup_vistos = os.getenv('DEDUP_VISTOS', 'exato')
+        self.dedup_limite_memoria = int(os.getenv('DEDUP_LIMITE_MEMORIA', '5000000'))
+        self.dedup_limiar = float(os.getenv('DEDUP_LIMIAR', '0.8'))
+        # cubo de salários por título x nível x país x indústria, em Parquet e/ou tabelas de resumo;
+        # CUBO_INCREMENTAL=1 soma a execução ao último cubo salvo (entrada só com linhas novas)
+        self.arquivo_cubo = os.getenv('CUBO_PARQUET', '')
+        self.cubo_no_banco = os.getenv('CUBO_BANCO', '0') == '1'
+        self.cubo_incremental = os.getenv('CUBO_INCREMENTAL', '0') == '1'
+    
+    def parametros_execucao(self) -> Dict[str, Any]:
+        """Parâmetros que definem os chunks e o conteúdo carregado; identificam uma execução"""
+        return {
+            'tamanho_chunk': self.tamanho_chunk,
+            'encoding': self.encoding_csv,
+            'modo_carga': self.modo_carga,
+            'tabela': self.tabela_tipada,
+            'deduplicacao': {
+                'chaves': self.dedup_chaves, 'ignorar': self.dedup_ignorar,
+                'modo': self.dedup_modo, 'vistos': self.dedup_vistos, 'limiar': self.dedup_limiar,
+            },
+        }
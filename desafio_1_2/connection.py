@@ -1,10 +1,9 @@
 # connection.py
-import psycopg2
-from psycopg2 import sql
-
 DB_USER = "postgres"
 DB_NAME = "postgres"
 DB_PASSWORD = "123"
 DB_HOST = "localhost"
 DB_PORT = "5432"
+# banco criado pelo dbcreate (jobs_ai, partições, job_skills) e alvo padrão do ETL
+DB_HOMOLOGACAO = "dia1"
 
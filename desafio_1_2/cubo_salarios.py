@@ -0,0 +1,241 @@
+import io
+import logging
+import os
+from itertools import combinations
+from pathlib import Path
+from typing import Optional, List, Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES = ['job_title', 'experience_level', 'company_location', 'industry']
+MEDIDA = 'salary_usd'
+# valor da dimensão nas células agregadas sobre ela (ex.: todos os países)
+TODOS = '*'
+
+# sketch de buckets logarítmicos: erro relativo máximo ALFA em qualquer quantil
+ALFA = 0.01
+GAMA = (1 + ALFA) / (1 - ALFA)
+LOG_GAMA = np.log(GAMA)
+
+def bucket_sketch(valores: np.ndarray) -> np.ndarray:
+    return np.ceil(np.log(np.maximum(valores, 1.0)) / LOG_GAMA).astype('int32')
+
+def valor_bucket(buckets: np.ndarray) -> np.ndarray:
+    return 2 * GAMA ** buckets.astype('float64') / (GAMA + 1)
+
+def _conjuntos_agrupamento(dimensoes: Sequence[str]) -> List[List[str]]:
+    """Todas as 2^n combinações de dimensões, da mais detalhada ao total geral"""
+    return [list(c) for tamanho in range(len(dimensoes), -1, -1)
+            for c in combinations(dimensoes, tamanho)]
+
+class CuboSalarios:
+    """Cubo de salários com todas as combinações de DIMENSOES.
+
+    `celulas` guarda contagem, soma, mínimo e máximo por célula; `sketch` guarda
+    a contagem por bucket logarítmico. Todas as medidas são somáveis, então dois
+    cubos se mesclam sem voltar às linhas e os percentis saem do sketch mesclado.
+    """
+
+    COLUNAS_CELULAS = DIMENSOES + ['contagem', 'soma', 'minimo', 'maximo']
+    COLUNAS_SKETCH = DIMENSOES + ['bucket', 'contagem']
+
+    def __init__(self, celulas: pd.DataFrame, sketch: pd.DataFrame):
+        self.celulas = celulas
+        self.sketch = sketch
+
+    @classmethod
+    def vazio(cls) -> 'CuboSalarios':
+        return cls(pd.DataFrame(columns=cls.COLUNAS_CELULAS), pd.DataFrame(columns=cls.COLUNAS_SKETCH))
+
+    @staticmethod
+    def _grao_base(df: pd.DataFrame):
+        dados = pd.DataFrame({
+            d: (df[d].astype('string').fillna('') if d in df.columns else '') for d in DIMENSOES
+        })
+        dados[MEDIDA] = pd.to_numeric(df[MEDIDA], errors='coerce').to_numpy()
+        dados = dados[dados[MEDIDA].notna()]
+
+        celulas = dados.groupby(DIMENSOES, sort=False).agg(
+            contagem=(MEDIDA, 'size'), soma=(MEDIDA, 'sum'),
+            minimo=(MEDIDA, 'min'), maximo=(MEDIDA, 'max')).reset_index()
+        sketch = (dados.assign(bucket=bucket_sketch(dados[MEDIDA].to_numpy()))
+                  .groupby(DIMENSOES + ['bucket'], sort=False).size()
+                  .rename('contagem').reset_index())
+        return celulas, sketch
+
+    @staticmethod
+    def _reduzir(celulas: pd.DataFrame, sketch: pd.DataFrame, dimensoes: List[str]):
+        agregacao = {'contagem': 'sum', 'soma': 'sum', 'minimo': 'min', 'maximo': 'max'}
+        if dimensoes:
+            celulas = celulas.groupby(dimensoes, sort=False).agg(agregacao).reset_index()
+            sketch = sketch.groupby(dimensoes + ['bucket'], sort=False)['contagem'].sum().reset_index()
+        else:
+            celulas = pd.DataFrame({coluna: [celulas[coluna].agg(funcao)]
+                                    for coluna, funcao in agregacao.items()})
+            sketch = sketch.groupby('bucket', sort=False)['contagem'].sum().reset_index()
+        fora = {d: TODOS for d in DIMENSOES if d not in dimensoes}
+        return celulas.assign(**fora), sketch.assign(**fora)
+
+    @classmethod
+    def de_dataframe(cls, df: pd.DataFrame) -> 'CuboSalarios':
+        """Agrega as linhas no grão mais fino e deriva os demais níveis a partir dele"""
+        if df is None or df.empty or MEDIDA not in df.columns:
+            return cls.vazio()
+        base_celulas, base_sketch = cls._grao_base(df)
+        if base_celulas.empty:
+            return cls.vazio()
+
+        partes = [cls._reduzir(base_celulas, base_sketch, dims)
+                  for dims in _conjuntos_agrupamento(DIMENSOES)]
+        return cls(pd.concat([p[0] for p in partes], ignore_index=True)[cls.COLUNAS_CELULAS],
+                   pd.concat([p[1] for p in partes], ignore_index=True)[cls.COLUNAS_SKETCH])
+
+    def mesclar(self, outro: 'CuboSalarios') -> 'CuboSalarios':
+        cubos = [c for c in (self, outro) if not c.celulas.empty]
+        if len(cubos) < 2:
+            return cubos[0] if cubos else CuboSalarios.vazio()
+        celulas = pd.concat([self.celulas, outro.celulas], ignore_index=True)
+        sketch = pd.concat([self.sketch, outro.sketch], ignore_index=True)
+        celulas = celulas.groupby(DIMENSOES, sort=False).agg(
+            {'contagem': 'sum', 'soma': 'sum', 'minimo': 'min', 'maximo': 'max'}).reset_index()
+        sketch = sketch.groupby(DIMENSOES + ['bucket'], sort=False)['contagem'].sum().reset_index()
+        return CuboSalarios(celulas, sketch)
+
+    def percentis(self, quantis: Sequence[float] = (0.25, 0.5, 0.75, 0.9)) -> pd.DataFrame:
+        """`celulas` com média e os percentis pedidos, estimados pelo sketch de cada célula"""
+        resultado = self.celulas.assign(
+            media=self.celulas['soma'].astype('float64') / self.celulas['contagem'].astype('float64'))
+        if self.sketch.empty:
+            return resultado
+
+        ordenado = self.sketch.sort_values(DIMENSOES + ['bucket'], ignore_index=True)
+        grupos = ordenado.groupby(DIMENSOES, sort=False)['contagem']
+        acumulado = grupos.cumsum().to_numpy()
+        total = grupos.transform('sum').to_numpy()
+
+        for q in quantis:
+            # primeiro bucket cuja contagem acumulada passa da posição do quantil
+            alcancou = ordenado[acumulado > q * (total - 1)]
+            primeiro = alcancou.groupby(DIMENSOES, sort=False)['bucket'].first()
+            coluna = f'p{round(q * 100)}'
+            estimativa = pd.Series(valor_bucket(primeiro.to_numpy()), index=primeiro.index, name=coluna)
+            resultado = resultado.merge(estimativa.reset_index(), on=DIMENSOES, how='left')
+            # o sketch arredonda; mínimo e máximo exatos limitam a estimativa
+            resultado[coluna] = resultado[coluna].clip(resultado['minimo'].astype('float64'),
+                                                       resultado['maximo'].astype('float64'))
+        return resultado
+
+    def salvar_parquet(self, caminho: str) -> None:
+        base = Path(caminho)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        for df, destino in ((self.percentis(), base), (self.sketch, _caminho_sketch(base))):
+            temporario = destino.with_name(destino.name + '.tmp')
+            df.to_parquet(temporario, index=False)
+            os.replace(temporario, destino)
+
+    @classmethod
+    def carregar_parquet(cls, caminho: str) -> Optional['CuboSalarios']:
+        base = Path(caminho)
+        if not base.exists() or not _caminho_sketch(base).exists():
+            return None
+        celulas = pd.read_parquet(base, columns=cls.COLUNAS_CELULAS)
+        return cls(celulas, pd.read_parquet(_caminho_sketch(base), columns=cls.COLUNAS_SKETCH))
+
+def _caminho_sketch(base: Path) -> Path:
+    return base.with_name(f"{base.stem}_sketch{base.suffix}")
+
+DDL_CUBO = """
+CREATE TABLE IF NOT EXISTS salario_cubo (
+    job_title VARCHAR(255) NOT NULL,
+    experience_level VARCHAR(50) NOT NULL,
+    company_location VARCHAR(100) NOT NULL,
+    industry VARCHAR(100) NOT NULL,
+    contagem BIGINT NOT NULL,
+    soma DECIMAL(20, 2) NOT NULL,
+    minimo DECIMAL(15, 2),
+    maximo DECIMAL(15, 2),
+    media DECIMAL(15, 2),
+    p25 DECIMAL(15, 2),
+    p50 DECIMAL(15, 2),
+    p75 DECIMAL(15, 2),
+    p90 DECIMAL(15, 2),
+    PRIMARY KEY (job_title, experience_level, company_location, industry)
+);
+
+CREATE TABLE IF NOT EXISTS salario_cubo_sketch (
+    job_title VARCHAR(255) NOT NULL,
+    experience_level VARCHAR(50) NOT NULL,
+    company_location VARCHAR(100) NOT NULL,
+    industry VARCHAR(100) NOT NULL,
+    bucket INT NOT NULL,
+    contagem BIGINT NOT NULL,
+    PRIMARY KEY (job_title, experience_level, company_location, industry, bucket)
+);
+"""
+
+def gravar_postgres(cubo: CuboSalarios, conexao) -> int:
+    """Substitui as tabelas de resumo numa transação; o cubo já chega mesclado"""
+    from psycopg2 import sql
+
+    tabelas = {'salario_cubo': cubo.percentis().round(2), 'salario_cubo_sketch': cubo.sketch}
+    with conexao.cursor() as cursor:
+        cursor.execute(DDL_CUBO)
+        cursor.execute("TRUNCATE salario_cubo, salario_cubo_sketch")
+        for tabela, df in tabelas.items():
+            buffer = io.StringIO()
+            df.to_csv(buffer, header=False, index=False)
+            buffer.seek(0)
+            cursor.copy_expert(
+                sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                    sql.Identifier(tabela), sql.SQL(', ').join(map(sql.Identifier, df.columns))),
+                buffer)
+    conexao.commit()
+    return len(cubo.celulas)
+
+class ConstrutorCubo:
+    """Consumidor do PipelineETL: mescla um cubo parcial por chunk e publica no final.
+
+    Com `incremental`, o cubo da execução é somado ao último Parquet salvo; use
+    quando o arquivo de entrada só traz linhas novas, senão elas contam duas vezes.
+    """
+
+    def __init__(self, logger: logging.Logger, arquivo_parquet: Optional[str] = None,
+                 incremental: bool = False, obter_conexao: Optional[Callable] = None):
+        self.logger = logger
+        self.arquivo_parquet = arquivo_parquet
+        self.incremental = incremental
+        self.obter_conexao = obter_conexao
+        self.cubo = CuboSalarios.vazio()
+
+    def adicionar(self, df: Optional[pd.DataFrame]) -> None:
+        if df is not None and not df.empty:
+            self.cubo = self.cubo.mesclar(CuboSalarios.de_dataframe(df))
+
+    def finalizar(self) -> CuboSalarios:
+        cubo = self.cubo
+        if self.incremental and self.arquivo_parquet:
+            anterior = CuboSalarios.carregar_parquet(self.arquivo_parquet)
+            if anterior is not None:
+                cubo = anterior.mesclar(cubo)
+        self.logger.info(f"Cubo de salários: {len(cubo.celulas)} células, "
+                         f"{len(cubo.sketch)} buckets de sketch")
+
+        if self.arquivo_parquet:
+            try:
+                cubo.salvar_parquet(self.arquivo_parquet)
+                self.logger.info(f"Cubo de salários salvo em {self.arquivo_parquet}")
+            except (ImportError, OSError) as e:
+                self.logger.error(f"Não foi possível salvar o cubo em {self.arquivo_parquet}: {e}")
+
+        if self.obter_conexao is not None:
+            conexao = self.obter_conexao()
+            try:
+                celulas = gravar_postgres(cubo, conexao)
+                self.logger.info(f"Tabelas salario_cubo atualizadas com {celulas} células")
+            except Exception as e:
+                conexao.rollback()
+                self.logger.error(f"Erro ao gravar o cubo de salários no banco: {e}")
+            finally:
+                conexao.close()
+        return cubo
@@ -1,36 +1,114 @@
-import psycopg2
-from psycopg2 import OperationalError, errorcodes, errors
-from connection import DB_HOST, DB_PASSWORD, DB_PORT, DB_USER, DB_NAME
+from connection import DB_HOST, DB_PASSWORD, DB_PORT, DB_USER, DB_NAME, DB_HOMOLOGACAO
 
-homologacao_db = "dia1" 
+# psycopg2 e SQLAlchemy são importados dentro das funções que falam com o banco:
+# o CLI e o ETL importam daqui só os DDLs e os helpers de colunas
 
-def criar_banco_homologacao(db_host, db_senha, db_porta, usuario, db_nome):
+homologacao_db = DB_HOMOLOGACAO
 
-    conexao = None
+# particionada por mês de posting_date; a chave primária precisa conter a coluna de partição
+DDL_JOBS_AI = """
+CREATE TABLE IF NOT EXISTS jobs_ai (
+    job_id SERIAL,
+    job_title VARCHAR(255),
+    salary_usd DECIMAL(15, 2),
+    salary_currency VARCHAR(10),
+    experience_level VARCHAR(50),
+    employment_type VARCHAR(50),
+    company_location VARCHAR(100),
+    company_size VARCHAR(50),
+    employee_residence VARCHAR(100),
+    remote_ratio INT,
+    required_skills TEXT,
+    education_required VARCHAR(100),
+    years_experience INT,
+    industry VARCHAR(100),
+    posting_date DATE NOT NULL,
+    application_deadline DATE,
+    job_description_length INT,
+    benefits_score DECIMAL(5, 2),
+    company_name VARCHAR(150),
+    content_hash BIGINT,
+    PRIMARY KEY (job_id, posting_date)
+) PARTITION BY RANGE (posting_date);
+
+CREATE TABLE IF NOT EXISTS jobs_ai_default PARTITION OF jobs_ai DEFAULT;
+"""
+
+# criados no pai, os índices se propagam para todas as partições
+DDL_INDICES_JOBS_AI = """
+CREATE INDEX IF NOT EXISTS idx_jobs_ai_company_location ON jobs_ai (company_location);
+CREATE INDEX IF NOT EXISTS idx_jobs_ai_experience_level ON jobs_ai (experience_level);
+CREATE INDEX IF NOT EXISTS idx_jobs_ai_industry ON jobs_ai (industry);
+"""
+
+# uma linha por (skill, vaga); preenchida pelo loader a partir de required_skills
+DDL_JOB_SKILLS = """
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_id INT NOT NULL,
+    skill VARCHAR(100) NOT NULL,
+    PRIMARY KEY (skill, job_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_skills_job_id ON job_skills (job_id);
+"""
+
+def _definicoes_jobs_ai():
+    corpo = DDL_JOBS_AI[DDL_JOBS_AI.index("(") + 1:DDL_JOBS_AI.index("\n)")]
+    for linha in corpo.split(",\n"):
+        linha = linha.strip().rstrip(",")
+        if linha and not linha.startswith("PRIMARY KEY"):
+            yield linha.split(None, 1)
+
+def colunas_jobs_ai():
+    """Retorna {coluna: tipo SQL} na ordem definida em DDL_JOBS_AI"""
+    return {nome: tipo.replace("NOT NULL", "").strip() for nome, tipo in _definicoes_jobs_ai()}
+
+def colunas_obrigatorias_jobs_ai():
+    """Colunas NOT NULL de DDL_JOBS_AI, incluindo as da chave primária"""
+    corpo = DDL_JOBS_AI[DDL_JOBS_AI.index("PRIMARY KEY (") + len("PRIMARY KEY ("):]
+    chave = [c.strip() for c in corpo[:corpo.index(")")].split(",")]
+    nao_nulas = [nome for nome, tipo in _definicoes_jobs_ai() if "NOT NULL" in tipo]
+    return list(dict.fromkeys(chave + nao_nulas))
+
+def nome_particao_mensal(tabela, mes):
+    return f"{tabela}_{mes.year:04d}_{mes.month:02d}"
+
+def ddl_particao_mensal(tabela, mes):
+    """CREATE TABLE da partição mensal que contém a data `mes`"""
+    inicio = mes.replace(day=1)
+    fim = inicio.replace(year=inicio.year + 1, month=1) if inicio.month == 12 \
+        else inicio.replace(month=inicio.month + 1)
+    return (f"CREATE TABLE IF NOT EXISTS {nome_particao_mensal(tabela, inicio)} "
+            f"PARTITION OF {tabela} FOR VALUES FROM ('{inicio.isoformat()}') "
+            f"TO ('{fim.isoformat()}')")
+
+def criar_banco_homologacao(db_host, db_senha, db_porta, usuario, db_nome, autocommit=False):
+    from psycopg2 import OperationalError
+    from sqlalchemy import exc
+    from gerenciador_conexoes import obter_gerenciador
+
+    # a conexão vem do pool compartilhado; close() a devolve em vez de encerrá-la
     try:
-        conexao = psycopg2.connect(
-            host=db_host,
-            database=db_nome,
-            user=usuario,
-            password=db_senha,
-            port=db_porta
-        )
+        conexao = obter_gerenciador(db_host, db_porta, usuario, db_senha).conexao_bruta(db_nome, autocommit)
         print(f"Etapa 1: Conexão Realizada ao DB '{db_nome}'")
         return conexao
-    except OperationalError as e:
+    except (OperationalError, exc.OperationalError) as e:
         print(f"Erro 1 - Conexão falha: {e} ao tentar conectar ao {db_nome}")
         return None 
 
 def checar_criar_db(alvo_db_name, db_user, db_password, db_host, db_port):
+    from psycopg2 import OperationalError, errorcodes
+
     conexao_padrao = None
     cursor = None
     try:
-        conexao_padrao = criar_banco_homologacao(db_host, db_password, db_port, db_user, DB_NAME)
+        # CREATE DATABASE não roda dentro de um bloco de transação
+        conexao_padrao = criar_banco_homologacao(db_host, db_password, db_port, db_user, DB_NAME,
+                                                 autocommit=True)
         if not conexao_padrao:
             print(f"Erro 2 - Erro ao conectar '{DB_NAME}'. Verifique as credenciais.")
             return False
 
-        conexao_padrao.autocommit = True
         cursor = conexao_padrao.cursor()
 
         cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{alvo_db_name}'")
@@ -58,45 +136,33 @@ def checar_criar_db(alvo_db_name, db_user, db_password, db_host, db_port):
             cursor.close()
         if conexao_padrao:
             conexao_padrao.close()
-            print(f"Default 1 - Conexão ao banco de dados padrão '{DB_NAME}' fechada.")
+            print(f"Default 1 - Conexão ao banco de dados padrão '{DB_NAME}' devolvida ao pool.")
 
 def criar_tabela_jobs_ai(db_host, db_password, db_port, db_user, db_name):
+    from psycopg2 import OperationalError
+
     conn_dia1 = None
     cursor = None
     try:
-        conn_dia1 = criar_banco_homologacao(db_host, db_password, db_port, db_user, db_name)
+        conn_dia1 = criar_banco_homologacao(db_host, db_password, db_port, db_user, db_name,
+                                            autocommit=True)
         if not conn_dia1:
             print(f"Erro 5.1 - Não foi possível conectar ao banco de dados '{db_name}' para criar a tabela.")
             return False
 
-        conn_dia1.autocommit = True
         cursor = conn_dia1.cursor()
 
-        create_table_query = """
-CREATE TABLE IF NOT EXISTS jobs_ai (
-    job_id SERIAL PRIMARY KEY,
-    job_title VARCHAR(255),
-    salary_usd DECIMAL(15, 2),
-    salary_currency VARCHAR(10),
-    experience_level VARCHAR(50),
-    employment_type VARCHAR(50),
-    company_location VARCHAR(100),
-    company_size VARCHAR(50),
-    employee_residence VARCHAR(100),
-    remote_ratio INT,
-    required_skills TEXT,
-    education_required VARCHAR(100),
-    years_experience INT,
-    industry VARCHAR(100),
-    posting_date DATE,
-    application_deadline DATE,
-    job_description_length INT,
-    benefits_score DECIMAL(5, 2),
-    company_name VARCHAR(150)
-);
-        """
-        cursor.execute(create_table_query)
+        cursor.execute("SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass('jobs_ai')")
+        existente = cursor.fetchone()
+        if existente and existente[0] != 'p':
+            print("Aviso 6.0 - 'jobs_ai' já existe sem particionamento; remova-a para recriar "
+                  "no layout particionado.")
+
+        cursor.execute(DDL_JOBS_AI)
         print(f"Etapa 6.1 - Tabela 'jobs_ai' criada ou já existe no banco de dados '{db_name}'.")
+        cursor.execute(DDL_INDICES_JOBS_AI)
+        cursor.execute(DDL_JOB_SKILLS)
+        print("Etapa 6.2 - Índices de 'jobs_ai' e tabela 'job_skills' prontos.")
         return True
 
     except OperationalError as e:
@@ -110,7 +176,7 @@ CREATE TABLE IF NOT EXISTS jobs_ai (
             cursor.close()
         if conn_dia1:
             conn_dia1.close()
-            print(f"Default 2 - Conexão ao banco de dados '{db_name}' (para tabela) fechada.")
+            print(f"Default 2 - Conexão ao banco de dados '{db_name}' (para tabela) devolvida ao pool.")
 
 def main():
     print(f"Etapa 3.1 - Iniciando verificação e criação do banco de dados '{homologacao_db}'...")
@@ -122,7 +188,7 @@ def main():
         if conn_dia1_validation:
             print(f"Etapa 3.2.1 - Conexão de validação ao '{homologacao_db}' bem-sucedida.")
             conn_dia1_validation.close() 
-            print(f"Etapa 3.2.2 - Conexão de validação ao '{homologacao_db}' fechada.")
+            print(f"Etapa 3.2.2 - Conexão de validação ao '{homologacao_db}' devolvida ao pool.")
 
             print(f"\nEtapa 4.1 - Iniciando criação da tabela 'jobs_ai' no banco '{homologacao_db}'...")
             success_table_creation = criar_tabela_jobs_ai(DB_HOST, DB_PASSWORD, DB_PORT, DB_USER, homologacao_db)
@@ -136,5 +202,12 @@ def main():
     else:
         print(f"Erro 4.2 - Operação de criação/verificação do banco de dados '{homologacao_db}' falhou.")
 
+    from gerenciador_conexoes import obter_gerenciador
+
+    gerenciador = obter_gerenciador(DB_HOST, DB_PORT, DB_USER, DB_PASSWORD)
+    for banco, metricas in gerenciador.metricas().items():
+        print(f"Pool '{banco}': {metricas}")
+    gerenciador.descartar()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,361 @@
+import logging
+import math
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# colunas usadas pelo MinHash para achar repostagens quase iguais
+COLUNAS_QUASE = ['job_title', 'company_name', 'required_skills']
+
+# maior primo abaixo de 2^32: a * x + b com a, x < p cabe em uint64 sem estouro
+PRIMO_MINHASH = np.uint64(4294967291)
+MASCARA_32 = np.uint64(0xFFFFFFFF)
+MULTIPLICADOR_FNV = np.uint64(0x100000001B3)
+
+def fingerprints(df: pd.DataFrame, colunas: Optional[List[str]] = None) -> np.ndarray:
+    """Fingerprint de 64 bits por linha sobre `colunas` (todas se None).
+
+    Colunas numéricas viram float64 antes do hash, pois um pedaço com nulos lê
+    inteiros como float e o mesmo valor mudaria de fingerprint entre chunks.
+    """
+    if colunas is not None:
+        df = df[[c for c in colunas if c in df.columns]]
+    numericas = df.select_dtypes(include='number').columns
+    if len(numericas) > 0:
+        df = df.astype({col: 'float64' for col in numericas})
+    # categorize=False: fatorar colunas de alta cardinalidade custa mais que o próprio hash
+    return pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy()
+
+def _diretorio_temporario(atual: Optional[Path], base: Optional[str], prefixo: str) -> Path:
+    return atual if atual is not None else Path(tempfile.mkdtemp(prefix=prefixo, dir=base))
+
+def _buscar_ordenado(chaves: np.ndarray, valores: np.ndarray,
+                     procuradas: np.ndarray) -> np.ndarray:
+    """Valor de cada chave procurada num par de arrays ordenado por chave; -1 se ausente"""
+    if len(chaves) == 0:
+        return np.full(len(procuradas), -1, dtype='int64')
+    posicoes = np.minimum(np.searchsorted(chaves, procuradas), len(chaves) - 1)
+    return np.where(chaves[posicoes] == procuradas, valores[posicoes], -1)
+
+class ConjuntoVistos:
+    """Mapa exato chave uint64 -> valor int64 com memória limitada.
+
+    As chaves ficam ordenadas em memória; ao passar de `limite_memoria` elas são
+    gravadas em disco como um run .npy e consultadas depois via memory-map com
+    busca binária. A primeira ocorrência de cada chave é a que fica.
+    """
+
+    def __init__(self, limite_memoria: int = 5_000_000, diretorio: Optional[str] = None):
+        self.limite_memoria = limite_memoria
+        self._diretorio_base = diretorio
+        self._diretorio: Optional[Path] = None
+        self._chaves = np.empty(0, dtype='uint64')
+        self._valores = np.empty(0, dtype='int64')
+        self._runs: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self._chaves) + sum(len(chaves) for chaves, _ in self._runs)
+
+    def _buscar(self, chaves: np.ndarray) -> np.ndarray:
+        encontrados = _buscar_ordenado(self._chaves, self._valores, chaves)
+        for chaves_run, valores_run in self._runs:
+            faltam = encontrados < 0
+            if not faltam.any():
+                break
+            encontrados[faltam] = _buscar_ordenado(chaves_run, valores_run, chaves[faltam])
+        return encontrados
+
+    def _despejar(self) -> None:
+        self._diretorio = _diretorio_temporario(self._diretorio, self._diretorio_base, 'dedup_')
+        base = self._diretorio / f'vistos_{len(self._runs):05d}'
+        np.save(f'{base}_chaves.npy', self._chaves)
+        np.save(f'{base}_valores.npy', self._valores)
+        self._runs.append((np.load(f'{base}_chaves.npy', mmap_mode='r'),
+                           np.load(f'{base}_valores.npy', mmap_mode='r')))
+        self._chaves = np.empty(0, dtype='uint64')
+        self._valores = np.empty(0, dtype='int64')
+
+    def buscar_e_adiciona(self, chaves: np.ndarray, valores: np.ndarray) -> np.ndarray:
+        """Valor associado à ocorrência anterior de cada chave (já guardada ou mais
+        cedo no mesmo lote); -1 na primeira ocorrência, cujo valor passa a ser guardado"""
+        chaves = np.asarray(chaves, dtype='uint64')
+        codigos, unicas = pd.factorize(chaves)
+        _, primeiras = np.unique(codigos, return_index=True)
+
+        anteriores = self._buscar(unicas)
+        novas = anteriores < 0
+        valores_unicas = np.where(novas, valores[primeiras], anteriores)
+
+        if novas.any():
+            chaves_todas = np.concatenate([self._chaves, unicas[novas]])
+            ordem = np.argsort(chaves_todas, kind='stable')
+            self._chaves = chaves_todas[ordem]
+            self._valores = np.concatenate([self._valores, valores_unicas[novas]])[ordem]
+            if len(self._chaves) >= self.limite_memoria:
+                self._despejar()
+
+        resultado = valores_unicas[codigos]
+        resultado[primeiras[novas]] = -1
+        return resultado
+
+    def contem_e_adiciona(self, chaves: np.ndarray) -> np.ndarray:
+        """Marca as chaves já vistas (antes ou mais cedo no mesmo lote) e guarda as novas"""
+        return self.buscar_e_adiciona(chaves, np.zeros(len(chaves), dtype='int64')) >= 0
+
+    def fechar(self) -> None:
+        self._runs = []
+        self._chaves = np.empty(0, dtype='uint64')
+        self._valores = np.empty(0, dtype='int64')
+        if self._diretorio is not None:
+            shutil.rmtree(self._diretorio, ignore_errors=True)
+            self._diretorio = None
+
+class FiltroBloom:
+    """Alternativa de memória fixa ao ConjuntoVistos; falsos positivos descartam
+    linhas únicas com probabilidade `taxa_falsos`"""
+
+    def __init__(self, capacidade: int = 10_000_000, taxa_falsos: float = 1e-4):
+        self.bits = max(8, int(-capacidade * math.log(taxa_falsos) / math.log(2) ** 2))
+        self.funcoes = max(1, round(self.bits / capacidade * math.log(2)))
+        self._vetor = np.zeros((self.bits + 7) // 8, dtype='uint8')
+
+    def _posicoes(self, chaves: np.ndarray) -> np.ndarray:
+        # hashing duplo: h1 + i * h2, com as metades de 32 bits da própria chave
+        h1 = chaves & MASCARA_32
+        h2 = (chaves >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.funcoes, dtype='uint64')[:, None]
+        return (h1 + i * h2) % np.uint64(self.bits)
+
+    def contem_e_adiciona(self, chaves: np.ndarray) -> np.ndarray:
+        chaves = np.asarray(chaves, dtype='uint64')
+        repetidas = pd.Series(chaves).duplicated().to_numpy().copy()
+        posicoes = self._posicoes(chaves[~repetidas])
+
+        bytes_, deslocamento = posicoes >> np.uint64(3), (posicoes & np.uint64(7)).astype('uint8')
+        ligados = (self._vetor[bytes_] >> deslocamento) & 1
+        repetidas[~repetidas] = ligados.all(axis=0).astype(bool)
+
+        np.bitwise_or.at(self._vetor, bytes_.ravel(),
+                         np.left_shift(1, deslocamento.ravel()).astype('uint8'))
+        return repetidas
+
+    def fechar(self) -> None:
+        self._vetor[:] = 0
+
+class AssinaturasEmDisco:
+    """Assinaturas MinHash por ID sequencial de linha; blocos cheios vão para disco"""
+
+    def __init__(self, limite_memoria: int = 5_000_000, diretorio: Optional[str] = None):
+        self.limite_memoria = limite_memoria
+        self._diretorio_base = diretorio
+        self._diretorio: Optional[Path] = None
+        self._blocos: List[Tuple[int, np.ndarray]] = []
+        self._memoria: Optional[np.ndarray] = None
+        self._inicio_memoria = 0
+        self.total = 0
+
+    def adicionar(self, assinaturas: np.ndarray) -> None:
+        # valores < PRIMO_MINHASH cabem em 32 bits
+        assinaturas = assinaturas.astype('uint32')
+        self._memoria = assinaturas if self._memoria is None \
+            else np.concatenate([self._memoria, assinaturas])
+        self.total += len(assinaturas)
+
+        if len(self._memoria) >= self.limite_memoria:
+            self._diretorio = _diretorio_temporario(self._diretorio, self._diretorio_base, 'minhash_')
+            caminho = self._diretorio / f'assinaturas_{len(self._blocos):05d}.npy'
+            np.save(caminho, self._memoria)
+            self._blocos.append((self._inicio_memoria, np.load(caminho, mmap_mode='r')))
+            self._memoria, self._inicio_memoria = None, self.total
+
+    def obter(self, ids: np.ndarray) -> np.ndarray:
+        blocos = self._blocos + ([(self._inicio_memoria, self._memoria)]
+                                 if self._memoria is not None else [])
+        inicios = np.array([inicio for inicio, _ in blocos], dtype='int64')
+        qual = np.searchsorted(inicios, ids, side='right') - 1
+
+        resultado = np.empty((len(ids), blocos[0][1].shape[1]), dtype='uint32')
+        for i in np.unique(qual):
+            selecionados = qual == i
+            inicio, bloco = blocos[i]
+            resultado[selecionados] = bloco[ids[selecionados] - inicio]
+        return resultado
+
+    def fechar(self) -> None:
+        self._blocos, self._memoria, self._inicio_memoria, self.total = [], None, 0, 0
+        if self._diretorio is not None:
+            shutil.rmtree(self._diretorio, ignore_errors=True)
+            self._diretorio = None
+
+class MinHashLSH:
+    """Assinaturas MinHash e chaves de banda LSH sobre os tokens de COLUNAS_QUASE.
+
+    Tokens: palavras do título, o nome da empresa inteiro e cada skill. Duas
+    linhas com similaridade de Jaccard s caem no mesmo bucket de uma banda com
+    probabilidade s ** linhas_banda; a fração de posições iguais das assinaturas
+    estima s.
+    """
+
+    def __init__(self, colunas: Optional[List[str]] = None, num_bandas: int = 16,
+                 linhas_banda: int = 4, semente: int = 42):
+        self.colunas = colunas or COLUNAS_QUASE
+        self.num_bandas = num_bandas
+        self.linhas_banda = linhas_banda
+        gerador = np.random.default_rng(semente)
+        permutacoes = num_bandas * linhas_banda
+        self._a = gerador.integers(1, int(PRIMO_MINHASH), permutacoes, dtype='uint64')
+        self._b = gerador.integers(0, int(PRIMO_MINHASH), permutacoes, dtype='uint64')
+
+    def _tokens(self, df: pd.DataFrame) -> pd.Series:
+        posicoes = np.arange(len(df))
+        partes = []
+        for coluna in self.colunas:
+            if coluna not in df.columns:
+                continue
+            texto = df[coluna].astype('string').str.lower().set_axis(posicoes)
+            if coluna == 'required_skills':
+                partes.append('s:' + texto.str.split(',').explode().str.strip())
+            elif coluna == 'job_title':
+                partes.append('t:' + texto.str.split().explode())
+            else:
+                partes.append(f'{coluna[0]}:' + texto.str.strip())
+        if not partes:
+            return pd.Series([], dtype='string')
+        tokens = pd.concat(partes)
+        return tokens[tokens.notna() & (tokens.str.len() > 2)]
+
+    def assinaturas(self, df: pd.DataFrame) -> np.ndarray:
+        """Matriz (linhas, num_bandas * linhas_banda); linhas sem tokens ficam com PRIMO_MINHASH"""
+        assinatura = np.full((len(df), len(self._a)), PRIMO_MINHASH, dtype='uint64')
+        tokens = self._tokens(df)
+        if tokens.empty:
+            return assinatura
+
+        linhas = tokens.index.to_numpy()
+        ordem = np.argsort(linhas, kind='stable')
+        linhas = linhas[ordem]
+        valores = pd.util.hash_pandas_object(tokens, index=False).to_numpy()[ordem] % PRIMO_MINHASH
+        inicios = np.flatnonzero(np.r_[True, linhas[1:] != linhas[:-1]])
+        com_tokens = linhas[inicios]
+
+        for i, (a, b) in enumerate(zip(self._a, self._b)):
+            assinatura[com_tokens, i] = np.minimum.reduceat((a * valores + b) % PRIMO_MINHASH, inicios)
+        return assinatura
+
+    def chaves_bandas(self, assinatura: np.ndarray) -> np.ndarray:
+        """Matriz (linhas, num_bandas) de chaves uint64, distintas entre bandas"""
+        n = len(assinatura)
+        chaves = np.empty((n, self.num_bandas), dtype='uint64')
+        for banda in range(self.num_bandas):
+            chave = np.full(n, banda + 1, dtype='uint64')
+            for valor in assinatura[:, banda * self.linhas_banda:(banda + 1) * self.linhas_banda].T:
+                chave = (chave * MULTIPLICADOR_FNV) ^ valor
+            chaves[:, banda] = chave
+        return chaves
+
+class Deduplicador:
+    """Remoção de duplicatas por fingerprint de um subconjunto de colunas.
+
+    `chaves(df)` não tem estado e pode rodar em processos separados;
+    `marcar_chaves` aplica os conjuntos de vistos na ordem do arquivo.
+
+    No modo 'quase', cada bucket de banda LSH aponta para a primeira linha que
+    caiu nele; esses candidatos são confirmados comparando as assinaturas
+    inteiras, e a linha é duplicata se a similaridade estimada chegar a `limiar`.
+    """
+
+    def __init__(self, logger: logging.Logger, chaves: Optional[List[str]] = None,
+                 ignorar: Optional[List[str]] = None, modo: str = 'exato', vistos: str = 'exato',
+                 limite_memoria: int = 5_000_000, diretorio_spill: Optional[str] = None,
+                 limiar: float = 0.8, num_bandas: int = 16, linhas_banda: int = 4):
+        if modo not in ('exato', 'quase'):
+            raise ValueError(f"Modo de deduplicação desconhecido: {modo}")
+        if vistos not in ('exato', 'bloom'):
+            raise ValueError(f"Conjunto de vistos desconhecido: {vistos}")
+        self.logger = logger
+        self.colunas_chave = chaves
+        self.ignorar = ignorar or []
+        self.modo = modo
+        self.vistos = vistos
+        self.limite_memoria = limite_memoria
+        self.diretorio_spill = diretorio_spill
+        self.limiar = limiar
+        self.lsh = MinHashLSH(num_bandas=num_bandas, linhas_banda=linhas_banda) \
+            if modo == 'quase' else None
+        self._exatas = None
+        self._bandas = None
+        self._assinaturas = None
+        self.reiniciar()
+
+    def parametros(self) -> Dict[str, Any]:
+        """Argumentos para recriar o mesmo Deduplicador num worker"""
+        return {'chaves': self.colunas_chave, 'ignorar': self.ignorar, 'modo': self.modo,
+                'vistos': self.vistos, 'limite_memoria': self.limite_memoria,
+                'diretorio_spill': self.diretorio_spill, 'limiar': self.limiar,
+                'num_bandas': self.lsh.num_bandas if self.lsh else 16,
+                'linhas_banda': self.lsh.linhas_banda if self.lsh else 4}
+
+    def reiniciar(self) -> None:
+        self.fechar()
+        self._exatas = FiltroBloom(self.limite_memoria) if self.vistos == 'bloom' \
+            else ConjuntoVistos(self.limite_memoria, self.diretorio_spill)
+        if self.lsh is not None:
+            # o bucket precisa devolver a linha candidata, então as bandas usam sempre o mapa exato
+            self._bandas = ConjuntoVistos(self.limite_memoria * self.lsh.num_bandas,
+                                          self.diretorio_spill)
+            self._assinaturas = AssinaturasEmDisco(self.limite_memoria, self.diretorio_spill)
+
+    def fechar(self) -> None:
+        for estrutura in (self._exatas, self._bandas, self._assinaturas):
+            if estrutura is not None:
+                estrutura.fechar()
+
+    def colunas(self, df: pd.DataFrame) -> List[str]:
+        base = self.colunas_chave or list(df.columns)
+        return [c for c in base if c in df.columns and c not in self.ignorar]
+
+    def chaves(self, df: pd.DataFrame) -> np.ndarray:
+        """Fingerprints exatos (n,) ou, no modo 'quase', (n, 1 + permutações) com a assinatura"""
+        exatas = fingerprints(df, self.colunas(df))
+        if self.lsh is None:
+            return exatas
+        return np.column_stack([exatas, self.lsh.assinaturas(df)])
+
+    def _quase_duplicadas(self, assinatura: np.ndarray) -> np.ndarray:
+        n = len(assinatura)
+        ids = np.arange(self._assinaturas.total, self._assinaturas.total + n, dtype='int64')
+        bandas = self.lsh.chaves_bandas(assinatura)
+
+        candidatos = self._bandas.buscar_e_adiciona(bandas.ravel(), np.repeat(ids, bandas.shape[1]))
+        candidatos = candidatos.reshape(n, -1)
+        self._assinaturas.adicionar(assinatura)
+
+        linhas, _ = np.nonzero(candidatos >= 0)
+        pares = np.unique(np.column_stack([linhas, candidatos[candidatos >= 0]]), axis=0)
+        # linhas sem tokens compartilham a assinatura vazia e não são comparáveis
+        pares = pares[assinatura[pares[:, 0], 0] != PRIMO_MINHASH]
+        if len(pares) == 0:
+            return np.zeros(n, dtype=bool)
+
+        similaridade = (assinatura[pares[:, 0]] == self._assinaturas.obter(pares[:, 1])).mean(axis=1)
+        quase = np.zeros(n, dtype=bool)
+        quase[pares[similaridade >= self.limiar, 0]] = True
+        return quase
+
+    def marcar_chaves(self, chaves: np.ndarray) -> np.ndarray:
+        if chaves.ndim == 1:
+            return self._exatas.contem_e_adiciona(chaves)
+
+        duplicadas = self._exatas.contem_e_adiciona(chaves[:, 0])
+        quase = self._quase_duplicadas(chaves[:, 1:]) & ~duplicadas
+        if quase.any():
+            self.logger.info(f"{int(quase.sum())} linhas quase duplicadas (MinHash/LSH)")
+        return duplicadas | quase
+
+    def marcar(self, df: pd.DataFrame) -> np.ndarray:
+        """Máscara das linhas que repetem uma linha já vista nesta execução"""
+        return self.marcar_chaves(self.chaves(df))
@@ -1,80 +1,56 @@
 
 import pandas as pd
-from sqlalchemy import create_engine, text
-import psycopg2
-import os
+import numpy as np
+import codecs
+import io
+import time
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator
 import sys
 
-def configurar_logging(nivel_log: str = "INFO", arquivo_log: Optional[str] = None) -> logging.Logger:
-    logger = logging.getLogger('ETL_Pipeline')
-    logger.setLevel(getattr(logging, nivel_log.upper()))
-    
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
-    
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [ETL] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+from configuracao_etl import configurar_logging, ConfiguracaoETL
+
+class ExtractorCSV:
     
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    ENCODINGS_FALLBACK = ['utf-8', 'latin1', 'cp1252']
+    TAMANHO_AMOSTRA_ENCODING = 1024 * 1024
     
-    if arquivo_log:
-        try:
-            Path(arquivo_log).parent.mkdir(parents=True, exist_ok=True)
-            file_handler = logging.FileHandler(arquivo_log, encoding='utf-8')
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-        except Exception as e:
-            logger.warning(f"Não foi possível criar arquivo de log {arquivo_log}: {e}")
+    def __init__(self, logger: logging.Logger, cache: Optional[Any] = None):
+        self.logger = logger
+        # CacheColunar opcional: evita reparsear o CSV quando o arquivo não mudou
+        self.cache = cache
     
-    return logger
-
-class ConfiguracaoETL:
+    def _encodings_candidatos(self, encoding: str) -> list:
+        candidatos = [encoding] + self.ENCODINGS_FALLBACK
+        return list(dict.fromkeys(candidatos))
     
-    def __init__(self):
-        self.logger = configurar_logging()
-        self._carregar_credenciais_db()
-        self._configurar_parametros()
+    @staticmethod
+    def dtypes_leitura() -> Dict[str, str]:
+        # colunas ausentes no arquivo são ignoradas pelo read_csv
+        return {col: 'category' for col in TransformadorDados.COLUNAS_CATEGORIA}
     
-    def _carregar_credenciais_db(self) -> None:
-        try:
-            from connection import (
-                DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT
-            )
-            self.bd_host = DB_HOST
-            self.bd_nome = DB_NAME
-            self.bd_usuario = DB_USER
-            self.bd_senha = DB_PASSWORD
-            self.bd_porta = DB_PORT
-            self.logger.info("Credenciais do banco carregadas do módulo connection")
-            
-        except ImportError as e:
-            self.logger.warning(f"Não foi possível importar credenciais de 'connection.py': {e}")
-            self.logger.info("Usando credenciais padrão (desenvolvimento)")
-            
-            self.bd_host = os.getenv('DB_HOST', 'localhost')
-            self.bd_nome = os.getenv('DB_NAME', 'postgres')
-            self.bd_usuario = os.getenv('DB_USER', 'postgres')
-            self.bd_senha = os.getenv('DB_PASSWORD', '123')
-            self.bd_porta = os.getenv('DB_PORT', '5432')
-    
-    def _configurar_parametros(self) -> None:
-        """Configura parâmetros do ETL"""
-        self.caminho_csv = os.getenv('CAMINHO_CSV', '../desafio100dias/arquivos_diversos/ai_job_dataset.csv')
-        self.nome_tabela = os.getenv('NOME_TABELA', 'ai_jobs')
-        self.encoding_csv = os.getenv('ENCODING_CSV', 'utf-8')
-
-class ExtractorCSV:
+    def detectar_encoding(self, caminho_csv: str, encoding: str = 'utf-8') -> str:
+        """Detecta o encoding a partir de uma amostra dos bytes iniciais do arquivo"""
+        with open(caminho_csv, 'rb') as arquivo:
+            amostra = arquivo.read(self.TAMANHO_AMOSTRA_ENCODING)
+        
+        candidatos = self._encodings_candidatos(encoding)
+        for enc in candidatos:
+            try:
+                # decoder incremental tolera um caractere multibyte cortado no fim da amostra
+                codecs.getincrementaldecoder(enc)().decode(amostra, final=False)
+                self.logger.debug(f"Encoding detectado pela amostra: '{enc}'")
+                return enc
+            except (UnicodeDecodeError, LookupError):
+                continue
+        
+        return candidatos[-1]
     
-    def __init__(self, logger: logging.Logger):
-        self.logger = logger
+    def ler_colunas(self, caminho_csv: str, encoding: str = 'utf-8') -> list:
+        enc = self.detectar_encoding(caminho_csv, encoding)
+        return list(pd.read_csv(caminho_csv, encoding=enc, nrows=0).columns)
     
     def extrair_dados(self, caminho_csv: str, encoding: str = 'utf-8') -> Optional[pd.DataFrame]:
 
@@ -84,13 +60,22 @@ class ExtractorCSV:
             if not Path(caminho_csv).exists():
                 raise FileNotFoundError(f"Arquivo não encontrado: {caminho_csv}")
             
-            encodings_tentar = [encoding, 'utf-8', 'latin1', 'cp1252']
+            if self.cache is not None:
+                df = self.cache.carregar(caminho_csv, list(self.dtypes_leitura()))
+                if df is not None:
+                    return df
+            
+            # o encoding detectado vai primeiro; os demais só são usados se a amostra enganar
+            enc_detectado = self.detectar_encoding(caminho_csv, encoding)
+            encodings_tentar = self._encodings_candidatos(enc_detectado)
             
             for enc in encodings_tentar:
                 try:
-                    df = pd.read_csv(caminho_csv, encoding=enc)
+                    df = pd.read_csv(caminho_csv, encoding=enc, dtype=self.dtypes_leitura())
                     self.logger.info(f"Dados extraídos com sucesso usando encoding '{enc}': "
                                    f"{df.shape[0]} linhas, {df.shape[1]} colunas")
+                    if self.cache is not None:
+                        self.cache.salvar(caminho_csv, df)
                     return df
                 except UnicodeDecodeError:
                     if enc == encodings_tentar[-1]:
@@ -107,13 +92,160 @@ class ExtractorCSV:
             self.logger.error(f"Erro inesperado na extração: {e}")
         
         return None
+    
+    def extrair_dados_em_chunks(self, caminho_csv: str, encoding: str = 'utf-8',
+                                tamanho_chunk: int = 50000,
+                                usecols: Optional[Any] = None) -> Iterator[pd.DataFrame]:
+        """Lê o CSV em DataFrames de no máximo `tamanho_chunk` linhas.
+
+        Com cache, os chunks (só as colunas de `usecols`) vêm do snapshot Arrow
+        quando ele vale para o arquivo; senão uma leitura de todas as colunas
+        grava o snapshot enquanto passa. O encoding é detectado uma única vez
+        pela amostra inicial. Erros são registrados e propagados, para que uma
+        carga parcial não passe por sucesso.
+        """
+        self.logger.info(f"Iniciando extração em chunks de {tamanho_chunk} linhas: {caminho_csv}")
+        gravador = None
+        
+        try:
+            if not Path(caminho_csv).exists():
+                raise FileNotFoundError(f"Arquivo não encontrado: {caminho_csv}")
+            
+            if self.cache is not None:
+                chunks = self.cache.carregar_em_chunks(caminho_csv, tamanho_chunk, usecols,
+                                                       categorias=list(self.dtypes_leitura()))
+                if chunks is not None:
+                    yield from chunks
+                    return
+                # uma projeção não serve de snapshot: só a leitura completa o grava
+                if usecols is None:
+                    gravador = self.cache.gravador(caminho_csv)
+            
+            enc = self.detectar_encoding(caminho_csv, encoding)
+            total_linhas = 0
+            
+            with pd.read_csv(caminho_csv, encoding=enc, chunksize=tamanho_chunk,
+                             usecols=usecols, dtype=self.dtypes_leitura()) as leitor:
+                for numero, chunk in enumerate(leitor, start=1):
+                    total_linhas += len(chunk)
+                    self.logger.debug(f"Chunk {numero} extraído: {len(chunk)} linhas")
+                    if gravador is not None:
+                        gravador.adicionar(chunk)
+                    yield chunk
+            
+            self.logger.info(f"Extração em chunks concluída usando encoding '{enc}': "
+                           f"{total_linhas} linhas")
+            if gravador is not None:
+                gravador.concluir()
+            
+        except FileNotFoundError as e:
+            self.logger.error(f"Arquivo CSV não encontrado: {e}")
+            raise
+        except pd.errors.EmptyDataError:
+            self.logger.error("Arquivo CSV está vazio")
+            raise
+        except (pd.errors.ParserError, UnicodeDecodeError) as e:
+            self.logger.error(f"Erro ao parsear CSV em chunks: {e}")
+            raise
+        finally:
+            # leitura interrompida (erro ou consumidor que parou antes do fim): nada é publicado
+            if gravador is not None and gravador.ativo:
+                gravador.descartar()
 
 class TransformadorDados:
     
-    def __init__(self, logger: logging.Logger):
+    COLUNA_SALARIO = 'salary_in_usd'
+    
+    COLUNAS_CATEGORICAS = ['employment_type', 'company_location', 'job_title', 
+                           'experience_level', 'company_size', 'company_residence', 
+                           'work_setting']
+    
+    COLUNAS_TEXTO = ['job_title', 'experience_level', 'employment_type', 
+                     'company_location', 'company_size', 'company_residence', 
+                     'work_setting']
+    
+    # colunas de baixa cardinalidade lidas já como 'category' pelo ExtractorCSV
+    COLUNAS_CATEGORIA = ['experience_level', 'employment_type', 'company_size',
+                         'company_location', 'industry', 'education_required']
+    
+    def __init__(self, logger: logging.Logger, deduplicador: Optional[Any] = None):
+        from deduplicacao import Deduplicador
+        
         self.logger = logger
+        # sem configuração, compara a linha inteira como o antigo drop_duplicates
+        self.deduplicador = deduplicador or Deduplicador(logger)
+        self.iniciar_streaming()
+    
+    def iniciar_streaming(self, valores_preenchimento: Optional[Dict[str, Any]] = None) -> None:
+        """Reinicia o estado compartilhado entre chunks de uma mesma execução"""
+        self._valores_preenchimento = valores_preenchimento or {}
+        self.deduplicador.reiniciar()
+    
+    def colunas_preenchimento(self) -> list:
+        return [self.COLUNA_SALARIO] + self.COLUNAS_CATEGORICAS
+    
+    def estatisticas_parciais(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Fase map das estatísticas de preenchimento de um pedaço do arquivo"""
+        estatisticas: Dict[str, Any] = {'contagens': {}}
+        
+        if self.COLUNA_SALARIO in df.columns:
+            estatisticas['salarios'] = (pd.to_numeric(df[self.COLUNA_SALARIO], errors='coerce')
+                                        .dropna().to_numpy())
+        
+        for col in self.COLUNAS_CATEGORICAS:
+            if col in df.columns:
+                estatisticas['contagens'][col] = df[col].value_counts()
+        
+        return estatisticas
+    
+    def reduzir_estatisticas(self, parciais: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combina estatísticas parciais em mediana e modas globais exatas.
+
+        As modas vêm da soma dos `value_counts` (memória limitada pela
+        cardinalidade); a mediana guarda apenas a coluna numérica de salário.
+        """
+        contagens: Dict[str, pd.Series] = {}
+        salarios = []
+        
+        for parcial in parciais:
+            if 'salarios' in parcial:
+                salarios.append(parcial['salarios'])
+            for col, contagem in parcial['contagens'].items():
+                contagens[col] = (contagem if col not in contagens
+                                  else contagens[col].add(contagem, fill_value=0))
+        
+        valores_preenchimento: Dict[str, Any] = {}
+        
+        if salarios:
+            mediana = pd.Series(np.concatenate(salarios)).median()
+            if not pd.isna(mediana):
+                valores_preenchimento[self.COLUNA_SALARIO] = mediana
+        
+        for col, contagem in contagens.items():
+            contagem = contagem[contagem > 0]
+            if not contagem.empty:
+                # mesmo desempate de Series.mode(): menor valor entre os mais frequentes
+                valores_preenchimento[col] = sorted(contagem[contagem == contagem.max()].index)[0]
+        
+        self.logger.info(f"Valores de preenchimento calculados: {valores_preenchimento}")
+        return valores_preenchimento
+    
+    def calcular_valores_preenchimento(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """Calcula mediana e modas globais percorrendo os chunks uma vez"""
+        return self.reduzir_estatisticas(self.estatisticas_parciais(chunk) for chunk in chunks)
     
-    def transformar_dados(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    def transformar_chunk(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Transforma um chunk usando o estado definido em `iniciar_streaming`.
+
+        Duplicatas são removidas também entre chunks, comparando hashes de linha.
+        """
+        df = self._tratar_valores_nulos(df, self._valores_preenchimento)
+        df = self._remover_duplicatas_entre_chunks(df)
+        df = self._padronizar_dados(df)
+        return df
+    
+    def transformar_dados(self, df: pd.DataFrame, copiar: bool = True) -> Optional[pd.DataFrame]:
+        """Aplica as transformações; com `copiar=False` o DataFrame recebido é alterado no lugar"""
 
         if df is None or df.empty:
             self.logger.warning("DataFrame de entrada é nulo ou vazio")
@@ -122,7 +254,7 @@ class TransformadorDados:
         self.logger.info("Iniciando transformação de dados")
         
         try:
-            df_transformado = df.copy()
+            df_transformado = df.copy() if copiar else df
             
             df_transformado = self._tratar_valores_nulos(df_transformado)
             
@@ -130,7 +262,10 @@ class TransformadorDados:
             
             df_transformado = self._padronizar_dados(df_transformado)
             
-            df_transformado = self._validar_dados_finais(df_transformado)
+            # _tratar_valores_nulos termina com dropna, então não há nulos a recontar
+            df_transformado = self._validar_dados_finais(df_transformado, nulos_conhecidos=0)
+            if df_transformado is None:
+                return None
             
             self.logger.info(f"Transformação concluída: {df_transformado.shape[0]} linhas, "
                            f"{df_transformado.shape[1]} colunas")
@@ -140,10 +275,13 @@ class TransformadorDados:
             self.logger.error(f"Erro durante transformação: {e}")
             return None
     
-    def _tratar_valores_nulos(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _tratar_valores_nulos(self, df: pd.DataFrame,
+                              valores_preenchimento: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
         self.logger.info("Tratando valores nulos")
+        valores_preenchimento = valores_preenchimento or {}
         
-        nulos_inicial = df.isnull().sum()
+        # uma única passada de contagem de nulos serve para todas as decisões abaixo
+        nulos_inicial = pd.Series(df.isna().to_numpy().sum(axis=0), index=df.columns)
         colunas_com_nulos = nulos_inicial[nulos_inicial > 0]
         
         if len(colunas_com_nulos) > 0:
@@ -151,27 +289,32 @@ class TransformadorDados:
         
         if 'salary_in_usd' in df.columns:
             df['salary_in_usd'] = pd.to_numeric(df['salary_in_usd'], errors='coerce')
-            if df['salary_in_usd'].isnull().any():
-                mediana = df['salary_in_usd'].median()
+            nulos_inicial['salary_in_usd'] = df['salary_in_usd'].isna().sum()
+            if nulos_inicial['salary_in_usd'] > 0:
+                mediana = valores_preenchimento.get('salary_in_usd', df['salary_in_usd'].median())
                 if not pd.isna(mediana):
-                    df['salary_in_usd'].fillna(mediana, inplace=True)
+                    df['salary_in_usd'] = df['salary_in_usd'].fillna(mediana)
+                    nulos_inicial['salary_in_usd'] = 0
                     self.logger.info(f"Valores nulos em salary_in_usd preenchidos com mediana: {mediana}")
         
-        colunas_categoricas = ['employment_type', 'company_location', 'job_title', 
-                              'experience_level', 'company_size', 'company_residence', 
-                              'work_setting']
-        
-        for col in colunas_categoricas:
-            if col in df.columns and df[col].isnull().any():
+        for col in self.COLUNAS_CATEGORICAS:
+            if col in df.columns and nulos_inicial[col] > 0:
                 try:
-                    moda = df[col].mode()[0]
-                    df[col].fillna(moda, inplace=True)
+                    moda = (valores_preenchimento[col] if col in valores_preenchimento
+                            else df[col].mode()[0])
+                    if (isinstance(df[col].dtype, pd.CategoricalDtype)
+                            and moda not in df[col].cat.categories):
+                        # a moda global pode não aparecer neste chunk/partição
+                        df[col] = df[col].cat.add_categories([moda])
+                    df[col] = df[col].fillna(moda)
+                    nulos_inicial[col] = 0
                     self.logger.info(f"Valores nulos em {col} preenchidos com moda: {moda}")
-                except (IndexError, KeyError):
+                except (IndexError, KeyError, TypeError, ValueError):
                     self.logger.warning(f"Não foi possível calcular moda para {col}")
         
         linhas_antes = len(df)
-        df.dropna(inplace=True)
+        if nulos_inicial.sum() > 0:
+            df.dropna(inplace=True)
         linhas_removidas = linhas_antes - len(df)
         
         if linhas_removidas > 0:
@@ -182,35 +325,75 @@ class TransformadorDados:
     def _remover_duplicatas(self, df: pd.DataFrame) -> pd.DataFrame:
         self.logger.info("Removendo duplicatas")
         
-        linhas_antes = len(df)
-        df.drop_duplicates(inplace=True)
-        duplicatas_removidas = linhas_antes - len(df)
+        # arquivo inteiro: conjunto de vistos novo, descartado ao final
+        self.deduplicador.reiniciar()
+        duplicadas = self.deduplicador.marcar(df)
+        self.deduplicador.reiniciar()
         
+        duplicatas_removidas = int(duplicadas.sum())
         if duplicatas_removidas > 0:
             self.logger.info(f"Removidas {duplicatas_removidas} linhas duplicadas")
-        else:
-            self.logger.info("Nenhuma duplicata encontrada")
+            return df[~duplicadas]
         
+        self.logger.info("Nenhuma duplicata encontrada")
         return df
     
+    def _remover_duplicatas_entre_chunks(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.logger.info("Removendo duplicatas (entre chunks)")
+        
+        duplicadas = self.deduplicador.marcar(df)
+        
+        duplicatas_removidas = int(duplicadas.sum())
+        if duplicatas_removidas > 0:
+            self.logger.info(f"Removidas {duplicatas_removidas} linhas duplicadas")
+        
+        return df[~duplicadas]
+    
+    @staticmethod
+    def hash_linhas(df: pd.DataFrame) -> pd.Series:
+        """Hash de 64 bits por linha, estável entre chunks e partições"""
+        from deduplicacao import fingerprints
+        return pd.Series(fingerprints(df), index=df.index)
+    
     def _padronizar_dados(self, df: pd.DataFrame) -> pd.DataFrame:
         self.logger.info("Padronizando dados")
         
-        colunas_texto = ['job_title', 'experience_level', 'employment_type', 
-                        'company_location', 'company_size', 'company_residence', 
-                        'work_setting']
-        
-        for col in colunas_texto:
-            if col in df.columns and df[col].dtype == 'object':
+        for col in dict.fromkeys(self.COLUNAS_TEXTO + self.COLUNAS_CATEGORIA):
+            if col not in df.columns:
+                continue
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = self._padronizar_categorias(df[col])
+                self.logger.debug(f"Categorias da coluna {col} padronizadas")
+            elif pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
                 df[col] = df[col].astype(str).str.lower().str.strip()
                 self.logger.debug(f"Coluna {col} padronizada")
         
         return df
     
-    def _validar_dados_finais(self, df: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _padronizar_categorias(serie: pd.Series) -> pd.Series:
+        """Normaliza só os rótulos das categorias e remapeia os códigos.
+
+        Rótulos que passam a coincidir (ex.: 'SE' e ' se') são fundidos.
+        """
+        categorias = serie.cat.categories
+        rotulos = pd.Index(categorias.astype(str).str.lower().str.strip())
+        novas_categorias = rotulos.unique()
+        
+        if len(novas_categorias) == len(categorias):
+            return serie.cat.rename_categories(novas_categorias)
+        
+        mapa_codigos = np.append(novas_categorias.get_indexer(rotulos), -1)
+        codigos = mapa_codigos[serie.cat.codes.to_numpy()]
+        return pd.Series(pd.Categorical.from_codes(codigos, categories=novas_categorias),
+                         index=serie.index, name=serie.name)
+    
+    def _validar_dados_finais(self, df: pd.DataFrame,
+                              nulos_conhecidos: Optional[int] = None) -> pd.DataFrame:
         self.logger.info("Validando dados finais")
         
-        nulos_finais = df.isnull().sum().sum()
+        nulos_finais = (df.isna().to_numpy().sum() if nulos_conhecidos is None
+                        else nulos_conhecidos)
         if nulos_finais > 0:
             self.logger.warning(f"Ainda existem {nulos_finais} valores nulos após transformação")
         
@@ -227,20 +410,29 @@ class ConectorBancoDados:
         self.config = config
         self.logger = config.logger
         self.engine = None
+        self.gerenciador = None
+        self._particoes_criadas = set()
+        self._estrutura_carga = {'particionada': False, 'skills': False}
+        # total de linhas gravadas por cargas confirmadas; a instrumentação mede a diferença por etapa
+        self.linhas_gravadas = 0
+        # watermark lido no início da carga retomável incremental; fixo até finalizar_carga_retomavel
+        self._watermark_carga = None
     
     def conectar(self) -> bool:
 
         self.logger.info("Conectando ao banco de dados PostgreSQL")
         
         try:
-            string_conexao = (f'postgresql+psycopg2://{self.config.bd_usuario}:'
-                            f'{self.config.bd_senha}@{self.config.bd_host}:'
-                            f'{self.config.bd_porta}/{self.config.bd_nome}')
-            
-            self.engine = create_engine(string_conexao, pool_pre_ping=True)
-            
-            with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            from gerenciador_conexoes import obter_gerenciador
+
+            # engine compartilhado no processo: execuções seguintes reaproveitam conexões abertas
+            self.gerenciador = obter_gerenciador(self.config.bd_host, self.config.bd_porta,
+                                                 self.config.bd_usuario, self.config.bd_senha)
+            self.engine = self.gerenciador.engine(self.config.bd_nome)
+
+            # o pool valida a conexão com pre-ping no checkout; não há SELECT 1 explícito
+            with self.gerenciador.conexao(self.config.bd_nome):
+                pass
             
             self.logger.info("Conexão com banco de dados estabelecida com sucesso")
             return True
@@ -262,7 +454,10 @@ class ConectorBancoDados:
         self.logger.info(f"Carregando {len(df)} registros na tabela '{nome_tabela}'")
         
         try:
+            inicio = time.perf_counter()
             df.to_sql(nome_tabela, self.engine, if_exists='replace', index=False)
+            self._registrar_vazao('to_sql', len(df), time.perf_counter() - inicio)
+            self.linhas_gravadas += len(df)
             self.logger.info(f"Dados carregados com sucesso na tabela '{nome_tabela}'")
             return True
             
@@ -270,19 +465,650 @@ class ConectorBancoDados:
             self.logger.error(f"Erro ao carregar dados: {e}")
             return False
     
+    def _registrar_vazao(self, metodo: str, registros: int, segundos: float) -> None:
+        vazao = registros / segundos if segundos > 0 else float('inf')
+        self.logger.info(f"Carga via {metodo}: {registros} registros em {segundos:.2f}s "
+                       f"({vazao:,.0f} linhas/s)")
+    
+    def _preparar_para_jobs_ai(self, df: pd.DataFrame) -> tuple:
+        """Ajusta o DataFrame às colunas e tipos da tabela criada por dbcreate.DDL_JOBS_AI"""
+        from dbcreate import colunas_jobs_ai
+        
+        tipos = colunas_jobs_ai()
+        colunas = [c for c in tipos if c in df.columns]
+        df_tabela = df[colunas]
+        ajustes = {}
+        
+        for col in colunas:
+            tipo = tipos[col]
+            serie = df_tabela[col]
+            if col == 'job_id' and not pd.api.types.is_integer_dtype(serie):
+                # 'AI00001' -> 1, compatível com a chave SERIAL
+                ajustes[col] = (serie.astype(str).str.extract(r'(\d+)', expand=False)
+                                .astype('Int64'))
+            elif tipo in ('INT', 'SERIAL') and pd.api.types.is_float_dtype(serie):
+                # evita '9.0' no CSV, que o PostgreSQL rejeita em colunas INT
+                ajustes[col] = serie.astype('Int64')
+        
+        if ajustes:
+            df_tabela = df_tabela.assign(**ajustes)
+        return df_tabela, colunas
+    
+    def _copiar_tabela(self, cursor, df_tabela: pd.DataFrame, colunas: list, nome_tabela: str) -> int:
+        from psycopg2 import sql
+        
+        buffer = io.StringIO()
+        df_tabela.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        
+        comando = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+            sql.Identifier(nome_tabela),
+            sql.SQL(', ').join(map(sql.Identifier, colunas))
+        )
+        cursor.copy_expert(comando, buffer)
+        return len(df_tabela)
+    
+    def _ler_estrutura(self, cursor, nome_tabela: str) -> Dict[str, bool]:
+        """Descobre se a tabela é particionada e se job_skills existe no banco"""
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)), "
+            "to_regclass('job_skills') IS NOT NULL",
+            (nome_tabela,)
+        )
+        particionada, skills = cursor.fetchone()
+        self._particoes_criadas = set()
+        return {'particionada': bool(particionada), 'skills': bool(skills)}
+    
+    def _garantir_particoes(self, cursor, df_tabela: pd.DataFrame, nome_tabela: str,
+                            estrutura: Dict[str, bool]) -> None:
+        """Cria as partições mensais que o chunk vai precisar antes do COPY/INSERT"""
+        if not estrutura['particionada'] or 'posting_date' not in df_tabela.columns:
+            return
+        from dbcreate import ddl_particao_mensal
+        
+        datas = pd.to_datetime(df_tabela['posting_date'], errors='coerce').dropna()
+        for mes in datas.dt.to_period('M').unique():
+            if mes in self._particoes_criadas:
+                continue
+            cursor.execute(ddl_particao_mensal(nome_tabela, mes.start_time.date()))
+            self._particoes_criadas.add(mes)
+    
+    def _preencher_skills(self, cursor, nome_tabela: str, somente_staging: bool = False) -> None:
+        """Normaliza required_skills em job_skills direto no servidor, sem voltar ao Python"""
+        from psycopg2 import sql
+        
+        filtro = sql.SQL("")
+        if somente_staging:
+            # vagas reenviadas trocam o conjunto inteiro de skills
+            cursor.execute("DELETE FROM job_skills "
+                           "WHERE job_id IN (SELECT job_id FROM staging_incremental)")
+            filtro = sql.SQL("AND t.job_id IN (SELECT job_id FROM staging_incremental)")
+        
+        cursor.execute(
+            sql.SQL("INSERT INTO job_skills (job_id, skill) "
+                    "SELECT DISTINCT t.job_id, left(lower(btrim(s.skill)), 100) "
+                    "FROM {} t, unnest(string_to_array(t.required_skills, ',')) AS s(skill) "
+                    "WHERE btrim(s.skill) <> '' {} "
+                    "ON CONFLICT DO NOTHING").format(sql.Identifier(nome_tabela), filtro)
+        )
+    
+    def carregar_dados_copy(self, df: pd.DataFrame, nome_tabela: str) -> bool:
+        """Substitui o conteúdo da tabela tipada via COPY FROM STDIN numa única transação"""
+        return self.carregar_chunks_copy([df], nome_tabela)
+    
+    def carregar_chunks_copy(self, chunks: Iterable[pd.DataFrame], nome_tabela: str) -> bool:
+        """Faz TRUNCATE e envia cada chunk com COPY; o commit acontece só no final"""
+        from psycopg2 import sql
+        
+        if self.engine is None:
+            self.logger.error("Conexão com banco não estabelecida")
+            return False
+        
+        self.logger.info(f"Carregando dados via COPY na tabela tipada '{nome_tabela}'")
+        
+        conexao = self.engine.raw_connection()
+        total_registros = 0
+        inicio = time.perf_counter()
+        
+        try:
+            with conexao.cursor() as cursor:
+                estrutura = self._ler_estrutura(cursor, nome_tabela)
+                tabelas = [nome_tabela] + (['job_skills'] if estrutura['skills'] else [])
+                cursor.execute(sql.SQL("TRUNCATE {}").format(
+                    sql.SQL(', ').join(map(sql.Identifier, tabelas))))
+                
+                for numero, chunk in enumerate(chunks, start=1):
+                    if chunk is None or chunk.empty:
+                        continue
+                    df_tabela, colunas = self._preparar_para_jobs_ai(chunk)
+                    self._garantir_particoes(cursor, df_tabela, nome_tabela, estrutura)
+                    total_registros += self._copiar_tabela(cursor, df_tabela, colunas, nome_tabela)
+                    self.logger.debug(f"Chunk {numero} copiado (total {total_registros})")
+                
+                # job_id veio explícito no COPY; a sequência do SERIAL precisa acompanhar
+                cursor.execute(
+                    sql.SQL("SELECT setval(pg_get_serial_sequence(%s, 'job_id'), "
+                            "COALESCE(MAX(job_id), 1)) FROM {}").format(sql.Identifier(nome_tabela)),
+                    (nome_tabela,)
+                )
+                if estrutura['skills'] and total_registros > 0:
+                    self._preencher_skills(cursor, nome_tabela)
+            
+            if total_registros == 0:
+                conexao.rollback()
+                self.logger.warning("Nenhum registro carregado: todos os chunks estavam vazios")
+                return False
+            
+            conexao.commit()
+            self._registrar_vazao('COPY', total_registros, time.perf_counter() - inicio)
+            self.linhas_gravadas += total_registros
+            self.logger.info(f"Dados carregados com sucesso na tabela '{nome_tabela}': "
+                           f"{total_registros} registros")
+            return True
+            
+        except Exception as e:
+            conexao.rollback()
+            self.logger.error(f"Erro ao carregar dados via COPY: {e}")
+            return False
+        finally:
+            conexao.close()
+    
+    def _preparar_controle_incremental(self, cursor, nome_tabela: str) -> None:
+        from psycopg2 import sql
+        
+        cursor.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS content_hash BIGINT")
+                       .format(sql.Identifier(nome_tabela)))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS etl_watermark (
+                tabela VARCHAR(100) PRIMARY KEY,
+                ultima_posting_date DATE,
+                atualizado_em TIMESTAMP DEFAULT now()
+            )
+        """)
+    
+    def _ler_watermark(self, cursor, nome_tabela: str) -> Optional[pd.Timestamp]:
+        cursor.execute("SELECT ultima_posting_date FROM etl_watermark WHERE tabela = %s",
+                       (nome_tabela,))
+        linha = cursor.fetchone()
+        if linha is None or linha[0] is None:
+            return None
+        return pd.Timestamp(linha[0])
+    
+    def _gravar_watermark(self, cursor, nome_tabela: str, data: pd.Timestamp) -> None:
+        cursor.execute(
+            """
+            INSERT INTO etl_watermark (tabela, ultima_posting_date, atualizado_em)
+            VALUES (%s, %s, now())
+            ON CONFLICT (tabela) DO UPDATE
+            SET ultima_posting_date = GREATEST(etl_watermark.ultima_posting_date,
+                                               EXCLUDED.ultima_posting_date),
+                atualizado_em = EXCLUDED.atualizado_em
+            """,
+            (nome_tabela, data.date())
+        )
+    
+    @staticmethod
+    def _com_content_hash(df_tabela: pd.DataFrame) -> pd.DataFrame:
+        hashes = pd.util.hash_pandas_object(df_tabela, index=False)
+        return df_tabela.assign(content_hash=hashes.to_numpy().view('int64'))
+    
+    def _ids_alterados(self, cursor, df_antigos: pd.DataFrame, nome_tabela: str) -> set:
+        """job_ids cujo hash difere do gravado (ou que não existem), comparados no servidor.
+
+        Só (job_id, content_hash) do chunk sobem para staging_hashes e só os ids
+        alterados voltam, em vez de baixar os hashes da tabela inteira.
+        """
+        from psycopg2 import sql
+        
+        cursor.execute("TRUNCATE staging_hashes")
+        self._copiar_tabela(cursor, df_antigos[['job_id', 'content_hash']],
+                            ['job_id', 'content_hash'], 'staging_hashes')
+        cursor.execute(
+            sql.SQL("SELECT DISTINCT s.job_id FROM staging_hashes s LEFT JOIN {} t ON t.job_id = s.job_id "
+                    "WHERE t.content_hash IS DISTINCT FROM s.content_hash")
+            .format(sql.Identifier(nome_tabela))
+        )
+        return {linha[0] for linha in cursor.fetchall()}
+    
+    def _filtrar_alterados(self, cursor, df_tabela: pd.DataFrame, nome_tabela: str,
+                           watermark: Optional[pd.Timestamp]) -> pd.DataFrame:
+        if watermark is None or 'posting_date' not in df_tabela.columns:
+            return df_tabela
+        
+        datas = pd.to_datetime(df_tabela['posting_date'], errors='coerce')
+        novos = (datas > watermark).to_numpy()
+        if novos.all():
+            return df_tabela
+        # linhas até o watermark só seguem se o conteúdo mudou
+        alterados = self._ids_alterados(cursor, df_tabela[~novos], nome_tabela)
+        return df_tabela[novos | df_tabela['job_id'].isin(alterados).to_numpy()]
+    
+    def carregar_dados_incremental(self, df: pd.DataFrame, nome_tabela: str) -> bool:
+        return self.carregar_chunks_incremental([df], nome_tabela)
+    
+    def carregar_chunks_incremental(self, chunks: Iterable[pd.DataFrame], nome_tabela: str) -> bool:
+        """Upsert por job_id via tabela de staging, enviando só linhas novas ou alteradas.
+
+        Linhas com posting_date acima do watermark da última execução são novas;
+        as demais só seguem para o merge se o hash de conteúdo mudou, o que é
+        comparado no servidor contra staging_hashes. Tudo ocorre
+        numa transação, então leitores nunca veem a tabela vazia. Linhas que
+        saíram do arquivo não são removidas.
+        """
+        from psycopg2 import sql
+        
+        if self.engine is None:
+            self.logger.error("Conexão com banco não estabelecida")
+            return False
+        
+        self.logger.info(f"Carga incremental (upsert por job_id) na tabela '{nome_tabela}'")
+        
+        conexao = self.engine.raw_connection()
+        total_lidos = 0
+        total_enviados = 0
+        maior_data = None
+        colunas = None
+        inicio = time.perf_counter()
+        
+        try:
+            with conexao.cursor() as cursor:
+                self._preparar_controle_incremental(cursor, nome_tabela)
+                estrutura = self._ler_estrutura(cursor, nome_tabela)
+                watermark = self._ler_watermark(cursor, nome_tabela)
+                self.logger.info(f"Watermark atual de posting_date: {watermark}")
+                
+                cursor.execute(
+                    sql.SQL("CREATE TEMP TABLE staging_incremental (LIKE {}) ON COMMIT DROP")
+                    .format(sql.Identifier(nome_tabela))
+                )
+                cursor.execute("CREATE TEMP TABLE staging_hashes (job_id INT, content_hash BIGINT) "
+                               "ON COMMIT DROP")
+                
+                for chunk in chunks:
+                    if chunk is None or chunk.empty:
+                        continue
+                    
+                    df_tabela, colunas = self._preparar_para_jobs_ai(chunk)
+                    df_tabela = self._com_content_hash(df_tabela)
+                    total_lidos += len(df_tabela)
+                    
+                    if 'posting_date' in df_tabela.columns:
+                        data_chunk = pd.to_datetime(df_tabela['posting_date'], errors='coerce').max()
+                        if not pd.isna(data_chunk):
+                            maior_data = data_chunk if maior_data is None else max(maior_data, data_chunk)
+                    
+                    df_alterados = self._filtrar_alterados(cursor, df_tabela, nome_tabela, watermark)
+                    if not df_alterados.empty:
+                        self._garantir_particoes(cursor, df_alterados, nome_tabela, estrutura)
+                        total_enviados += self._copiar_tabela(
+                            cursor, df_alterados, colunas + ['content_hash'], 'staging_incremental'
+                        )
+                
+                if colunas is None:
+                    conexao.rollback()
+                    self.logger.warning("Nenhum registro recebido para a carga incremental")
+                    return False
+                
+                if total_enviados > 0:
+                    # na tabela particionada a chave única inclui posting_date
+                    chave = ['job_id', 'posting_date'] if estrutura['particionada'] else ['job_id']
+                    if estrutura['particionada']:
+                        # vaga que mudou de mês sairia duplicada: remove a versão antiga
+                        cursor.execute(
+                            sql.SQL("DELETE FROM {} t USING staging_incremental s "
+                                    "WHERE t.job_id = s.job_id AND t.posting_date <> s.posting_date")
+                            .format(sql.Identifier(nome_tabela))
+                        )
+                    
+                    colunas_merge = colunas + ['content_hash']
+                    atualizacoes = sql.SQL(', ').join(
+                        sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c))
+                        for c in colunas_merge if c not in chave
+                    )
+                    lista_colunas = sql.SQL(', ').join(map(sql.Identifier, colunas_merge))
+                    cursor.execute(
+                        sql.SQL("INSERT INTO {tabela} ({colunas}) "
+                                "SELECT DISTINCT ON (job_id) {colunas} FROM staging_incremental "
+                                "ORDER BY job_id "
+                                "ON CONFLICT ({chave}) DO UPDATE SET {atualizacoes}").format(
+                            tabela=sql.Identifier(nome_tabela),
+                            colunas=lista_colunas,
+                            chave=sql.SQL(', ').join(map(sql.Identifier, chave)),
+                            atualizacoes=atualizacoes
+                        )
+                    )
+                    if estrutura['skills']:
+                        self._preencher_skills(cursor, nome_tabela, somente_staging=True)
+                
+                if maior_data is not None and (watermark is None or maior_data > watermark):
+                    self._gravar_watermark(cursor, nome_tabela, maior_data)
+            
+            conexao.commit()
+            self._registrar_vazao('upsert incremental', total_lidos, time.perf_counter() - inicio)
+            self.linhas_gravadas += total_enviados
+            self.logger.info(f"Carga incremental concluída: {total_enviados} de {total_lidos} "
+                           f"registros novos ou alterados")
+            return True
+            
+        except Exception as e:
+            conexao.rollback()
+            self.logger.error(f"Erro na carga incremental: {e}")
+            return False
+        finally:
+            conexao.close()
+    
+    def preparar_carga_retomavel(self, nome_tabela: str, limpar: bool,
+                                 com_hash: bool = False) -> bool:
+        """Prepara a tabela tipada para receber cada chunk numa transação própria.
+
+        `limpar` esvazia a tabela no início de uma carga completa; numa execução
+        retomada ela fica como está, com os chunks já confirmados. Com `com_hash`
+        o watermark atual é lido aqui e filtra os chunks da carga inteira.
+        """
+        from psycopg2 import sql
+        
+        if self.engine is None:
+            self.logger.error("Conexão com banco não estabelecida")
+            return False
+        
+        conexao = self.engine.raw_connection()
+        try:
+            with conexao.cursor() as cursor:
+                self._watermark_carga = None
+                if com_hash:
+                    self._preparar_controle_incremental(cursor, nome_tabela)
+                    self._watermark_carga = self._ler_watermark(cursor, nome_tabela)
+                    self.logger.info(f"Watermark atual de posting_date: {self._watermark_carga}")
+                self._estrutura_carga = self._ler_estrutura(cursor, nome_tabela)
+                if limpar:
+                    tabelas = [nome_tabela] + (['job_skills'] if self._estrutura_carga['skills'] else [])
+                    cursor.execute(sql.SQL("TRUNCATE {}").format(
+                        sql.SQL(', ').join(map(sql.Identifier, tabelas))))
+            conexao.commit()
+            return True
+            
+        except Exception as e:
+            conexao.rollback()
+            self.logger.error(f"Erro ao preparar a carga retomável: {e}")
+            return False
+        finally:
+            conexao.close()
+    
+    def carregar_chunk_idempotente(self, chunk: pd.DataFrame, nome_tabela: str,
+                                   com_hash: bool = False) -> Optional[int]:
+        """Substitui, numa transação, as vagas do chunk pelo conteúdo novo.
+
+        As linhas com os mesmos job_id são apagadas antes da inserção, então
+        repetir um chunk já confirmado (queda entre o commit e o checkpoint)
+        deixa a tabela igual. Com `com_hash`, só seguem as linhas acima do
+        watermark ou com content_hash diferente do gravado, como na carga
+        incremental; um chunk já confirmado não envia nada. Retorna as linhas
+        gravadas, ou None em caso de erro.
+        """
+        from psycopg2 import sql
+        
+        conexao = self.engine.raw_connection()
+        try:
+            with conexao.cursor() as cursor:
+                df_tabela, colunas = self._preparar_para_jobs_ai(chunk)
+                if com_hash:
+                    df_tabela = self._com_content_hash(df_tabela)
+                    colunas = colunas + ['content_hash']
+                    cursor.execute("CREATE TEMP TABLE staging_hashes (job_id INT, content_hash BIGINT) "
+                                   "ON COMMIT DROP")
+                    df_tabela = self._filtrar_alterados(cursor, df_tabela, nome_tabela,
+                                                        self._watermark_carga)
+                    if df_tabela.empty:
+                        conexao.commit()
+                        return 0
+                
+                self._garantir_particoes(cursor, df_tabela, nome_tabela, self._estrutura_carga)
+                cursor.execute(
+                    sql.SQL("CREATE TEMP TABLE staging_incremental (LIKE {}) ON COMMIT DROP")
+                    .format(sql.Identifier(nome_tabela))
+                )
+                self._copiar_tabela(cursor, df_tabela, colunas, 'staging_incremental')
+                
+                lista_colunas = sql.SQL(', ').join(map(sql.Identifier, colunas))
+                cursor.execute(
+                    sql.SQL("DELETE FROM {} t USING staging_incremental s WHERE t.job_id = s.job_id")
+                    .format(sql.Identifier(nome_tabela))
+                )
+                cursor.execute(
+                    sql.SQL("INSERT INTO {tabela} ({colunas}) "
+                            "SELECT DISTINCT ON (job_id) {colunas} FROM staging_incremental "
+                            "ORDER BY job_id").format(tabela=sql.Identifier(nome_tabela),
+                                                      colunas=lista_colunas)
+                )
+                gravadas = cursor.rowcount
+                if self._estrutura_carga['skills']:
+                    self._preencher_skills(cursor, nome_tabela, somente_staging=True)
+            
+            conexao.commit()
+            self.linhas_gravadas += gravadas
+            return gravadas
+            
+        except Exception as e:
+            conexao.rollback()
+            self.logger.error(f"Erro ao carregar chunk na tabela '{nome_tabela}': {e}")
+            return None
+        finally:
+            conexao.close()
+    
+    def finalizar_carga_retomavel(self, nome_tabela: str,
+                                  watermark: Optional[pd.Timestamp] = None) -> bool:
+        """Acerta a sequência do SERIAL e, na carga incremental, o watermark"""
+        from psycopg2 import sql
+        
+        conexao = self.engine.raw_connection()
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute(
+                    sql.SQL("SELECT setval(pg_get_serial_sequence(%s, 'job_id'), "
+                            "COALESCE(MAX(job_id), 1)) FROM {}").format(sql.Identifier(nome_tabela)),
+                    (nome_tabela,)
+                )
+                if watermark is not None:
+                    self._gravar_watermark(cursor, nome_tabela, watermark)
+            conexao.commit()
+            return True
+            
+        except Exception as e:
+            conexao.rollback()
+            self.logger.error(f"Erro ao finalizar a carga retomável: {e}")
+            return False
+        finally:
+            conexao.close()
+    
+    def carregar_chunks(self, chunks: Iterable[pd.DataFrame], nome_tabela: str) -> bool:
+        """Carrega os chunks em sequência: o primeiro substitui a tabela, os demais anexam"""
+        if self.engine is None:
+            self.logger.error("Conexão com banco não estabelecida")
+            return False
+        
+        self.logger.info(f"Carregando dados em chunks na tabela '{nome_tabela}'")
+        
+        total_registros = 0
+        modo = 'replace'
+        inicio = time.perf_counter()
+        
+        try:
+            for numero, chunk in enumerate(chunks, start=1):
+                if chunk is None or chunk.empty:
+                    continue
+                
+                chunk.to_sql(nome_tabela, self.engine, if_exists=modo, index=False)
+                modo = 'append'
+                total_registros += len(chunk)
+                self.logger.info(f"Chunk {numero} carregado: {len(chunk)} registros "
+                               f"(total {total_registros})")
+            
+            if total_registros == 0:
+                self.logger.warning("Nenhum registro carregado: todos os chunks estavam vazios")
+                return False
+            
+            self._registrar_vazao('to_sql', total_registros, time.perf_counter() - inicio)
+            self.linhas_gravadas += total_registros
+            self.logger.info(f"Dados carregados com sucesso na tabela '{nome_tabela}': "
+                           f"{total_registros} registros")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar dados em chunks: {e}")
+            return False
+    
     def desconectar(self) -> None:
+        # o pool é compartilhado; só registra as métricas e libera a referência
+        if self.gerenciador is not None:
+            for banco, metricas in self.gerenciador.metricas().items():
+                self.logger.info(f"Pool '{banco}': {metricas}")
         if self.engine:
-            self.engine.dispose()
-            self.logger.info("Conexão com banco de dados fechada")
+            self.engine = None
+            self.logger.info("Conexão com banco de dados devolvida ao pool")
 
 class PipelineETL:
     
+    METODOS_INSTRUMENTADOS = {
+        'extractor': ['detectar_encoding', 'ler_colunas', 'extrair_dados', 'extrair_dados_em_chunks'],
+        'transformador': ['transformar_dados', 'transformar_chunk', 'calcular_valores_preenchimento',
+                          '_tratar_valores_nulos', '_remover_duplicatas',
+                          '_remover_duplicatas_entre_chunks', '_padronizar_dados',
+                          '_validar_dados_finais'],
+        'conector_bd': ['conectar'],
+        'validacao': ['validar'],
+    }
+    # as cargas devolvem bool: as linhas de saída vêm de ConectorBancoDados.linhas_gravadas
+    METODOS_CARGA = ['carregar_dados', 'carregar_chunks', 'carregar_dados_copy', 'carregar_chunks_copy',
+                     'carregar_dados_incremental', 'carregar_chunks_incremental',
+                     'carregar_chunk_idempotente']
+    
     def __init__(self):
+        from instrumentacao import Instrumentacao
+        
         self.config = ConfiguracaoETL()
         self.logger = self.config.logger
-        self.extractor = ExtractorCSV(self.logger)
-        self.transformador = TransformadorDados(self.logger)
+        self.extractor = ExtractorCSV(self.logger, self._criar_cache())
+        self.transformador = TransformadorDados(self.logger, self._criar_deduplicador())
         self.conector_bd = ConectorBancoDados(self.config)
+        self.validacao = self._criar_validacao()
+        # recebem cada DataFrame validado e são finalizados só se a carga der certo
+        self.consumidores = self._criar_consumidores()
+        self.checkpoints = self._criar_checkpoints()
+        self._execucao = None
+        self._retomada = False
+        self._chunks_feitos: Dict[int, Dict[str, Any]] = {}
+        
+        self.instrumentacao = Instrumentacao(self.logger)
+        for atributo, metodos in self.METODOS_INSTRUMENTADOS.items():
+            self.instrumentacao.instrumentar(getattr(self, atributo), atributo, metodos)
+        self.instrumentacao.instrumentar(self.conector_bd, 'conector_bd', self.METODOS_CARGA,
+                                         lambda: self.conector_bd.linhas_gravadas)
+        for consumidor in self.consumidores:
+            self.instrumentacao.instrumentar(consumidor, type(consumidor).__name__,
+                                             ['adicionar', 'finalizar'])
+    
+    def _criar_cache(self) -> Optional[Any]:
+        if not self.config.dir_cache:
+            return None
+        
+        from cache_colunar import CacheColunar
+        
+        if not CacheColunar.disponivel():
+            self.logger.warning("DIR_CACHE_ETL definido, mas pyarrow não está instalado; cache desativado")
+            return None
+        return CacheColunar(self.config.dir_cache, self.logger)
+    
+    def _criar_deduplicador(self) -> Any:
+        from deduplicacao import Deduplicador
+        
+        return Deduplicador(self.logger, chaves=self.config.dedup_chaves or None,
+                            ignorar=self.config.dedup_ignorar, modo=self.config.dedup_modo,
+                            vistos=self.config.dedup_vistos,
+                            limite_memoria=self.config.dedup_limite_memoria,
+                            limiar=self.config.dedup_limiar)
+    
+    def _criar_validacao(self) -> Optional[Any]:
+        if not self.config.validar_esquema:
+            return None
+        
+        try:
+            from validacao_jobs import EtapaValidacao
+            return EtapaValidacao(self.logger, self.config.arquivo_quarentena or None)
+        except ImportError as e:
+            self.logger.warning(f"Validação de esquema desativada, DDL indisponível: {e}")
+            return None
+    
+    def _criar_consumidores(self) -> list:
+        consumidores = []
+        if self.config.dir_indice_skills:
+            from indice_skills import ConstrutorIndiceSkills
+            consumidores.append(ConstrutorIndiceSkills(self.logger, self.config.dir_indice_skills))
+        if self.config.arquivo_cubo or self.config.cubo_no_banco:
+            from cubo_salarios import ConstrutorCubo
+            obter_conexao = (lambda: self.conector_bd.engine.raw_connection()) \
+                if self.config.cubo_no_banco else None
+            consumidores.append(ConstrutorCubo(self.logger, self.config.arquivo_cubo or None,
+                                               self.config.cubo_incremental, obter_conexao))
+        return consumidores
+    
+    def _criar_checkpoints(self) -> Optional[Any]:
+        if not self.config.arquivo_checkpoint:
+            return None
+        if self.config.tamanho_chunk <= 0 or self.config.workers > 1 \
+                or self.config.modo_carga not in ('copy', 'incremental'):
+            self.logger.warning("CHECKPOINT_ETL exige TAMANHO_CHUNK, WORKERS_ETL=1 e MODO_CARGA "
+                                "copy ou incremental; checkpoints desativados")
+            return None
+        
+        from checkpoints_etl import RegistroCheckpoints
+        return RegistroCheckpoints(self.config.arquivo_checkpoint, self.logger)
+    
+    def _iniciar_checkpoint(self) -> None:
+        if self.checkpoints is None:
+            return
+        self._execucao, self._retomada = self.checkpoints.iniciar_execucao(
+            self.config.caminho_csv, self.config.parametros_execucao())
+        self._chunks_feitos = self.checkpoints.chunks(self._execucao) if self._retomada else {}
+        if self._retomada:
+            carregados = sum(c['estagio'] == 'carregado' for c in self._chunks_feitos.values())
+            self.logger.info(f"Retomando a execução {self._execucao}: "
+                           f"{carregados} chunks já carregados")
+        else:
+            self.logger.info(f"Nova execução com checkpoints: {self._execucao}")
+    
+    def _extrair_chunks(self) -> Iterator[pd.DataFrame]:
+        """Chunks do CSV; com checkpoints, confere cada um com o hash da execução interrompida"""
+        chunks = self.extractor.extrair_dados_em_chunks(
+            self.config.caminho_csv, self.config.encoding_csv, self.config.tamanho_chunk)
+        if self._execucao is None:
+            yield from chunks
+            return
+        
+        from checkpoints_etl import hash_chunk
+        
+        for numero, chunk in enumerate(chunks, start=1):
+            hash_conteudo = hash_chunk(chunk)
+            anterior = self._chunks_feitos.get(numero)
+            if anterior is None:
+                self.checkpoints.registrar(self._execucao, numero, 'extraido', len(chunk), hash_conteudo)
+            elif anterior['hash_extraido'] != hash_conteudo:
+                raise ValueError(f"Chunk {numero} difere do registrado na execução {self._execucao}")
+            yield chunk
+    
+    def _validar_esquema(self, df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        if self.validacao is not None and df is not None:
+            df = self.validacao.validar(df)
+        if df is not None:
+            for consumidor in self.consumidores:
+                consumidor.adicionar(df)
+        return df
+    
+    def _finalizar_consumidores(self) -> None:
+        for consumidor in self.consumidores:
+            try:
+                consumidor.finalizar()
+            except Exception as e:
+                self.logger.error(f"Falha ao finalizar {type(consumidor).__name__}: {e}")
     
     def executar(self) -> bool:
 
@@ -293,35 +1119,26 @@ class PipelineETL:
         sucesso = False
         
         try:
-            self.logger.info("ETAPA 1: EXTRAÇÃO DE DADOS")
-            df_dados = self.extractor.extrair_dados(
-                self.config.caminho_csv, 
-                self.config.encoding_csv
-            )
-            
-            if df_dados is None:
-                self.logger.error("Falha na extração de dados")
-                return False
-            
-            self.logger.info("ETAPA 2: TRANSFORMAÇÃO DE DADOS")
-            df_transformado = self.transformador.transformar_dados(df_dados)
-            
-            if df_transformado is None:
-                self.logger.error("Falha na transformação de dados")
-                return False
-            
-            self.logger.info("ETAPA 3: CARGA DE DADOS")
-            if not self.conector_bd.conectar():
-                self.logger.error("Falha na conexão com banco de dados")
-                return False
+            with self.instrumentacao.perfil(self.config.modo_perfil, self.config.destino_perfil or None):
+                if self.config.workers > 1:
+                    sucesso = self._executar_paralelo()
+                elif self.config.tamanho_chunk > 0 and self.config.pipeline:
+                    sucesso = self._executar_em_pipeline()
+                elif self.config.tamanho_chunk > 0:
+                    sucesso = self._executar_em_chunks()
+                else:
+                    sucesso = self._executar_completo()
             
-            sucesso = self.conector_bd.carregar_dados(df_transformado, self.config.nome_tabela)
+            if sucesso:
+                self._finalizar_consumidores()
             
         except Exception as e:
             self.logger.error(f"Erro inesperado no pipeline ETL: {e}")
             
         finally:
             self.conector_bd.desconectar()
+            self.instrumentacao.emitir_relatorio(self.config.arquivo_metricas or None,
+                                                 self.config.arquivo_prometheus or None)
             
             if sucesso:
                 self.logger.info("="*60)
@@ -334,6 +1151,204 @@ class PipelineETL:
         
         return sucesso
 
+    def _executar_completo(self) -> bool:
+        self.logger.info("ETAPA 1: EXTRAÇÃO DE DADOS")
+        df_dados = self.extractor.extrair_dados(
+            self.config.caminho_csv, 
+            self.config.encoding_csv
+        )
+        
+        if df_dados is None:
+            self.logger.error("Falha na extração de dados")
+            return False
+        
+        self.logger.info("ETAPA 2: TRANSFORMAÇÃO DE DADOS")
+        df_transformado = self.transformador.transformar_dados(df_dados, copiar=False)
+        
+        if df_transformado is None:
+            self.logger.error("Falha na transformação de dados")
+            return False
+        
+        df_transformado = self._validar_esquema(df_transformado)
+        if df_transformado.empty:
+            self.logger.error("Nenhuma linha passou na validação de esquema")
+            return False
+        
+        self.logger.info("ETAPA 3: CARGA DE DADOS")
+        if not self.conector_bd.conectar():
+            self.logger.error("Falha na conexão com banco de dados")
+            return False
+        
+        return self._carregar(df_transformado)
+    
+    def _executar_paralelo(self) -> bool:
+        from etl_paralelo import ExecutorParalelo
+        
+        self.logger.info(f"ETAPAS 1 e 2: EXTRAÇÃO E TRANSFORMAÇÃO PARALELAS ({self.config.workers} workers)")
+        executor = ExecutorParalelo(self.logger, self.config.workers,
+                                    deduplicador=self.transformador.deduplicador)
+        self.instrumentacao.instrumentar(executor, 'paralelo', ['extrair_transformar'])
+        df_transformado = executor.extrair_transformar(self.config.caminho_csv, self.config.encoding_csv)
+        
+        if df_transformado is None:
+            self.logger.error("Falha na extração/transformação paralela")
+            return False
+        
+        df_transformado = self._validar_esquema(df_transformado)
+        if df_transformado.empty:
+            self.logger.error("Nenhuma linha passou na validação de esquema")
+            return False
+        
+        self.logger.info("ETAPA 3: CARGA DE DADOS")
+        if not self.conector_bd.conectar():
+            self.logger.error("Falha na conexão com banco de dados")
+            return False
+        
+        return self._carregar(df_transformado)
+    
+    def _carregar(self, df: pd.DataFrame) -> bool:
+        if self.config.modo_carga == 'copy':
+            return self.conector_bd.carregar_dados_copy(df, self.config.tabela_tipada)
+        if self.config.modo_carga == 'incremental':
+            return self.conector_bd.carregar_dados_incremental(df, self.config.tabela_tipada)
+        return self.conector_bd.carregar_dados(df, self.config.nome_tabela)
+    
+    def _carregar_chunks(self, chunks: Iterable[pd.DataFrame]) -> bool:
+        if self._execucao is not None:
+            return self._carregar_chunks_retomavel(chunks)
+        if self.config.modo_carga == 'copy':
+            return self.conector_bd.carregar_chunks_copy(chunks, self.config.tabela_tipada)
+        if self.config.modo_carga == 'incremental':
+            return self.conector_bd.carregar_chunks_incremental(chunks, self.config.tabela_tipada)
+        return self.conector_bd.carregar_chunks(chunks, self.config.nome_tabela)
+    
+    def _carregar_chunks_retomavel(self, chunks: Iterable[pd.DataFrame]) -> bool:
+        """Carrega cada chunk numa transação própria e registra o checkpoint depois do commit.
+
+        Chunks já carregados com o mesmo hash são pulados. Eles continuam sendo
+        lidos e transformados, pois a deduplicação entre chunks e os consumidores
+        dependem de todas as linhas.
+        """
+        from checkpoints_etl import hash_chunk
+        
+        tabela = self.config.tabela_tipada
+        incremental = self.config.modo_carga == 'incremental'
+        limpar = not self._retomada and not incremental
+        if not self.conector_bd.preparar_carga_retomavel(tabela, limpar, com_hash=incremental):
+            return False
+        
+        total_registros = 0
+        pulados = 0
+        maior_data = None
+        inicio = time.perf_counter()
+        
+        for numero, chunk in enumerate(chunks, start=1):
+            linhas = 0 if chunk is None else len(chunk)
+            hash_conteudo = hash_chunk(chunk)
+            if incremental and linhas and 'posting_date' in chunk.columns:
+                data_chunk = pd.to_datetime(chunk['posting_date'], errors='coerce').max()
+                if not pd.isna(data_chunk):
+                    maior_data = data_chunk if maior_data is None else max(maior_data, data_chunk)
+            
+            anterior = self._chunks_feitos.get(numero)
+            if anterior is not None and anterior['estagio'] == 'carregado' \
+                    and anterior['hash_transformado'] == hash_conteudo:
+                pulados += 1
+                continue
+            
+            self.checkpoints.registrar(self._execucao, numero, 'transformado', linhas, hash_conteudo)
+            gravadas = 0
+            if linhas:
+                gravadas = self.conector_bd.carregar_chunk_idempotente(chunk, tabela, incremental)
+                if gravadas is None:
+                    self.logger.error(f"Carga interrompida no chunk {numero}; "
+                                      f"execute de novo para retomar a partir dele")
+                    return False
+            self.checkpoints.registrar(self._execucao, numero, 'carregado', gravadas)
+            total_registros += gravadas
+            self.logger.debug(f"Chunk {numero} carregado e registrado ({gravadas} registros)")
+        
+        if pulados:
+            self.logger.info(f"{pulados} chunks já carregados na execução anterior foram pulados")
+        if not self.conector_bd.finalizar_carga_retomavel(tabela, maior_data):
+            return False
+        
+        self.checkpoints.concluir_execucao(self._execucao)
+        self.conector_bd._registrar_vazao('chunks com checkpoint', total_registros,
+                                          time.perf_counter() - inicio)
+        return True
+    
+    def _preparar_streaming(self) -> Dict[str, Any]:
+        """Pré-calcula os valores de preenchimento numa leitura só das colunas necessárias"""
+        caminho = self.config.caminho_csv
+        encoding = self.config.encoding_csv
+        tamanho_chunk = self.config.tamanho_chunk
+        
+        self.logger.info(f"ETAPA 1: PRÉ-CÁLCULO DOS VALORES DE PREENCHIMENTO (chunks de {tamanho_chunk})")
+        colunas_arquivo = self.extractor.ler_colunas(caminho, encoding)
+        colunas_necessarias = [c for c in self.transformador.colunas_preenchimento()
+                               if c in colunas_arquivo]
+        
+        valores_preenchimento = {}
+        if colunas_necessarias:
+            valores_preenchimento = self.transformador.calcular_valores_preenchimento(
+                self.extractor.extrair_dados_em_chunks(caminho, encoding, tamanho_chunk,
+                                                       usecols=colunas_necessarias)
+            )
+        self.transformador.iniciar_streaming(valores_preenchimento)
+        return valores_preenchimento
+    
+    def _executar_em_chunks(self) -> bool:
+        """Extrai, transforma e carrega um chunk por vez, com memória limitada ao chunk"""
+        self._preparar_streaming()
+        
+        self.logger.info("ETAPA 2: CONEXÃO COM BANCO DE DADOS")
+        if not self.conector_bd.conectar():
+            self.logger.error("Falha na conexão com banco de dados")
+            return False
+        
+        self._iniciar_checkpoint()
+        
+        self.logger.info("ETAPA 3: EXTRAÇÃO, TRANSFORMAÇÃO E CARGA EM CHUNKS")
+        chunks_transformados = (
+            self._validar_esquema(self.transformador.transformar_chunk(chunk))
+            for chunk in self._extrair_chunks()
+        )
+        return self._carregar_chunks(chunks_transformados)
+    
+    def _executar_em_pipeline(self) -> bool:
+        """Como `_executar_em_chunks`, com leitura, transformação, validação e carga
+        sobrepostas: o chunk N é carregado enquanto o N+1 é transformado"""
+        from pipeline_estagios import ExecutorPipeline, Estagio, TransformacaoChunks
+        
+        valores_preenchimento = self._preparar_streaming()
+        
+        self.logger.info("ETAPA 2: CONEXÃO COM BANCO DE DADOS")
+        if not self.conector_bd.conectar():
+            self.logger.error("Falha na conexão com banco de dados")
+            return False
+        
+        self._iniciar_checkpoint()
+        
+        if self.config.pipeline_processo:
+            # o processo tem seu próprio TransformadorDados e estado de deduplicação
+            transformar = TransformacaoChunks(valores_preenchimento,
+                                              self.transformador.deduplicador.parametros())
+        else:
+            transformar = self.transformador.transformar_chunk
+        
+        self.logger.info(f"ETAPA 3: EXTRAÇÃO, TRANSFORMAÇÃO E CARGA EM PIPELINE "
+                       f"(filas de {self.config.pipeline_fila} chunks)")
+        executor = ExecutorPipeline(self.logger, self.config.pipeline_fila)
+        # o pico de RSS das etapas sobrepostas sai só no registro 'pipeline'
+        with self.instrumentacao.concorrente('pipeline'):
+            sucesso = executor.executar(
+                self._extrair_chunks(),
+                [Estagio('transformar', transformar, processo=self.config.pipeline_processo),
+                 Estagio('validar', self._validar_esquema)],
+                self._carregar_chunks, nome_fonte='extrair', nome_destino='carregar')
+        return bool(sucesso)
+
 def main():
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
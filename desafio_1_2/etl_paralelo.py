@@ -0,0 +1,161 @@
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dia2 import ExtractorCSV, TransformadorDados
+from deduplicacao import Deduplicador
+
+def calcular_particoes(caminho_csv: str, numero_particoes: int) -> List[Tuple[int, int]]:
+    """Divide o arquivo em faixas de bytes [inicio, fim) alinhadas ao início de linhas.
+
+    A primeira faixa começa depois do cabeçalho. Assume que os campos entre aspas
+    não contêm quebras de linha, como no ai_job_dataset.csv.
+    """
+    tamanho = os.path.getsize(caminho_csv)
+
+    with open(caminho_csv, 'rb') as arquivo:
+        arquivo.readline()
+        inicio_dados = arquivo.tell()
+
+        limites = [inicio_dados]
+        passo = max((tamanho - inicio_dados) // max(numero_particoes, 1), 1)
+
+        for i in range(1, numero_particoes):
+            alvo = inicio_dados + i * passo
+            if alvo <= limites[-1]:
+                continue
+            arquivo.seek(alvo - 1)
+            # se alvo - 1 já é um '\n', readline consome só ele e para no início da linha
+            arquivo.readline()
+            posicao = arquivo.tell()
+            if posicao >= tamanho:
+                break
+            if posicao > limites[-1]:
+                limites.append(posicao)
+
+    limites.append(tamanho)
+    return [(inicio, fim) for inicio, fim in zip(limites[:-1], limites[1:]) if fim > inicio]
+
+def _ler_particao(caminho_csv: str, encoding: str, colunas: List[str], inicio: int, fim: int,
+                  usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    with open(caminho_csv, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        conteudo = arquivo.read(fim - inicio)
+
+    return pd.read_csv(io.BytesIO(conteudo), encoding=encoding, header=None, names=colunas,
+                       usecols=usecols, dtype=ExtractorCSV.dtypes_leitura())
+
+def _estatisticas_particao(caminho_csv: str, encoding: str, colunas: List[str],
+                           inicio: int, fim: int, usecols: List[str]) -> Dict[str, Any]:
+    transformador = TransformadorDados(logging.getLogger('ETL_Pipeline'))
+    df = _ler_particao(caminho_csv, encoding, colunas, inicio, fim, usecols=usecols)
+    return transformador.estatisticas_parciais(df)
+
+def _transformar_particao(caminho_csv: str, encoding: str, colunas: List[str], inicio: int,
+                          fim: int, valores_preenchimento: Dict[str, Any],
+                          parametros_dedup: Dict[str, Any]) -> Tuple[pd.DataFrame, np.ndarray, int]:
+    """Fase map da transformação: preenche, calcula as chaves de deduplicação e padroniza.
+
+    As chaves são tiradas antes da padronização, como na remoção serial.
+    """
+    logger = logging.getLogger('ETL_Pipeline')
+    deduplicador = Deduplicador(logger, **parametros_dedup)
+    transformador = TransformadorDados(logger, deduplicador)
+
+    df = _ler_particao(caminho_csv, encoding, colunas, inicio, fim)
+    linhas_lidas = len(df)
+
+    df = transformador._tratar_valores_nulos(df, valores_preenchimento)
+    chaves = deduplicador.chaves(df)
+    df = transformador._padronizar_dados(df)
+    return df, chaves, linhas_lidas
+
+class ExecutorParalelo:
+
+    def __init__(self, logger: logging.Logger, workers: Optional[int] = None,
+                 particoes_por_worker: int = 2, deduplicador: Optional[Deduplicador] = None):
+        self.logger = logger
+        self.workers = workers or os.cpu_count() or 1
+        self.particoes_por_worker = particoes_por_worker
+        self.extractor = ExtractorCSV(logger)
+        self.transformador = TransformadorDados(logger, deduplicador)
+
+    def _restaurar_categorias(self, df: pd.DataFrame) -> pd.DataFrame:
+        # concat de categorias diferentes entre partições volta para object
+        for col in TransformadorDados.COLUNAS_CATEGORIA:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        return df
+
+    def extrair_transformar(self, caminho_csv: str, encoding: str = 'utf-8') -> Optional[pd.DataFrame]:
+        """Extrai e transforma o CSV em paralelo com resultado igual ao caminho serial.
+
+        Fase 1 (map/reduce): mediana e modas globais a partir das colunas necessárias.
+        Fase 2 (map): cada partição é preenchida, recebe as chaves de deduplicação e é padronizada.
+        Reduce: concatenação na ordem do arquivo e remoção global de duplicatas pelas chaves.
+        """
+        self.logger.info(f"Iniciando extração/transformação paralela com {self.workers} workers: "
+                       f"{caminho_csv}")
+
+        try:
+            enc = self.extractor.detectar_encoding(caminho_csv, encoding)
+            colunas = self.extractor.ler_colunas(caminho_csv, enc)
+            particoes = calcular_particoes(caminho_csv, self.workers * self.particoes_por_worker)
+
+            if not particoes:
+                self.logger.warning("Arquivo CSV sem linhas de dados")
+                return None
+
+            self.logger.info(f"Arquivo dividido em {len(particoes)} partições")
+            colunas_estatisticas = [c for c in self.transformador.colunas_preenchimento()
+                                    if c in colunas]
+
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                valores_preenchimento: Dict[str, Any] = {}
+                if colunas_estatisticas:
+                    parciais = list(executor.map(
+                        _estatisticas_particao,
+                        *zip(*[(caminho_csv, enc, colunas, inicio, fim, colunas_estatisticas)
+                               for inicio, fim in particoes])
+                    ))
+                    valores_preenchimento = self.transformador.reduzir_estatisticas(parciais)
+
+                parametros_dedup = self.transformador.deduplicador.parametros()
+                resultados = list(executor.map(
+                    _transformar_particao,
+                    *zip(*[(caminho_csv, enc, colunas, inicio, fim, valores_preenchimento,
+                            parametros_dedup)
+                           for inicio, fim in particoes])
+                ))
+
+            frames, chaves, deslocamento = [], [], 0
+            for df_particao, chaves_particao, linhas_lidas in resultados:
+                # índice global igual ao do read_csv serial
+                df_particao.index = df_particao.index + deslocamento
+                deslocamento += linhas_lidas
+                frames.append(df_particao)
+                chaves.append(chaves_particao)
+
+            df = pd.concat(frames)
+            deduplicador = self.transformador.deduplicador
+            deduplicador.reiniciar()
+            duplicadas = deduplicador.marcar_chaves(np.concatenate(chaves))
+            deduplicador.reiniciar()
+            if duplicadas.any():
+                self.logger.info(f"Removidas {int(duplicadas.sum())} linhas duplicadas")
+            df = self._restaurar_categorias(df[~duplicadas])
+
+            df = self.transformador._validar_dados_finais(df)
+            if df is not None:
+                self.logger.info(f"Transformação paralela concluída: {df.shape[0]} linhas, "
+                               f"{df.shape[1]} colunas")
+            return df
+
+        except Exception as e:
+            self.logger.error(f"Erro na extração/transformação paralela: {e}")
+            return None
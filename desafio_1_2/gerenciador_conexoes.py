@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+try:
+    from connection import DB_HOST, DB_HOMOLOGACAO, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
+except ImportError:
+    DB_HOST = os.getenv('DB_HOST', 'localhost')
+    DB_NAME = os.getenv('DB_NAME', 'postgres')
+    DB_HOMOLOGACAO = os.getenv('DB_HOMOLOGACAO', 'dia1')
+    DB_USER = os.getenv('DB_USER', 'postgres')
+    DB_PASSWORD = os.getenv('DB_PASSWORD', '123')
+    DB_PORT = os.getenv('DB_PORT', '5432')
+
+POOL_TAMANHO = int(os.getenv('POOL_TAMANHO', '5'))
+POOL_OVERFLOW = int(os.getenv('POOL_OVERFLOW', '10'))
+POOL_TIMEOUT = float(os.getenv('POOL_TIMEOUT', '30'))
+POOL_RECICLAR = int(os.getenv('POOL_RECICLAR', '1800'))
+POOL_PRE_PING = os.getenv('POOL_PRE_PING', '1') == '1'
+
+class GerenciadorConexoes:
+    """Um engine SQLAlchemy com pool por banco, compartilhado por dbcreate e dia2.
+
+    As credenciais vêm de connection.py. Conexões devolvidas ao pool sempre
+    voltam com autocommit desligado, para que o uso em DDL não vaze para a carga.
+    """
+
+    def __init__(self, host: str = DB_HOST, porta: str = DB_PORT, usuario: str = DB_USER,
+                 senha: str = DB_PASSWORD, pool_tamanho: int = POOL_TAMANHO,
+                 max_overflow: int = POOL_OVERFLOW, pool_timeout: float = POOL_TIMEOUT,
+                 reciclar: int = POOL_RECICLAR, pre_ping: bool = POOL_PRE_PING):
+        self.host = host
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.opcoes_pool = {
+            'pool_size': pool_tamanho,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout,
+            'pool_recycle': reciclar,
+            'pool_pre_ping': pre_ping,
+        }
+        self._engines: Dict[str, Engine] = {}
+        self._metricas: Dict[str, Dict[str, Any]] = {}
+        self._trava = threading.Lock()
+
+    def url(self, db_nome: str) -> str:
+        return (f'postgresql+psycopg2://{self.usuario}:{self.senha}@'
+                f'{self.host}:{self.porta}/{db_nome}')
+
+    def engine(self, db_nome: Optional[str] = None) -> Engine:
+        db_nome = db_nome or DB_NAME
+        with self._trava:
+            if db_nome not in self._engines:
+                engine = create_engine(self.url(db_nome), **self.opcoes_pool)
+                self._registrar_eventos(engine, db_nome)
+                self._engines[db_nome] = engine
+            return self._engines[db_nome]
+
+    def _registrar_eventos(self, engine: Engine, db_nome: str) -> None:
+        metricas = self._metricas.setdefault(db_nome, {
+            'conexoes_criadas': 0, 'checkouts': 0, 'checkins': 0,
+            'espera_total_s': 0.0, 'espera_max_s': 0.0,
+        })
+
+        @event.listens_for(engine, 'connect')
+        def ao_conectar(conexao_dbapi, registro):
+            metricas['conexoes_criadas'] += 1
+
+        @event.listens_for(engine, 'checkout')
+        def ao_retirar(conexao_dbapi, registro, proxy):
+            metricas['checkouts'] += 1
+
+        @event.listens_for(engine, 'checkin')
+        def ao_devolver(conexao_dbapi, registro):
+            metricas['checkins'] += 1
+            if conexao_dbapi is not None and getattr(conexao_dbapi, 'autocommit', False):
+                conexao_dbapi.autocommit = False
+
+    def _registrar_espera(self, db_nome: str, inicio: float) -> None:
+        espera = time.perf_counter() - inicio
+        metricas = self._metricas[db_nome]
+        with self._trava:
+            metricas['espera_total_s'] += espera
+            metricas['espera_max_s'] = max(metricas['espera_max_s'], espera)
+
+    def conexao_bruta(self, db_nome: Optional[str] = None, autocommit: bool = False):
+        """Conexão DBAPI (psycopg2) do pool; `close()` a devolve ao pool"""
+        db_nome = db_nome or DB_NAME
+        engine = self.engine(db_nome)
+        inicio = time.perf_counter()
+        conexao = engine.raw_connection()
+        self._registrar_espera(db_nome, inicio)
+        if autocommit:
+            # o proxy do pool só repassa leituras de atributo: o autocommit vai na conexão psycopg2,
+            # que o evento de checkin desliga de novo ao devolvê-la
+            conexao.dbapi_connection.autocommit = True
+        return conexao
+
+    @contextmanager
+    def conexao(self, db_nome: Optional[str] = None, autocommit: bool = False):
+        db_nome = db_nome or DB_NAME
+        engine = self.engine(db_nome)
+        inicio = time.perf_counter()
+        with engine.connect() as conexao:
+            self._registrar_espera(db_nome, inicio)
+            if autocommit:
+                conexao = conexao.execution_options(isolation_level='AUTOCOMMIT')
+            yield conexao
+
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        resultado = {}
+        for db_nome, engine in self._engines.items():
+            dados = dict(self._metricas[db_nome])
+            dados['espera_total_s'] = round(dados['espera_total_s'], 6)
+            dados['espera_max_s'] = round(dados['espera_max_s'], 6)
+            dados['em_uso'] = engine.pool.checkedout()
+            dados['ociosas'] = engine.pool.checkedin()
+            dados['tamanho_pool'] = engine.pool.size()
+            resultado[db_nome] = dados
+        return resultado
+
+    def descartar(self) -> None:
+        with self._trava:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+_gerenciadores: Dict[tuple, GerenciadorConexoes] = {}
+_trava_gerenciadores = threading.Lock()
+
+def obter_gerenciador(host: str = DB_HOST, porta: str = DB_PORT, usuario: str = DB_USER,
+                      senha: str = DB_PASSWORD) -> GerenciadorConexoes:
+    """Gerenciador compartilhado no processo para o mesmo servidor e usuário"""
+    chave = (host, str(porta), usuario)
+    with _trava_gerenciadores:
+        if chave not in _gerenciadores:
+            _gerenciadores[chave] = GerenciadorConexoes(host, porta, usuario, senha)
+        return _gerenciadores[chave]
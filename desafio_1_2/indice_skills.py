@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Dict, List, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+Termos = Union[str, Iterable[str], None]
+
+def _normalizar(termos: Termos) -> List[str]:
+    if termos is None:
+        return []
+    if isinstance(termos, str):
+        termos = [termos]
+    return [t.strip().lower() for t in termos if t and t.strip()]
+
+class IndiceSkills:
+    """Índice invertido skill -> posições das vagas, em formato CSR.
+
+    `offsets[s]:offsets[s + 1]` delimita em `linhas` as posições (ordenadas) das
+    vagas que exigem a skill de ID `s`. Local, nível e salário ficam em arrays
+    colunares, então os filtros são máscaras sobre os candidatos já reduzidos
+    pelas skills. Persistido como arquivos .npy, carregados com memory-map.
+    """
+
+    COLUNA_SKILLS = 'required_skills'
+    COLUNA_SALARIO = 'salary_usd'
+    FILTROS = {'local': 'company_location', 'nivel': 'experience_level'}
+    ARQUIVO_METADADOS = 'indice.json'
+    ARRAYS = ['offsets', 'linhas', 'job_ids', 'salario', 'local', 'nivel']
+
+    def __init__(self, skills: List[str], vocabularios: Dict[str, List[str]],
+                 arrays: Dict[str, np.ndarray]):
+        self.skills = skills
+        self.id_skill = {skill: i for i, skill in enumerate(skills)}
+        self.vocabularios = vocabularios
+        self.ids_filtro = {nome: {v: i for i, v in enumerate(vocab)}
+                           for nome, vocab in vocabularios.items()}
+        self.offsets = arrays['offsets']
+        self.linhas = arrays['linhas']
+        self.job_ids = arrays['job_ids']
+        self.salario = arrays['salario']
+        self.codigos = {nome: arrays[nome] for nome in self.FILTROS}
+
+    @property
+    def total_linhas(self) -> int:
+        return len(self.job_ids)
+
+    def postings(self, skill: str) -> np.ndarray:
+        """Posições ordenadas das vagas que exigem `skill` (vazio se desconhecida)"""
+        i = self.id_skill.get(skill.strip().lower())
+        if i is None:
+            return self.linhas[0:0]
+        return self.linhas[self.offsets[i]:self.offsets[i + 1]]
+
+    def consultar(self, todas: Termos = None, alguma: Termos = None, local: Termos = None,
+                  nivel: Termos = None, salario_min: Optional[float] = None,
+                  salario_max: Optional[float] = None) -> np.ndarray:
+        """Posições das vagas com todas as skills de `todas`, ao menos uma de `alguma`
+        e que passam nos filtros de local, nível e faixa salarial"""
+        candidatos = None
+
+        listas = sorted((self.postings(s) for s in _normalizar(todas)), key=len)
+        for lista in listas:
+            # interseção a partir da menor lista mantém o trabalho proporcional ao resultado
+            candidatos = lista if candidatos is None else \
+                np.intersect1d(candidatos, lista, assume_unique=True)
+            if len(candidatos) == 0:
+                return candidatos
+
+        termos_ou = _normalizar(alguma)
+        if termos_ou:
+            uniao = np.unique(np.concatenate([self.postings(s) for s in termos_ou]))
+            candidatos = uniao if candidatos is None else \
+                np.intersect1d(candidatos, uniao, assume_unique=True)
+
+        if candidatos is None:
+            candidatos = np.arange(self.total_linhas, dtype=self.linhas.dtype)
+
+        mascara = np.ones(len(candidatos), dtype=bool)
+        for nome, termos in (('local', local), ('nivel', nivel)):
+            valores = _normalizar(termos)
+            if valores:
+                ids = [self.ids_filtro[nome][v] for v in valores if v in self.ids_filtro[nome]]
+                mascara &= np.isin(self.codigos[nome][candidatos], ids)
+        if salario_min is not None:
+            mascara &= self.salario[candidatos] >= salario_min
+        if salario_max is not None:
+            mascara &= self.salario[candidatos] <= salario_max
+
+        return candidatos[mascara]
+
+    def ids_vagas(self, posicoes: np.ndarray) -> np.ndarray:
+        return self.job_ids[posicoes]
+
+    def salvar(self, diretorio: str) -> None:
+        destino = Path(diretorio)
+        destino.mkdir(parents=True, exist_ok=True)
+        arrays = {'offsets': self.offsets, 'linhas': self.linhas, 'job_ids': self.job_ids,
+                  'salario': self.salario, **self.codigos}
+        for nome, array in arrays.items():
+            temporario = destino / f'{nome}.npy.tmp'
+            with open(temporario, 'wb') as arquivo:
+                np.save(arquivo, np.ascontiguousarray(array))
+            os.replace(temporario, destino / f'{nome}.npy')
+
+        # os metadados por último: um índice sem indice.json está incompleto
+        metadados = {'skills': self.skills, 'vocabularios': self.vocabularios,
+                     'total_linhas': self.total_linhas}
+        temporario = destino / f'{self.ARQUIVO_METADADOS}.tmp'
+        temporario.write_text(json.dumps(metadados, ensure_ascii=False), encoding='utf-8')
+        os.replace(temporario, destino / self.ARQUIVO_METADADOS)
+
+    @classmethod
+    def carregar(cls, diretorio: str) -> 'IndiceSkills':
+        """Abre o índice com memory-map; só as páginas consultadas são lidas do disco"""
+        origem = Path(diretorio)
+        metadados = json.loads((origem / cls.ARQUIVO_METADADOS).read_text(encoding='utf-8'))
+        arrays = {nome: np.load(origem / f'{nome}.npy', mmap_mode='r') for nome in cls.ARRAYS}
+        return cls(metadados['skills'], metadados['vocabularios'], arrays)
+
+class ConstrutorIndiceSkills:
+    """Monta o IndiceSkills a partir da saída do TransformadorDados, chunk a chunk.
+
+    Cada chunk é explodido e fatorado localmente; só os códigos inteiros são
+    acumulados, com os rótulos internados num vocabulário global.
+    """
+
+    def __init__(self, logger: logging.Logger, diretorio: Optional[str] = None):
+        self.logger = logger
+        self.diretorio = diretorio
+        self.vocab_skills: Dict[str, int] = {}
+        self.vocabs_filtro: Dict[str, Dict[str, int]] = {nome: {} for nome in IndiceSkills.FILTROS}
+        self._pares: List[np.ndarray] = []
+        self._colunas: Dict[str, List[np.ndarray]] = {nome: [] for nome in IndiceSkills.ARRAYS[2:]}
+        self.total_linhas = 0
+
+    @staticmethod
+    def _internar(valores: pd.Series, vocabulario: Dict[str, int]) -> np.ndarray:
+        codigos, rotulos = pd.factorize(valores)
+        mapa = np.array([vocabulario.setdefault(r, len(vocabulario)) for r in rotulos] + [-1],
+                        dtype='int32')
+        return mapa[codigos]
+
+    def adicionar(self, df: Optional[pd.DataFrame]) -> None:
+        if df is None or df.empty:
+            return
+        n = len(df)
+        posicoes = np.arange(self.total_linhas, self.total_linhas + n, dtype='int32')
+
+        if IndiceSkills.COLUNA_SKILLS in df.columns:
+            skills = (df[IndiceSkills.COLUNA_SKILLS].astype('string').str.split(',')
+                      .set_axis(posicoes).explode().str.strip().str.lower())
+            skills = skills[skills.notna() & (skills != '')]
+            ids = self._internar(skills, self.vocab_skills)
+            self._pares.append(np.column_stack([ids, skills.index.to_numpy(dtype='int32')]))
+
+        for nome, coluna in IndiceSkills.FILTROS.items():
+            if coluna in df.columns:
+                valores = df[coluna].astype('string').str.strip().str.lower()
+                self._colunas[nome].append(self._internar(valores, self.vocabs_filtro[nome]))
+            else:
+                self._colunas[nome].append(np.full(n, -1, dtype='int32'))
+
+        salario = (pd.to_numeric(df[IndiceSkills.COLUNA_SALARIO], errors='coerce')
+                   if IndiceSkills.COLUNA_SALARIO in df.columns else pd.Series(np.nan, index=df.index))
+        self._colunas['salario'].append(salario.to_numpy(dtype='float64', na_value=np.nan))
+
+        job_ids = (df['job_id'].astype(str).str.extract(r'(\d+)', expand=False)
+                   if 'job_id' in df.columns else pd.Series(-1, index=df.index))
+        self._colunas['job_ids'].append(pd.to_numeric(job_ids, errors='coerce')
+                                        .fillna(-1).to_numpy(dtype='int64'))
+        self.total_linhas += n
+
+    def construir(self) -> IndiceSkills:
+        pares = np.concatenate(self._pares) if self._pares else np.empty((0, 2), dtype='int32')
+        # ordena por (skill, posição) e descarta skills repetidas na mesma vaga
+        pares = np.unique(pares, axis=0)
+        contagens = np.bincount(pares[:, 0], minlength=len(self.vocab_skills))
+        offsets = np.concatenate([[0], np.cumsum(contagens)]).astype('int64')
+
+        arrays = {'offsets': offsets, 'linhas': np.ascontiguousarray(pares[:, 1])}
+        for nome, partes in self._colunas.items():
+            arrays[nome] = np.concatenate(partes) if partes else np.empty(0)
+        vocabularios = {nome: list(vocab) for nome, vocab in self.vocabs_filtro.items()}
+        return IndiceSkills(list(self.vocab_skills), vocabularios, arrays)
+
+    def finalizar(self) -> Optional[IndiceSkills]:
+        indice = self.construir()
+        self.logger.info(f"Índice de skills: {len(indice.skills)} skills, "
+                         f"{len(indice.linhas)} pares skill-vaga, {indice.total_linhas} vagas")
+        if self.diretorio:
+            try:
+                indice.salvar(self.diretorio)
+                self.logger.info(f"Índice de skills salvo em {self.diretorio}")
+            except OSError as e:
+                self.logger.error(f"Não foi possível salvar o índice de skills em {self.diretorio}: {e}")
+        return indice
@@ -0,0 +1,324 @@
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, Callable
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def resetar_pico_rss() -> None:
+    # no Linux, escrever '5' em clear_refs zera o VmHWM; em outros sistemas o pico é o do processo
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+    except OSError:
+        pass
+
+def _ler_status_mb(campo: str) -> Optional[float]:
+    try:
+        with open('/proc/self/status', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(campo):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def pico_rss_mb() -> Optional[float]:
+    pico = _ler_status_mb('VmHWM:')
+    if pico is None and resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pico = pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+    return pico
+
+def rss_atual_mb() -> Optional[float]:
+    return _ler_status_mb('VmRSS:')
+
+def _linhas(valor: Any) -> Optional[int]:
+    return len(valor) if isinstance(valor, pd.DataFrame) else None
+
+def _ou_traco(valor: Optional[int]) -> Any:
+    return '-' if valor is None else valor
+
+class Instrumentacao:
+    """Registra tempo de parede, CPU, linhas e pico de memória de cada etapa do ETL.
+
+    Etapas aninhadas (ex.: transformar_dados chamando _tratar_valores_nulos) são
+    medidas separadamente; o pico de uma etapa interna é repassado à externa.
+    O pico de RSS é do processo inteiro: dentro de `concorrente` ele não é
+    medido por etapa, só uma vez para o bloco todo.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.registros: List[Dict[str, Any]] = []
+        # a pilha de etapas abertas é por thread: estágios do pipeline rodam em paralelo
+        self._local = threading.local()
+        # blocos `concorrente` abertos; enquanto houver algum, não há pico por etapa
+        self._concorrentes = 0
+        self.inicio_execucao = datetime.now()
+
+    @property
+    def _pilha(self) -> List[Dict[str, Any]]:
+        if not hasattr(self._local, 'pilha'):
+            self._local.pilha = []
+        return self._local.pilha
+
+    def _iniciar(self) -> Dict[str, Any]:
+        if self._concorrentes:
+            # zerar o VmHWM aqui apagaria o pico das etapas rodando nas outras threads
+            quadro = {'rss_inicial': None, 'pico': None, 'parede': time.perf_counter(),
+                      'cpu': time.process_time(), 'concorrente': True}
+            self._pilha.append(quadro)
+            return quadro
+        if self._pilha:
+            # guarda o pico da etapa externa antes que o reset o apague
+            pico = pico_rss_mb()
+            if pico is not None:
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'] or 0, pico)
+        resetar_pico_rss()
+        quadro = {
+            'rss_inicial': rss_atual_mb(),
+            'pico': None,
+            'parede': time.perf_counter(),
+            'cpu': time.process_time(),
+        }
+        self._pilha.append(quadro)
+        return quadro
+
+    def _finalizar(self, etapa: str, quadro: Dict[str, Any], linhas_entrada: Optional[int],
+                   linhas_saida: Optional[int], sucesso: bool) -> None:
+        parede = time.perf_counter() - quadro['parede']
+        cpu = time.process_time() - quadro['cpu']
+        self._pilha.pop()
+
+        pico = None
+        if not quadro.get('concorrente'):
+            pico = max(filter(None, [pico_rss_mb(), quadro['pico']]), default=None)
+        if self._pilha and pico is not None:
+            self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'] or 0, pico)
+
+        delta_memoria = None
+        if pico is not None and quadro['rss_inicial'] is not None:
+            delta_memoria = round(pico - quadro['rss_inicial'], 1)
+
+        self.registros.append({
+            'etapa': etapa,
+            'tempo_parede_s': round(parede, 6),
+            'tempo_cpu_s': round(cpu, 6),
+            'linhas_entrada': linhas_entrada,
+            'linhas_saida': linhas_saida,
+            'delta_pico_memoria_mb': delta_memoria,
+            'sucesso': sucesso,
+            'nivel': len(self._pilha),
+        })
+
+    def _envolver_gerador(self, etapa: str, gerador: Iterable) -> Iterable:
+        # geradores são medidos durante o consumo: cada next() soma no mesmo registro
+        parede = cpu = 0.0
+        linhas = 0
+        sucesso = False
+        try:
+            iterador = iter(gerador)
+            while True:
+                inicio_parede, inicio_cpu = time.perf_counter(), time.process_time()
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    sucesso = True
+                    return
+                finally:
+                    parede += time.perf_counter() - inicio_parede
+                    cpu += time.process_time() - inicio_cpu
+                linhas += _linhas(item) or 0
+                yield item
+        finally:
+            self.registros.append({
+                'etapa': etapa,
+                'tempo_parede_s': round(parede, 6),
+                'tempo_cpu_s': round(cpu, 6),
+                'linhas_entrada': None,
+                'linhas_saida': linhas,
+                'delta_pico_memoria_mb': None,
+                'sucesso': sucesso,
+                'nivel': len(self._pilha),
+            })
+
+    @contextmanager
+    def concorrente(self, etapa: str):
+        """Bloco com etapas em várias threads (pipeline): um único pico de RSS, o do bloco"""
+        quadro = self._iniciar()
+        self._concorrentes += 1
+        sucesso = False
+        try:
+            yield
+            sucesso = True
+        finally:
+            self._concorrentes -= 1
+            self._finalizar(etapa, quadro, None, None, sucesso)
+
+    def envolver(self, etapa: str, funcao, contador_saida: Optional[Callable[[], int]] = None):
+        """`contador_saida`, se dado, é um total acumulado (ex.: linhas gravadas pelo conector);
+        a diferença durante a chamada vira as linhas de saída da etapa"""
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if inspect.isgeneratorfunction(funcao):
+                return self._envolver_gerador(etapa, funcao(*args, **kwargs))
+
+            linhas_entrada = next((len(a) for a in args if isinstance(a, pd.DataFrame)), None)
+            saida_inicial = contador_saida() if contador_saida is not None else None
+            quadro = self._iniciar()
+            sucesso = False
+            resultado = None
+            try:
+                resultado = funcao(*args, **kwargs)
+                sucesso = resultado is not None and resultado is not False
+                return resultado
+            finally:
+                linhas_saida = _linhas(resultado)
+                if contador_saida is not None:
+                    linhas_saida = contador_saida() - saida_inicial
+                self._finalizar(etapa, quadro, linhas_entrada, linhas_saida, sucesso)
+        return envolvida
+
+    def instrumentar(self, objeto: Any, prefixo: str, metodos: List[str],
+                     contador_saida: Optional[Callable[[], int]] = None) -> None:
+        """Substitui os métodos na instância, então chamadas internas via self também são medidas"""
+        for nome in metodos:
+            if hasattr(objeto, nome):
+                setattr(objeto, nome, self.envolver(f"{prefixo}.{nome}", getattr(objeto, nome),
+                                                    contador_saida))
+
+    def resumo(self) -> List[Dict[str, Any]]:
+        agregado: Dict[str, Dict[str, Any]] = {}
+        for registro in self.registros:
+            item = agregado.setdefault(registro['etapa'], {
+                'etapa': registro['etapa'], 'chamadas': 0, 'tempo_parede_s': 0.0,
+                'tempo_cpu_s': 0.0, 'linhas_entrada': None, 'linhas_saida': None,
+                'delta_pico_memoria_mb': None,
+            })
+            item['chamadas'] += 1
+            item['tempo_parede_s'] = round(item['tempo_parede_s'] + registro['tempo_parede_s'], 6)
+            item['tempo_cpu_s'] = round(item['tempo_cpu_s'] + registro['tempo_cpu_s'], 6)
+            # etapas que não medem linhas (ex.: retorno bool) ficam com None, não com 0
+            for campo in ('linhas_entrada', 'linhas_saida'):
+                if registro[campo] is not None:
+                    item[campo] = (item[campo] or 0) + registro[campo]
+            if registro['delta_pico_memoria_mb'] is not None:
+                item['delta_pico_memoria_mb'] = max(item['delta_pico_memoria_mb'] or 0,
+                                                    registro['delta_pico_memoria_mb'])
+        return sorted(agregado.values(), key=lambda r: r['tempo_parede_s'], reverse=True)
+
+    def emitir_relatorio(self, arquivo_jsonl: Optional[str] = None,
+                         arquivo_prometheus: Optional[str] = None) -> List[Dict[str, Any]]:
+        resumo = self.resumo()
+
+        self.logger.info("MÉTRICAS POR ETAPA (ordenadas por tempo de parede)")
+        for item in resumo:
+            self.logger.info(f"  {item['etapa']:<50} {item['tempo_parede_s']:>9.3f}s parede "
+                           f"{item['tempo_cpu_s']:>9.3f}s CPU  {item['chamadas']:>4} chamadas  "
+                           f"linhas {_ou_traco(item['linhas_entrada'])} -> "
+                           f"{_ou_traco(item['linhas_saida'])}  "
+                           f"Δpico {item['delta_pico_memoria_mb']} MB")
+
+        execucao = self.inicio_execucao.isoformat(timespec='seconds')
+        if arquivo_jsonl:
+            try:
+                Path(arquivo_jsonl).parent.mkdir(parents=True, exist_ok=True)
+                with open(arquivo_jsonl, 'a', encoding='utf-8') as arquivo:
+                    for registro in self.registros:
+                        arquivo.write(json.dumps({'execucao': execucao, 'tipo': 'chamada', **registro},
+                                                 ensure_ascii=False) + '\n')
+                    for item in resumo:
+                        arquivo.write(json.dumps({'execucao': execucao, 'tipo': 'resumo', **item},
+                                                 ensure_ascii=False) + '\n')
+                self.logger.info(f"Métricas gravadas em {arquivo_jsonl}")
+            except OSError as e:
+                self.logger.warning(f"Não foi possível gravar métricas em {arquivo_jsonl}: {e}")
+
+        if arquivo_prometheus:
+            self._gravar_prometheus(arquivo_prometheus, resumo)
+
+        return resumo
+
+    def _gravar_prometheus(self, caminho: str, resumo: List[Dict[str, Any]]) -> None:
+        metricas = [
+            ('etl_etapa_tempo_parede_segundos', 'tempo_parede_s', 'Tempo de parede por etapa do ETL'),
+            ('etl_etapa_tempo_cpu_segundos', 'tempo_cpu_s', 'Tempo de CPU por etapa do ETL'),
+            ('etl_etapa_linhas_saida', 'linhas_saida', 'Linhas na saída de cada etapa do ETL'),
+            ('etl_etapa_delta_pico_memoria_mb', 'delta_pico_memoria_mb', 'Aumento do pico de RSS por etapa'),
+        ]
+        linhas = []
+        for nome, campo, ajuda in metricas:
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} gauge")
+            for item in resumo:
+                if item[campo] is not None:
+                    linhas.append(f'{nome}{{etapa="{item["etapa"]}"}} {item[campo]}')
+
+        # textfile collector lê o arquivo a qualquer momento: grava em temporário e renomeia
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        try:
+            Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+            Path(temporario).write_text('\n'.join(linhas) + '\n', encoding='utf-8')
+            os.replace(temporario, caminho)
+            self.logger.info(f"Métricas Prometheus gravadas em {caminho}")
+        except OSError as e:
+            self.logger.warning(f"Não foi possível gravar métricas Prometheus em {caminho}: {e}")
+
+    @contextmanager
+    def perfil(self, modo: Optional[str], destino: Optional[str] = None, top: int = 20):
+        """Perfilamento opcional da execução: 'cprofile', 'tracemalloc' ou None"""
+        if not modo:
+            yield
+            return
+
+        if modo == 'cprofile':
+            perfilador = cProfile.Profile()
+            perfilador.enable()
+            try:
+                yield
+            finally:
+                perfilador.disable()
+                if destino:
+                    perfilador.dump_stats(destino)
+                    self.logger.info(f"Perfil cProfile gravado em {destino}")
+                saida = io.StringIO()
+                pstats.Stats(perfilador, stream=saida).sort_stats('cumulative').print_stats(top)
+                self.logger.info(f"Perfil cProfile (top {top} por tempo acumulado):\n{saida.getvalue()}")
+
+        elif modo == 'tracemalloc':
+            tracemalloc.start()
+            try:
+                yield
+            finally:
+                snapshot = tracemalloc.take_snapshot()
+                atual, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                if destino:
+                    snapshot.dump(destino)
+                    self.logger.info(f"Snapshot tracemalloc gravado em {destino}")
+                self.logger.info(f"tracemalloc: pico {pico / 1024 / 1024:.1f} MB, "
+                               f"atual {atual / 1024 / 1024:.1f} MB")
+                for estatistica in snapshot.statistics('lineno')[:top]:
+                    self.logger.info(f"  {estatistica}")
+
+        else:
+            self.logger.warning(f"Modo de perfil desconhecido '{modo}', ignorado")
+            yield
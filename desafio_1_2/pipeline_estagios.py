@@ -0,0 +1,288 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Callable, Tuple
+
+import pandas as pd
+
+# intervalo em que filas bloqueadas conferem se o pipeline foi cancelado
+INTERVALO_FILA = 0.1
+
+class PipelineCancelado(Exception):
+    """Levantada nos estágios quando outro estágio do pipeline falhou"""
+
+class _Fim:
+    """Marca o fim do fluxo; atravessa filas entre processos por pickle"""
+
+def _linhas(item: Any) -> int:
+    return len(item) if isinstance(item, pd.DataFrame) else 0
+
+def _novas_estatisticas(nome: str, tipo: str) -> Dict[str, Any]:
+    return {'estagio': nome, 'tipo': tipo, 'itens': 0, 'linhas': 0,
+            'ocupado_s': 0.0, 'espera_entrada_s': 0.0, 'espera_saida_s': 0.0}
+
+def _colocar(fila, item: Any, cancelado, estatisticas: Dict[str, Any]) -> None:
+    # fila cheia bloqueia o produtor: é a contrapressão que limita os chunks em memória
+    inicio = time.perf_counter()
+    try:
+        while not cancelado.is_set():
+            try:
+                fila.put(item, timeout=INTERVALO_FILA)
+                return
+            except queue.Full:
+                continue
+        raise PipelineCancelado("pipeline cancelado após falha em outro estágio")
+    finally:
+        estatisticas['espera_saida_s'] += time.perf_counter() - inicio
+
+def _obter(fila, cancelado, estatisticas: Dict[str, Any]) -> Any:
+    inicio = time.perf_counter()
+    try:
+        while not cancelado.is_set():
+            try:
+                return fila.get(timeout=INTERVALO_FILA)
+            except queue.Empty:
+                continue
+        raise PipelineCancelado("pipeline cancelado após falha em outro estágio")
+    finally:
+        estatisticas['espera_entrada_s'] += time.perf_counter() - inicio
+
+def _executar_fonte(fonte: Iterable, saida, cancelado,
+                    estatisticas: Dict[str, Any]) -> Optional[str]:
+    try:
+        iterador = iter(fonte)
+        while True:
+            inicio = time.perf_counter()
+            try:
+                item = next(iterador)
+            except StopIteration:
+                break
+            finally:
+                estatisticas['ocupado_s'] += time.perf_counter() - inicio
+            estatisticas['itens'] += 1
+            estatisticas['linhas'] += _linhas(item)
+            _colocar(saida, item, cancelado, estatisticas)
+        _colocar(saida, _Fim(), cancelado, estatisticas)
+        return None
+    except PipelineCancelado:
+        return None
+    except Exception as e:
+        cancelado.set()
+        return f"{type(e).__name__}: {e}"
+    finally:
+        fechar = getattr(fonte, 'close', None)
+        if fechar is not None:
+            fechar()
+
+def _executar_estagio(funcao: Callable[[Any], Any], entrada, saida, cancelado,
+                      estatisticas: Dict[str, Any]) -> Optional[str]:
+    try:
+        while True:
+            item = _obter(entrada, cancelado, estatisticas)
+            if isinstance(item, _Fim):
+                break
+            inicio = time.perf_counter()
+            resultado = funcao(item)
+            estatisticas['ocupado_s'] += time.perf_counter() - inicio
+            estatisticas['itens'] += 1
+            estatisticas['linhas'] += _linhas(resultado)
+            _colocar(saida, resultado, cancelado, estatisticas)
+        _colocar(saida, _Fim(), cancelado, estatisticas)
+        return None
+    except PipelineCancelado:
+        return None
+    except Exception as e:
+        cancelado.set()
+        return f"{type(e).__name__}: {e}"
+    finally:
+        fechar = getattr(funcao, 'fechar', None)
+        if fechar is not None:
+            fechar()
+
+def _processo_estagio(funcao: Callable[[Any], Any], entrada, saida, cancelado, retorno,
+                      nome: str) -> None:
+    estatisticas = _novas_estatisticas(nome, 'processo')
+    erro = _executar_estagio(funcao, entrada, saida, cancelado, estatisticas)
+    if cancelado.is_set():
+        # itens que ninguém vai ler não podem segurar a saída do processo
+        saida.cancel_join_thread()
+    retorno.put((estatisticas, erro))
+
+class Estagio:
+    """Etapa do pipeline que aplica `funcao` a cada item, na ordem de chegada.
+
+    Com `processo=True` a etapa roda num processo próprio: `funcao` precisa ser
+    serializável e os itens atravessam as filas por pickle. Se `funcao` tiver um
+    método `fechar`, ele é chamado quando a etapa termina.
+    """
+
+    def __init__(self, nome: str, funcao: Callable[[Any], Any], processo: bool = False):
+        self.nome = nome
+        self.funcao = funcao
+        self.processo = processo
+
+class ExecutorPipeline:
+    """Executa fonte -> estágios -> destino em paralelo, ligados por filas limitadas.
+
+    A fonte e cada estágio rodam na sua thread (ou processo); o destino roda na
+    thread chamadora e recebe um iterador, como os métodos `carregar_chunks_*`
+    do ConectorBancoDados. Assim o chunk N é carregado enquanto o N+1 é
+    transformado e o N+2 lido. A primeira falha cancela todos os estágios e o
+    iterador do destino levanta PipelineCancelado.
+    """
+
+    def __init__(self, logger: logging.Logger, capacidade_fila: int = 2):
+        self.logger = logger
+        self.capacidade_fila = max(1, capacidade_fila)
+        self.estatisticas: List[Dict[str, Any]] = []
+        self.erros: List[Tuple[str, str]] = []
+        self.tempo_total_s = 0.0
+
+    def _consumir(self, entrada, cancelado, estatisticas: Dict[str, Any]) -> Iterator[Any]:
+        while True:
+            item = _obter(entrada, cancelado, estatisticas)
+            if isinstance(item, _Fim):
+                estatisticas['concluido'] = True
+                return
+            estatisticas['itens'] += 1
+            estatisticas['linhas'] += _linhas(item)
+            inicio = time.perf_counter()
+            yield item
+            estatisticas['ocupado_s'] += time.perf_counter() - inicio
+
+    def executar(self, fonte: Iterable, estagios: List[Estagio],
+                 destino: Callable[[Iterable], Any], nome_fonte: str = 'fonte',
+                 nome_destino: str = 'destino') -> Any:
+        """Resultado de `destino`, ou None se algum estágio falhou"""
+        contexto = multiprocessing.get_context()
+        com_processos = any(e.processo for e in estagios)
+        cancelado = contexto.Event() if com_processos else threading.Event()
+
+        # fila i liga o estágio i - 1 (ou a fonte) ao estágio i (ou ao destino)
+        filas = []
+        for i in range(len(estagios) + 1):
+            vizinhos = estagios[max(i - 1, 0):i + 1]
+            filas.append(contexto.Queue(self.capacidade_fila) if any(e.processo for e in vizinhos)
+                         else queue.Queue(self.capacidade_fila))
+
+        self.estatisticas = [_novas_estatisticas(nome_fonte, 'thread')]
+        self.erros = []
+        resultados: Dict[int, Optional[str]] = {}
+        threads, processos = [], []
+
+        def rodar(indice: int, alvo: Callable, *args) -> None:
+            resultados[indice] = alvo(*args, self.estatisticas[indice])
+
+        # processos antes das threads: fork com threads rodando pode herdar travas presas
+        for i, estagio in enumerate(estagios, start=1):
+            if estagio.processo:
+                retorno = contexto.Queue()
+                processo = contexto.Process(
+                    target=_processo_estagio, name=f'pipeline-{estagio.nome}', daemon=True,
+                    args=(estagio.funcao, filas[i - 1], filas[i], cancelado, retorno, estagio.nome))
+                processo.start()
+                processos.append((i, processo, retorno))
+                self.estatisticas.append(_novas_estatisticas(estagio.nome, 'processo'))
+            else:
+                self.estatisticas.append(_novas_estatisticas(estagio.nome, 'thread'))
+                threads.append(threading.Thread(
+                    target=rodar, name=f'pipeline-{estagio.nome}', daemon=True,
+                    args=(i, _executar_estagio, estagio.funcao, filas[i - 1], filas[i], cancelado)))
+        threads.append(threading.Thread(target=rodar, name=f'pipeline-{nome_fonte}', daemon=True,
+                                        args=(0, _executar_fonte, fonte, filas[0], cancelado)))
+
+        estatisticas_destino = _novas_estatisticas(nome_destino, 'principal')
+        nomes = [nome_fonte] + [e.nome for e in estagios]
+        resultado = None
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        try:
+            resultado = destino(self._consumir(filas[-1], cancelado, estatisticas_destino))
+        except PipelineCancelado:
+            pass
+        except Exception as e:
+            self.erros.append((nome_destino, f"{type(e).__name__}: {e}"))
+        finally:
+            # um destino que para antes do fim não pode deixar produtores bloqueados
+            if not cancelado.is_set() and not estatisticas_destino.pop('concluido', False):
+                self.erros.append((nome_destino, "destino encerrou antes de consumir todos os itens"))
+            estatisticas_destino.pop('concluido', None)
+            cancelado.set()
+
+            for thread in threads:
+                thread.join()
+            for i, processo, retorno in processos:
+                try:
+                    self.estatisticas[i], resultados[i] = retorno.get(timeout=30)
+                except queue.Empty:
+                    resultados[i] = "processo terminou sem devolver o resultado"
+                processo.join(timeout=5)
+                if processo.is_alive():
+                    processo.terminate()
+            for fila in filas:
+                if hasattr(fila, 'cancel_join_thread'):
+                    fila.cancel_join_thread()
+
+            self.tempo_total_s = time.perf_counter() - inicio
+            self.estatisticas.append(estatisticas_destino)
+
+        self.erros = [(nomes[i], erro) for i, erro in sorted(resultados.items()) if erro] + self.erros
+        for estagio, erro in self.erros:
+            self.logger.error(f"Estágio '{estagio}' do pipeline falhou: {erro}")
+        self.registrar_vazao()
+        return None if self.erros else resultado
+
+    def relatorio(self) -> List[Dict[str, Any]]:
+        relatorio = []
+        for item in self.estatisticas:
+            ocupado = item['ocupado_s']
+            relatorio.append({
+                **{k: (round(v, 6) if isinstance(v, float) else v) for k, v in item.items()},
+                'linhas_por_s': round(item['linhas'] / ocupado, 1) if ocupado > 0 else None,
+                'utilizacao': round(ocupado / self.tempo_total_s, 3) if self.tempo_total_s > 0 else None,
+            })
+        return relatorio
+
+    def registrar_vazao(self) -> None:
+        relatorio = self.relatorio()
+        self.logger.info(f"VAZÃO POR ESTÁGIO DO PIPELINE ({self.tempo_total_s:.3f}s no total)")
+        for item in relatorio:
+            self.logger.info(f"  {item['estagio']:<12} {item['tipo']:<9} {item['itens']:>5} itens "
+                           f"{item['linhas']:>9} linhas  ocupado {item['ocupado_s']:>8.3f}s "
+                           f"({item['linhas_por_s']} linhas/s, utilização {item['utilizacao']})  "
+                           f"espera entrada {item['espera_entrada_s']:.3f}s  "
+                           f"saída {item['espera_saida_s']:.3f}s")
+        if relatorio:
+            gargalo = max(relatorio, key=lambda r: r['ocupado_s'])
+            self.logger.info(f"Gargalo: estágio '{gargalo['estagio']}' "
+                           f"({gargalo['ocupado_s']:.3f}s ocupado)")
+
+class TransformacaoChunks:
+    """Estágio de transformação serializável, para rodar num processo separado.
+
+    O TransformadorDados é criado no próprio processo na primeira chamada e
+    mantém o estado de deduplicação entre chunks, como no modo em chunks serial.
+    """
+
+    def __init__(self, valores_preenchimento: Dict[str, Any], parametros_dedup: Dict[str, Any]):
+        self.valores_preenchimento = valores_preenchimento
+        self.parametros_dedup = parametros_dedup
+        self._transformador = None
+
+    def __call__(self, chunk: pd.DataFrame) -> Optional[pd.DataFrame]:
+        if self._transformador is None:
+            from dia2 import TransformadorDados
+            from deduplicacao import Deduplicador
+
+            logger = logging.getLogger('ETL_Pipeline')
+            self._transformador = TransformadorDados(logger, Deduplicador(logger, **self.parametros_dedup))
+            self._transformador.iniciar_streaming(self.valores_preenchimento)
+        return self._transformador.transformar_chunk(chunk)
+
+    def fechar(self) -> None:
+        if self._transformador is not None:
+            self._transformador.deduplicador.fechar()
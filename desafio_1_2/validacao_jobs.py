@@ -0,0 +1,172 @@
+import logging
+import re
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+# (nome da regra, colunas necessárias, função(df, cache) que devolve a máscara de violações)
+Regra = Tuple[str, List[str], Callable[[pd.DataFrame, Dict[str, np.ndarray]], np.ndarray]]
+
+def _comprimentos(serie: pd.Series) -> np.ndarray:
+    # em colunas category basta medir os rótulos e espalhar pelos códigos
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        tamanhos = np.append(serie.cat.categories.astype(str).str.len().to_numpy(), 0)
+        return tamanhos[serie.cat.codes.to_numpy()]
+    return serie.astype(str).str.len().to_numpy() * serie.notna().to_numpy()
+
+def _numerico(serie: pd.Series) -> np.ndarray:
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+def _datas(df: pd.DataFrame, coluna: str, cache: Dict[str, np.ndarray]) -> np.ndarray:
+    # datas repetem muito: converte só os valores distintos e reaproveita entre regras
+    if coluna not in cache:
+        codigos, distintos = pd.factorize(df[coluna])
+        convertidos = pd.to_datetime(distintos, format='%Y-%m-%d', errors='coerce').to_numpy()
+        cache[coluna] = np.append(convertidos, np.datetime64('NaT'))[codigos]
+    return cache[coluna]
+
+class EsquemaJobsAI:
+    """Regras vetorizadas derivadas do DDL da tabela jobs_ai, montadas uma única vez.
+
+    Cada regra devolve uma máscara NumPy das linhas que a violam; nulos só são
+    rejeitados onde o DDL não os aceitaria (chave primária e NOT NULL).
+    """
+
+    LIMITE_INT = 2 ** 31 - 1
+
+    def __init__(self, colunas_ddl: Dict[str, str], obrigatorias: Iterable[str] = ()):
+        self.colunas_ddl = colunas_ddl
+        self.regras: List[Regra] = []
+        for coluna, tipo in colunas_ddl.items():
+            self.regras.extend(self._regras_coluna(coluna, tipo.upper()))
+        for coluna in obrigatorias:
+            # SERIAL já rejeita nulos na própria regra
+            if coluna in colunas_ddl and colunas_ddl[coluna].upper() != 'SERIAL':
+                self.regras.append((f'{coluna} nulo (NOT NULL)', [coluna],
+                                    lambda df, cache, coluna=coluna: df[coluna].isna().to_numpy()))
+        if 'posting_date' in colunas_ddl and 'application_deadline' in colunas_ddl:
+            self.regras.append(('posting_date > application_deadline',
+                                ['posting_date', 'application_deadline'], self._ordem_datas))
+
+    @classmethod
+    def do_ddl(cls) -> 'EsquemaJobsAI':
+        from dbcreate import colunas_jobs_ai, colunas_obrigatorias_jobs_ai
+        return cls(colunas_jobs_ai(), colunas_obrigatorias_jobs_ai())
+
+    def _regras_coluna(self, coluna: str, tipo: str) -> List[Regra]:
+        varchar = re.fullmatch(r'VARCHAR\((\d+)\)', tipo)
+        decimal = re.fullmatch(r'DECIMAL\((\d+),\s*(\d+)\)', tipo)
+
+        if varchar:
+            limite = int(varchar.group(1))
+            return [(f'{coluna} excede VARCHAR({limite})', [coluna],
+                     lambda df, cache: _comprimentos(df[coluna]) > limite)]
+
+        if decimal:
+            precisao, escala = int(decimal.group(1)), int(decimal.group(2))
+            maximo = 10 ** (precisao - escala)
+
+            def fora_decimal(df: pd.DataFrame, cache: Dict[str, np.ndarray]) -> np.ndarray:
+                if pd.api.types.is_integer_dtype(df[coluna]):
+                    return np.abs(df[coluna].to_numpy()) >= maximo
+                valores = _numerico(df[coluna])
+                nao_numerico = np.isnan(valores) & df[coluna].notna().to_numpy()
+                return nao_numerico | (np.abs(np.nan_to_num(valores)) >= maximo)
+
+            return [(f'{coluna} fora de DECIMAL({precisao}, {escala})', [coluna], fora_decimal)]
+
+        if tipo == 'INT':
+            def fora_int(df: pd.DataFrame, cache: Dict[str, np.ndarray]) -> np.ndarray:
+                if pd.api.types.is_integer_dtype(df[coluna]):
+                    return np.abs(df[coluna].to_numpy()) > self.LIMITE_INT
+                valores = _numerico(df[coluna])
+                presentes = df[coluna].notna().to_numpy()
+                com_valor = np.nan_to_num(valores)
+                invalido = np.isnan(valores) | (com_valor != np.trunc(com_valor)) \
+                    | (np.abs(com_valor) > self.LIMITE_INT)
+                return invalido & presentes
+
+            return [(f'{coluna} não é INT', [coluna], fora_int)]
+
+        if tipo == 'SERIAL':
+            def chave_invalida(df: pd.DataFrame, cache: Dict[str, np.ndarray]) -> np.ndarray:
+                serie = df[coluna]
+                if pd.api.types.is_integer_dtype(serie):
+                    return (serie.to_numpy() <= 0) | (serie.to_numpy() > self.LIMITE_INT)
+                # 'AI00001' vira 1 na carga, então precisa conter dígitos
+                return ~serie.astype(str).str.contains(r'\d', regex=True).to_numpy(dtype=bool) \
+                    | serie.isna().to_numpy()
+
+            return [(f'{coluna} inválido para SERIAL', [coluna], chave_invalida)]
+
+        if tipo == 'DATE':
+            def data_invalida(df: pd.DataFrame, cache: Dict[str, np.ndarray]) -> np.ndarray:
+                return np.isnat(_datas(df, coluna, cache)) & df[coluna].notna().to_numpy()
+
+            return [(f'{coluna} não é DATE (AAAA-MM-DD)', [coluna], data_invalida)]
+
+        return []
+
+    @staticmethod
+    def _ordem_datas(df: pd.DataFrame, cache: Dict[str, np.ndarray]) -> np.ndarray:
+        # comparações com NaT são falsas, então datas ausentes não entram aqui
+        return _datas(df, 'posting_date', cache) > _datas(df, 'application_deadline', cache)
+
+    def validar(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Separa (válidas, quarentena); a quarentena ganha a coluna `motivos`"""
+        if df is None or df.empty:
+            return df, df.iloc[0:0] if df is not None else pd.DataFrame()
+
+        cache: Dict[str, np.ndarray] = {}
+        violacoes = [(nome, regra(df, cache)) for nome, colunas, regra in self.regras
+                     if all(c in df.columns for c in colunas)]
+
+        if not violacoes:
+            return df, df.iloc[0:0]
+
+        matriz = np.column_stack([mascara for _, mascara in violacoes])
+        ruins = matriz.any(axis=1)
+        if not ruins.any():
+            return df, df.iloc[0:0]
+
+        nomes = np.array([nome for nome, _ in violacoes], dtype=object)
+        motivos = ['; '.join(nomes[linha]) for linha in matriz[ruins]]
+        quarentena = df[ruins].assign(motivos=motivos)
+        return df[~ruins], quarentena
+
+class EtapaValidacao:
+    """Etapa do PipelineETL: aplica o esquema e grava linhas rejeitadas em quarentena"""
+
+    def __init__(self, logger: logging.Logger, arquivo_quarentena: Optional[str] = None,
+                 esquema: Optional[EsquemaJobsAI] = None):
+        self.logger = logger
+        self.arquivo_quarentena = arquivo_quarentena
+        self.esquema = esquema or EsquemaJobsAI.do_ddl()
+        self.total_quarentena = 0
+        self._cabecalho_gravado = False
+
+    def validar(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df is None or df.empty:
+            return df
+
+        validos, quarentena = self.esquema.validar(df)
+        if not quarentena.empty:
+            self.total_quarentena += len(quarentena)
+            self.logger.warning(f"{len(quarentena)} linhas em quarentena por violar o esquema jobs_ai")
+            self._gravar_quarentena(quarentena)
+        return validos
+
+    def _gravar_quarentena(self, quarentena: pd.DataFrame) -> None:
+        if not self.arquivo_quarentena:
+            return
+        try:
+            Path(self.arquivo_quarentena).parent.mkdir(parents=True, exist_ok=True)
+            # a primeira escrita da execução substitui o arquivo; as seguintes anexam
+            modo = 'a' if self._cabecalho_gravado else 'w'
+            quarentena.to_csv(self.arquivo_quarentena, mode=modo, index=False,
+                              header=not self._cabecalho_gravado)
+            self._cabecalho_gravado = True
+        except OSError as e:
+            self.logger.error(f"Não foi possível gravar a quarentena em {self.arquivo_quarentena}: {e}")
@@ -0,0 +1,179 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+# colunas do catálogo na ordem da exportação; rating vira rating_rate e rating_count
+COLUNAS = {
+    'id': 'INTEGER PRIMARY KEY',
+    'title': 'TEXT',
+    'price': 'REAL',
+    'description': 'TEXT',
+    'category': 'TEXT',
+    'image': 'TEXT',
+    'rating_rate': 'REAL',
+    'rating_count': 'INTEGER',
+}
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS produtos (
+    {', '.join(f'{coluna} {tipo}' for coluna, tipo in COLUNAS.items())},
+    hash TEXT NOT NULL,
+    atualizado_em TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sincronizacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    iniciada_em TEXT NOT NULL,
+    concluida_em TEXT,
+    novos INTEGER NOT NULL DEFAULT 0,
+    alterados INTEGER NOT NULL DEFAULT 0,
+    inalterados INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS alteracoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sincronizacao INTEGER NOT NULL REFERENCES sincronizacoes (id),
+    produto INTEGER NOT NULL,
+    operacao TEXT NOT NULL,
+    campos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exportacoes (
+    caminho TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alteracoes_produto ON alteracoes (produto);
+"""
+
+
+def achatar(produto):
+    """{'rating': {'rate': 3.9, 'count': 120}} -> {'rating_rate': 3.9, 'rating_count': 120}"""
+    plano = {}
+    for chave, valor in produto.items():
+        if isinstance(valor, dict):
+            for subchave, subvalor in valor.items():
+                plano[f'{chave}_{subchave}'] = subvalor
+        else:
+            plano[chave] = valor
+    return plano
+
+
+def hash_produto(plano):
+    return hashlib.sha1(json.dumps(plano, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _agora():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class CatalogoProdutos:
+    """Catálogo local de produtos em SQLite, chaveado pelo id, com hash do conteúdo.
+
+    `aplicar` compara o hash do produto baixado com o guardado e só grava
+    produtos novos ou alterados, registrando em `alteracoes` os campos que
+    mudaram (antes e depois). A versão do catálogo (total de alterações) diz
+    se a última exportação de um arquivo ainda vale, e `exportar` só regrava
+    o CSV/Parquet quando há algo novo.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.row_factory = sqlite3.Row
+        with self._conexao:
+            self._conexao.executescript(ESQUEMA)
+        # hashes em memória: produtos inalterados não tocam o banco
+        self._hashes = dict(self._conexao.execute('SELECT id, hash FROM produtos'))
+        self._sincronizacao = None
+        self.totais = {'novos': 0, 'alterados': 0, 'inalterados': 0}
+
+    def versao(self):
+        return self._conexao.execute('SELECT COALESCE(MAX(id), 0) FROM alteracoes').fetchone()[0]
+
+    def iniciar(self):
+        self.totais = {'novos': 0, 'alterados': 0, 'inalterados': 0}
+        with self._conexao:
+            cursor = self._conexao.execute('INSERT INTO sincronizacoes (iniciada_em) VALUES (?)', (_agora(),))
+        self._sincronizacao = cursor.lastrowid
+
+    def aplicar(self, produto):
+        """Grava o produto se for novo ou tiver mudado; devolve 'novo', 'alterado' ou 'inalterado'"""
+        plano = {coluna: valor for coluna, valor in achatar(produto).items() if coluna in COLUNAS}
+        plano['id'] = int(plano['id'])
+        hash_novo = hash_produto(plano)
+        hash_antigo = self._hashes.get(plano['id'])
+        if hash_antigo == hash_novo:
+            self.totais['inalterados'] += 1
+            return 'inalterado'
+
+        if hash_antigo is None:
+            operacao, campos = 'novo', {c: [None, v] for c, v in plano.items() if c != 'id'}
+        else:
+            anterior = dict(self._conexao.execute('SELECT * FROM produtos WHERE id = ?',
+                                                  (plano['id'],)).fetchone())
+            operacao = 'alterado'
+            campos = {c: [anterior.get(c), plano.get(c)] for c in COLUNAS
+                      if c != 'id' and anterior.get(c) != plano.get(c)}
+
+        colunas = list(COLUNAS)
+        valores = [plano.get(c) for c in colunas] + [hash_novo, _agora()]
+        with self._conexao:
+            self._conexao.execute(
+                f"INSERT OR REPLACE INTO produtos ({', '.join(colunas)}, hash, atualizado_em) "
+                f"VALUES ({', '.join('?' * len(valores))})", valores)
+            self._conexao.execute(
+                'INSERT INTO alteracoes (sincronizacao, produto, operacao, campos) VALUES (?, ?, ?, ?)',
+                (self._sincronizacao, plano['id'], operacao, json.dumps(campos, ensure_ascii=False)))
+        self._hashes[plano['id']] = hash_novo
+        self.totais[f'{operacao}s'] += 1
+        return operacao
+
+    def concluir(self):
+        with self._conexao:
+            self._conexao.execute(
+                'UPDATE sincronizacoes SET concluida_em = ?, novos = ?, alterados = ?, inalterados = ? '
+                'WHERE id = ?', (_agora(), self.totais['novos'], self.totais['alterados'],
+                                 self.totais['inalterados'], self._sincronizacao))
+        return self.totais
+
+    def alteracoes(self, sincronizacao=None):
+        """Changelog [(sincronização, produto, operação, {campo: [antes, depois]})], da última por padrão"""
+        if sincronizacao is None:
+            sincronizacao = self._sincronizacao
+        linhas = self._conexao.execute(
+            'SELECT sincronizacao, produto, operacao, campos FROM alteracoes WHERE sincronizacao = ? '
+            'ORDER BY id', (sincronizacao,)).fetchall()
+        return [(s, p, o, json.loads(c)) for s, p, o, c in linhas]
+
+    def exportar(self, destino, formato=None):
+        """Regrava `destino` (.csv ou .parquet) só se o catálogo mudou desde a última exportação"""
+        formato = formato or ('parquet' if destino.endswith('.parquet') else 'csv')
+        chave = os.path.abspath(destino)
+        versao = self.versao()
+        exportada = self._conexao.execute('SELECT versao FROM exportacoes WHERE caminho = ?',
+                                          (chave,)).fetchone()
+        if exportada is not None and exportada[0] == versao and os.path.exists(destino):
+            return False
+
+        colunas = list(COLUNAS)
+        cursor = self._conexao.execute(f"SELECT {', '.join(colunas)} FROM produtos ORDER BY id")
+        temporario = f'{destino}.tmp'
+        if formato == 'parquet':
+            import pandas as pd
+
+            pd.DataFrame(cursor.fetchall(), columns=colunas).to_parquet(temporario, index=False)
+        else:
+            with open(temporario, 'w', newline='', encoding='utf-8-sig') as arquivo:
+                escritor = csv.writer(arquivo)
+                escritor.writerow(colunas)
+                escritor.writerows(cursor)
+        os.replace(temporario, destino)
+
+        with self._conexao:
+            self._conexao.execute('INSERT OR REPLACE INTO exportacoes (caminho, versao) VALUES (?, ?)',
+                                  (chave, versao))
+        return True
+
+    def fechar(self):
+        self._conexao.close()
@@ -1,32 +1,155 @@
-import pandas as p
-import requests
+import argparse
+import asyncio
+import csv
+import json
 import os
+import random
+import sys
+
+import aiohttp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache_http import adicionar_argumentos, cache_dos_argumentos  # noqa: E402
+from catalogo_produtos import CatalogoProdutos, achatar  # noqa: E402
+
+URL_BASE = "https://fakestoreapi.com"
 
-dados_produtos = []
 caminho = os.path.join(os.path.dirname(__file__), '..', 'arquivos_diversos')
 caminho = os.path.abspath(caminho)
 
-os.makedirs(caminho, exist_ok=True)
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+MAX_ALTERACOES_EXIBIDAS = 20
+
+
+async def buscar_produto(sessao, semaforo, url_base, produto_id, tentativas=3, espera_base=0.5,
+                         cache=None):
+    url = f"{url_base}/products/{produto_id}"
+
+    for tentativa in range(1, tentativas + 1):
+        async with semaforo:
+            try:
+                if cache is not None:
+                    # respostas frescas voltam do disco; vencidas são revalidadas com ETag
+                    resposta = await cache.obter_async(sessao, url)
+                    status = resposta.status_code
+                    if status == 200:
+                        return resposta.dados
+                else:
+                    async with sessao.get(url) as response:
+                        status = response.status
+                        if status == 200:
+                            corpo = await response.text()
+                            # a fakestoreapi responde 200 com corpo vazio para IDs inexistentes
+                            return json.loads(corpo) if corpo.strip() else None
+                if status not in STATUS_REPETIR:
+                    return None
+                erro = f"status {status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+                erro = e
+
+        if tentativa < tentativas:
+            # backoff exponencial com jitter completo, fora do semáforo para não segurar a vaga
+            await asyncio.sleep(random.uniform(0, espera_base * 2 ** (tentativa - 1)))
+
+    print(f"Erro ao buscar produto {produto_id} após {tentativas} tentativas: {erro}")
+    return None
+
+
+async def baixar_produtos(ids, arquivo_csv, url_base=URL_BASE, concorrencia=10, timeout=10,
+                          tentativas=3, cache=None, catalogo=None):
+    """Busca os produtos com concorrência limitada e grava cada um no CSV assim que chega.
+
+    Com `catalogo`, os produtos vão para o CatalogoProdutos, que só grava os novos
+    ou alterados, e o CSV não é tocado aqui.
+    """
+    semaforo = asyncio.Semaphore(concorrencia)
+    conector = aiohttp.TCPConnector(limit=concorrencia, keepalive_timeout=30)
+    limite_tempo = aiohttp.ClientTimeout(total=timeout)
+    salvos = 0
 
+    async with aiohttp.ClientSession(connector=conector, timeout=limite_tempo) as sessao:
+        tarefas = [buscar_produto(sessao, semaforo, url_base, i, tentativas, cache=cache) for i in ids]
 
-try:
-    for i in range(1, 21):
-        url = f"https://fakestoreapi.com/products/{i}"
-        response = requests.get(url)
-        
-        if response.status_code == 200:
-            produto = response.json()
-            dados_produtos.append(produto)
+        if catalogo is not None:
+            catalogo.iniciar()
+            for tarefa in asyncio.as_completed(tarefas):
+                produto = await tarefa
+                if produto is not None and catalogo.aplicar(produto) != 'inalterado':
+                    salvos += 1
+            catalogo.concluir()
+            return salvos
+
+        with open(arquivo_csv, 'w', newline='', encoding='utf-8-sig') as arquivo:
+            escritor = None
+            for tarefa in asyncio.as_completed(tarefas):
+                produto = await tarefa
+                if produto is None:
+                    continue
+
+                # rating vira rating_rate/rating_count em vez de um dict como texto
+                produto = achatar(produto)
+                if escritor is None:
+                    escritor = csv.DictWriter(arquivo, fieldnames=list(produto.keys()),
+                                              extrasaction='ignore')
+                    escritor.writeheader()
+                escritor.writerow(produto)
+                # cada linha chega ao disco antes do próximo produto: uma falha no meio não perde o que já veio
+                arquivo.flush()
+                salvos += 1
+
+    return salvos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baixa produtos da Fake Store API para CSV")
+    parser.add_argument('--inicio', type=int, default=1)
+    parser.add_argument('--fim', type=int, default=20)
+    parser.add_argument('--concorrencia', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=10, help="segundos por requisição")
+    parser.add_argument('--tentativas', type=int, default=3)
+    parser.add_argument('--url-base', default=URL_BASE, help="permite apontar para um servidor local")
+    parser.add_argument('--saida', default=os.path.join(caminho, 'dados_produtos.csv'),
+                        help="CSV, ou .parquet com --catalogo")
+    parser.add_argument('--catalogo', help="catálogo SQLite para sincronização incremental; "
+                                           "a saída só é regravada se algo mudou")
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+    cache = cache_dos_argumentos(args)
+    catalogo = CatalogoProdutos(args.catalogo) if args.catalogo else None
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+
+    try:
+        salvos = asyncio.run(baixar_produtos(range(args.inicio, args.fim + 1), args.saida,
+                                             args.url_base, args.concorrencia, args.timeout,
+                                             args.tentativas, cache, catalogo))
+        if catalogo is not None:
+            totais = catalogo.totais
+            print(f"Catálogo: {totais['novos']} novos, {totais['alterados']} alterados, "
+                  f"{totais['inalterados']} inalterados")
+            alteracoes = catalogo.alteracoes()
+            for _, produto, operacao, campos in alteracoes[:MAX_ALTERACOES_EXIBIDAS]:
+                print(f"  produto {produto} {operacao}: {', '.join(campos)}")
+            if len(alteracoes) > MAX_ALTERACOES_EXIBIDAS:
+                print(f"  ... e mais {len(alteracoes) - MAX_ALTERACOES_EXIBIDAS} (tabela alteracoes)")
+            if catalogo.exportar(args.saida):
+                print(f"Catálogo exportado para: {args.saida}")
+            else:
+                print(f"{args.saida} já está atualizado")
+        elif os.path.exists(args.saida):
+            print(f"{salvos} produtos salvos em: {args.saida}")
         else:
-            print(f"Erro ao buscar produto {i}")
-    
-    df = p.DataFrame(dados_produtos)
-    df.to_csv(os.path.join(caminho, 'dados_produtos.csv'), index=False, encoding='utf-8-sig')
-    if(os.path.exists(os.path.join(caminho, 'dados_produtos.csv'))):
-        print(f"Salvo em: {os.path.join(caminho, 'dados_produtos.csv')}") 
-    else:
-        print("Erro ao criar o arquivo CSV.")
-
-
-except Exception as e:
-    print(f"Erro: {e}")
+            print("Erro ao criar o arquivo CSV.")
+
+    except Exception as e:
+        print(f"Erro: {e}")
+    finally:
+        if cache is not None:
+            print(cache.resumo())
+            cache.fechar()
+        if catalogo is not None:
+            catalogo.fechar()
+
+
+if __name__ == '__main__':
+    main()
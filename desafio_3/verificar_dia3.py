@@ -0,0 +1,127 @@
+"""Verificação do dia3 contra um servidor aiohttp local que imita a Fake Store API.
+
+Cobre o limite de concorrência, a repetição com backoff em 5xx e timeouts e a
+gravação do CSV em streaming. Uso: python verificar_dia3.py
+"""
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+from dia3 import baixar_produtos
+
+CONCORRENCIA = 3
+TIMEOUT = 0.5
+ATRASO = 0.05
+ID_5XX = 4          # responde 503 duas vezes antes do 200
+ID_TIMEOUT = 5      # a primeira tentativa passa do timeout
+ID_INEXISTENTE = 6  # 200 com corpo vazio, como a fakestoreapi
+ID_LENTO = 12       # chega por último; o CSV já deve ter linhas nesse momento
+IDS = range(1, 13)
+
+
+class ServidorFalso:
+
+    def __init__(self, arquivo_csv):
+        self.arquivo_csv = arquivo_csv
+        self.ativas = 0
+        self.pico = 0
+        self.tentativas = {}
+        self.linhas_antes_do_lento = None
+
+    def _produto(self, produto_id):
+        return {'id': produto_id, 'title': f'produto {produto_id}', 'price': produto_id * 1.5,
+                'category': 'teste', 'rating': {'rate': 4.0, 'count': produto_id}}
+
+    async def produto(self, request):
+        produto_id = int(request.match_info['id'])
+        self.tentativas.setdefault(produto_id, []).append(time.monotonic())
+        tentativa = len(self.tentativas[produto_id])
+
+        self.ativas += 1
+        self.pico = max(self.pico, self.ativas)
+        try:
+            if produto_id == ID_TIMEOUT and tentativa == 1:
+                await asyncio.sleep(TIMEOUT * 3)
+            elif produto_id == ID_LENTO:
+                await asyncio.sleep(TIMEOUT * 0.8)
+                self.linhas_antes_do_lento = _contar_linhas(self.arquivo_csv)
+            else:
+                await asyncio.sleep(ATRASO)
+
+            if produto_id == ID_5XX and tentativa <= 2:
+                return web.Response(status=503)
+            if produto_id == ID_INEXISTENTE:
+                return web.Response(text='', content_type='application/json')
+            return web.json_response(self._produto(produto_id))
+        finally:
+            self.ativas -= 1
+
+
+def _contar_linhas(arquivo_csv):
+    if not os.path.exists(arquivo_csv):
+        return 0
+    with open(arquivo_csv, newline='', encoding='utf-8-sig') as arquivo:
+        return max(sum(1 for _ in csv.reader(arquivo)) - 1, 0)
+
+
+async def verificar():
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo_csv = os.path.join(diretorio, 'produtos.csv')
+        servidor = ServidorFalso(arquivo_csv)
+        app = web.Application()
+        app.router.add_get('/products/{id}', servidor.produto)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        porta = runner.addresses[0][1]
+
+        try:
+            salvos = await baixar_produtos(IDS, arquivo_csv, f'http://127.0.0.1:{porta}',
+                                           concorrencia=CONCORRENCIA, timeout=TIMEOUT, tentativas=3)
+        finally:
+            await runner.cleanup()
+
+        falhas = []
+
+        def checar(condicao, mensagem):
+            print(f"{'ok  ' if condicao else 'FALHA'} {mensagem}")
+            if not condicao:
+                falhas.append(mensagem)
+
+        checar(servidor.pico <= CONCORRENCIA,
+               f"no máximo {CONCORRENCIA} requisições simultâneas (pico {servidor.pico})")
+        checar(servidor.pico == CONCORRENCIA, "a concorrência permitida é usada")
+
+        tentativas_5xx = servidor.tentativas.get(ID_5XX, [])
+        checar(len(tentativas_5xx) == 3, f"503 é repetido até o 200 ({len(tentativas_5xx)} tentativas)")
+        checar(all(b > a for a, b in zip(tentativas_5xx, tentativas_5xx[1:])),
+               "as repetições do 503 acontecem em sequência, depois do backoff")
+        checar(len(servidor.tentativas.get(ID_TIMEOUT, [])) == 2, "timeout é repetido e a 2ª tentativa vale")
+        checar(len(servidor.tentativas.get(ID_INEXISTENTE, [])) == 1, "corpo vazio não é repetido")
+
+        esperados = len(IDS) - 1
+        linhas = _contar_linhas(arquivo_csv)
+        checar(salvos == esperados and linhas == esperados,
+               f"{esperados} produtos no CSV (salvos {salvos}, linhas {linhas})")
+        checar(bool(servidor.linhas_antes_do_lento),
+               f"CSV gravado em streaming ({servidor.linhas_antes_do_lento} linhas antes do último produto)")
+
+        with open(arquivo_csv, newline='', encoding='utf-8-sig') as arquivo:
+            cabecalho = next(csv.reader(arquivo))
+        checar('rating_rate' in cabecalho and 'rating' not in cabecalho, "rating achatado no CSV")
+
+        return not falhas
+
+
+def main():
+    sys.exit(0 if asyncio.run(verificar()) else 1)
+
+
+if __name__ == '__main__':
+    main()
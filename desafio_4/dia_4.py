@@ -1,29 +1,217 @@
+import argparse
+import json
+import os
+import sys
+from itertools import islice
+
 from pandera import Column, DataFrameSchema, Check
+from pandera.errors import SchemaErrors
 import pandas as pd
 import requests as req
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache_http import adicionar_argumentos, cache_dos_argumentos  # noqa: E402
+
 
 url = 'https://api.github.com/users/NandoSecOp/events'
-try:
-    resposta = req.get(url)
-    if resposta.status_code == 200:
-        dados = resposta.json()
-        df = pd.json_normalize(dados)
-        tipos_permitidos = ["PushEvent", "PullRequestEvent", "IssuesEvent"]
-        df = df[df["type"].isin(tipos_permitidos)]
-
-        schema = DataFrameSchema({
-            "type": Column(str, Check.isin(tipos_permitidos), nullable=False),
-            "created_at": Column(str, Check.str_matches(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z"), nullable=False),
-            "repo.name": Column(str, nullable=True),
-        })
+tipos_permitidos = ["PushEvent", "PullRequestEvent", "IssuesEvent"]
+FORMATO_DATA = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def data_no_formato(serie):
+    # uma conversão vetorizada por chunk, em vez de um regex por linha
+    return pd.to_datetime(serie, format=FORMATO_DATA, errors='coerce').notna()
+
+
+schema = DataFrameSchema({
+    "type": Column(str, Check.isin(tipos_permitidos), nullable=False),
+    "created_at": Column(str, Check(data_no_formato, error=f"created_at fora do formato {FORMATO_DATA}"),
+                         nullable=False),
+    "repo.name": Column(str, nullable=True),
+})
+
+
+def _itens_json(arquivo, tamanho_bloco=1 << 16):
+    """Elementos de um JSON com lista, decodificados um a um a partir de blocos do arquivo.
+
+    Só o elemento atual e um bloco ficam em memória. Um JSON que não é lista
+    vira um único registro.
+    """
+    decodificador = json.JSONDecoder()
+    buffer, fim = '', False
+
+    def completar():
+        nonlocal buffer, fim
+        bloco = arquivo.read(tamanho_bloco)
+        fim = not bloco
+        buffer += bloco
+
+    while not buffer.strip() and not fim:
+        completar()
+    buffer = buffer.lstrip()
+    if not buffer.startswith('['):
+        if buffer:
+            yield json.loads(buffer + arquivo.read())
+        return
+
+    posicao = 1
+    while True:
+        # espaços e a vírgula entre elementos
+        while True:
+            while posicao < len(buffer) and buffer[posicao] in ' \t\r\n,':
+                posicao += 1
+            if posicao < len(buffer) or fim:
+                break
+            completar()
+        if posicao >= len(buffer):
+            raise ValueError('JSON truncado: lista sem "]"')
+        if buffer[posicao] == ']':
+            return
 
         try:
-            schema.validate(df)
+            item, final = decodificador.raw_decode(buffer, posicao)
+            # só vale se o elemento terminou: um número cortado no bloco ('-4.') decodifica pela metade
+            if final == len(buffer) or buffer[final] not in ' \t\r\n,]':
+                raise ValueError(f'JSON inválido perto de {buffer[posicao:posicao + 20]!r}')
+        except ValueError:
+            if fim:
+                raise
+            completar()
+            continue
+        yield item
+        buffer, posicao = buffer[final:], 0
+
+
+def ler_registros(origem, cache=None):
+    """Gera eventos um a um de uma URL, de um arquivo NDJSON ou de um JSON com lista.
+
+    Arquivos (NDJSON ou lista) são lidos em streaming; uma URL é uma página da
+    API e vem inteira na resposta.
+    """
+    if origem.startswith(('http://', 'https://')):
+        if cache is None:
+            resposta = req.get(origem, timeout=10)
+            resposta.raise_for_status()
+            yield from resposta.json()
+        else:
+            resposta = cache.obter(req, origem, timeout=10)
+            resposta.raise_for_status()
+            yield from resposta.dados
+        return
+
+    with open(origem, encoding='utf-8') as arquivo:
+        if origem.endswith('.ndjson'):
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+        else:
+            yield from _itens_json(arquivo)
+
+
+def em_chunks(registros, tamanho):
+    iterador = iter(registros)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+class ValidadorEventos:
+    """Valida eventos chunk a chunk com lazy=True, separando linhas válidas e inválidas.
+
+    As falhas de todos os chunks vão para uma tabela compacta de erros, então a
+    validação não para no primeiro problema. Com arquivos .ndjson ou .json
+    (lidos em streaming por ler_registros) a memória fica limitada ao chunk.
+    """
+
+    def __init__(self, schema, destino_validos, destino_invalidos, destino_erros):
+        self.schema = schema
+        self.destino_validos = destino_validos
+        self.destino_invalidos = destino_invalidos
+        self.destino_erros = destino_erros
+        self.totais = {'lidos': 0, 'filtrados': 0, 'validos': 0, 'invalidos': 0, 'erros': 0}
+        for destino in (destino_validos, destino_invalidos, destino_erros):
+            if os.path.exists(destino):
+                os.remove(destino)
+
+    def _anexar_ndjson(self, df, destino):
+        if not df.empty:
+            with open(destino, 'a', encoding='utf-8') as arquivo:
+                df.to_json(arquivo, orient='records', lines=True, force_ascii=False)
+
+    def _anexar_erros(self, erros, numero_chunk):
+        erros = erros.assign(chunk=numero_chunk)
+        erros.to_csv(self.destino_erros, mode='a', index=False,
+                     header=not os.path.exists(self.destino_erros))
+
+    def validar_chunk(self, registros, numero_chunk):
+        df = pd.json_normalize(registros)
+        self.totais['lidos'] += len(df)
+        if "type" in df.columns:
+            df = df[df["type"].isin(tipos_permitidos)]
+        self.totais['filtrados'] += len(df)
+        if df.empty:
+            return
+
+        colunas = [c for c in self.schema.columns if c in df.columns]
+        invalidos = pd.Series(False, index=df.index)
+
+        try:
+            self.schema.validate(df[colunas], lazy=True)
+        except SchemaErrors as e:
+            erros = e.failure_cases[['column', 'check', 'failure_case', 'index']]
+            self._anexar_erros(erros, numero_chunk)
+            self.totais['erros'] += len(erros)
+
+            if erros['index'].isna().any():
+                # falha de coluna (ex.: coluna ausente) invalida o chunk inteiro
+                invalidos[:] = True
+            else:
+                invalidos[invalidos.index.isin(erros['index'])] = True
+
+        self._anexar_ndjson(df[~invalidos], self.destino_validos)
+        self._anexar_ndjson(df[invalidos], self.destino_invalidos)
+        self.totais['validos'] += int((~invalidos).sum())
+        self.totais['invalidos'] += int(invalidos.sum())
+
+    def validar(self, registros, tamanho_chunk=10000):
+        for numero, lote in enumerate(em_chunks(registros, tamanho_chunk), start=1):
+            self.validar_chunk(lote, numero)
+        return self.totais
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Valida eventos do GitHub em chunks com pandera')
+    parser.add_argument('origem', nargs='?', default=url, help='URL da API, arquivo .ndjson ou .json com lista '
+                             '(arquivos são lidos em streaming)')
+    parser.add_argument('--tamanho-chunk', type=int, default=10000)
+    parser.add_argument('--validos', default='eventos_validos.ndjson')
+    parser.add_argument('--invalidos', default='eventos_invalidos.ndjson')
+    parser.add_argument('--erros', default='erros_validacao.csv')
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+    cache = cache_dos_argumentos(args)
+
+    try:
+        validador = ValidadorEventos(schema, args.validos, args.invalidos, args.erros)
+        totais = validador.validar(ler_registros(args.origem, cache), args.tamanho_chunk)
+
+        if totais['invalidos'] == 0:
             print('Dados válidos!')
-        except Exception as e:
+        else:
             print('Dados inválidos!')
-            print(f'Erro na validação: {e}')
+            print(f"{totais['erros']} falhas registradas em {args.erros}")
+        print(f"Lidos: {totais['lidos']} | Tipos permitidos: {totais['filtrados']} | "
+              f"Válidos: {totais['validos']} | Inválidos: {totais['invalidos']}")
+
+    except Exception as e:
+        print(f'Erro na requisição: {e}')
+    finally:
+        if cache is not None:
+            print(cache.resumo())
+            cache.fechar()
+
 
-except Exception as e:
-    print(f'Erro na requisição: {e}')
+if __name__ == '__main__':
+    main()
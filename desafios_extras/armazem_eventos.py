@@ -0,0 +1,411 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
+
+# colunas tipadas de cada segmento; tipo, repo e usuário são códigos dos dicionários
+COLUNAS = {
+    'id': np.int64,
+    'created_at': np.int64,
+    'tipo': np.int16,
+    'repo': np.int32,
+    'usuario': np.int32,
+}
+DICIONARIOS = ('tipo', 'repo', 'usuario')
+GRANULARIDADES = {'hora': 3600, 'dia': 86400}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS dicionarios (
+    coluna TEXT NOT NULL,
+    codigo INTEGER NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (coluna, codigo),
+    UNIQUE (coluna, valor)
+);
+CREATE TABLE IF NOT EXISTS segmentos (
+    nome TEXT PRIMARY KEY,
+    linhas INTEGER NOT NULL,
+    inicio INTEGER NOT NULL,
+    fim INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ultimo_evento (
+    usuario INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contagens (
+    granularidade TEXT NOT NULL,
+    balde INTEGER NOT NULL,
+    usuario INTEGER NOT NULL,
+    tipo INTEGER NOT NULL,
+    eventos INTEGER NOT NULL,
+    PRIMARY KEY (granularidade, balde, usuario, tipo)
+);
+CREATE INDEX IF NOT EXISTS segmentos_tempo ON segmentos (inicio, fim);
+"""
+
+
+def _campo(evento, caminho):
+    """Lê 'repo.name' tanto do payload aninhado da API quanto de um registro achatado"""
+    if caminho in evento:
+        return evento[caminho]
+    valor = evento
+    for parte in caminho.split('.'):
+        if not isinstance(valor, dict):
+            return None
+        valor = valor.get(parte)
+    return valor
+
+
+def _texto(valor):
+    # NaN de registros vindos do pandas conta como ausente
+    return valor if isinstance(valor, str) and valor else None
+
+
+def epoch(datas):
+    """Datas ISO 8601 da API ('2024-01-01T12:00:00Z') para segundos desde a época, em lote"""
+    return np.array([d.rstrip('Z') for d in datas], dtype='datetime64[s]').astype(np.int64)
+
+
+def ler_eventos(caminho):
+    """Eventos de um NDJSON, de um JSON com lista ou de um DataFrame salvo com to_json()"""
+    with open(caminho, encoding='utf-8') as arquivo:
+        if caminho.endswith('.ndjson'):
+            return [json.loads(linha) for linha in arquivo if linha.strip()]
+        dados = json.load(arquivo)
+    if isinstance(dados, list):
+        return dados
+    if dados and all(isinstance(v, dict) for v in dados.values()):
+        # orient='columns' do pandas: {coluna: {linha: valor}}
+        linhas = {}
+        for coluna, valores in dados.items():
+            for linha, valor in valores.items():
+                linhas.setdefault(linha, {})[coluna] = valor
+        return [linhas[k] for k in sorted(linhas, key=int)]
+    return [dados] if dados else []
+
+
+class ArmazemEventos:
+    """Armazém colunar de eventos do GitHub em segmentos .npy mapeáveis em memória.
+
+    Cada ingestão grava um ou mais segmentos ordenados por created_at, e o
+    catálogo SQLite guarda o menor e o maior instante de cada um: consultas
+    por período só abrem os segmentos que se sobrepõem ao intervalo e, dentro
+    deles, recortam as linhas por busca binária. type, repo.name e o login do
+    autor viram códigos inteiros (dicionários no catálogo), e as contagens por
+    usuário e tipo, por hora e por dia, são somadas na própria ingestão.
+    """
+
+    def __init__(self, diretorio, tamanho_segmento=100_000):
+        self.diretorio = diretorio
+        self.tamanho_segmento = tamanho_segmento
+        os.makedirs(os.path.join(diretorio, 'segmentos'), exist_ok=True)
+        # coletores em threads chamam ingerir() um de cada vez, sob a própria trava
+        self._conexao = sqlite3.connect(os.path.join(diretorio, 'catalogo.sqlite'), check_same_thread=False)
+        with self._conexao:
+            self._conexao.executescript(ESQUEMA)
+
+        self._codigos = {coluna: {} for coluna in DICIONARIOS}
+        self._valores = {coluna: [] for coluna in DICIONARIOS}
+        for coluna, codigo, valor in self._conexao.execute(
+                'SELECT coluna, codigo, valor FROM dicionarios ORDER BY coluna, codigo'):
+            valor = sys.intern(valor)
+            self._codigos[coluna][valor] = codigo
+            self._valores[coluna].append(valor)
+
+    # dicionários -------------------------------------------------------------
+
+    def _codificar(self, coluna, valores, novos):
+        codigos = self._codigos[coluna]
+        resultado = np.empty(len(valores), dtype=COLUNAS[coluna])
+        for i, valor in enumerate(valores):
+            if valor is None:
+                resultado[i] = -1
+                continue
+            codigo = codigos.get(valor)
+            if codigo is None:
+                valor = sys.intern(valor)
+                codigo = codigos[valor] = len(self._valores[coluna])
+                self._valores[coluna].append(valor)
+                novos.append((coluna, codigo, valor))
+            resultado[i] = codigo
+        return resultado
+
+    def codigo(self, coluna, valor):
+        """Código de `valor` no dicionário de `coluna`, ou None se nunca foi visto"""
+        return self._codigos[coluna].get(valor)
+
+    def decodificar(self, coluna, codigos):
+        valores = self._valores[coluna]
+        return [valores[c] if c >= 0 else None for c in codigos]
+
+    # segmentos ---------------------------------------------------------------
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, 'segmentos', nome)
+
+    def _gravar_segmentos(self, colunas):
+        """Grava colunas já ordenadas por created_at; devolve (nome, linhas, início, fim) de cada segmento"""
+        gravados = []
+        total = len(colunas['created_at'])
+        for inicio in range(0, total, self.tamanho_segmento):
+            fatia = slice(inicio, inicio + self.tamanho_segmento)
+            nome = f'{int(time.time() * 1000):014d}-{uuid.uuid4().hex[:8]}'
+            temporario = self._caminho(f'.{nome}.tmp')
+            os.makedirs(temporario)
+            for coluna, dtype in COLUNAS.items():
+                np.save(os.path.join(temporario, f'{coluna}.npy'),
+                        np.ascontiguousarray(colunas[coluna][fatia], dtype=dtype))
+            os.replace(temporario, self._caminho(nome))
+            tempos = colunas['created_at'][fatia]
+            gravados.append((nome, len(tempos), int(tempos[0]), int(tempos[-1])))
+        return gravados
+
+    def _abrir(self, nome):
+        return {coluna: np.load(os.path.join(self._caminho(nome), f'{coluna}.npy'), mmap_mode='r')
+                for coluna in COLUNAS}
+
+    def segmentos(self, inicio=None, fim=None):
+        """Segmentos cujo intervalo [menor, maior] cruza [inicio, fim); os demais nem são abertos"""
+        consulta = 'SELECT nome FROM segmentos WHERE fim >= ? AND inicio < ? ORDER BY inicio'
+        limites = (inicio if inicio is not None else -2 ** 63, fim if fim is not None else 2 ** 63 - 1)
+        for (nome,) in self._conexao.execute(consulta, limites).fetchall():
+            yield nome, self._abrir(nome)
+
+    # ingestão ----------------------------------------------------------------
+
+    def ingerir(self, eventos, usuario=None):
+        """Acrescenta eventos ainda não vistos (id maior que o último do autor); devolve quantos"""
+        ultimos = dict(self._conexao.execute('SELECT usuario, id FROM ultimo_evento'))
+        vistos = set()
+        selecionados = []
+        for evento in eventos:
+            identificador, criado = evento.get('id'), _texto(evento.get('created_at'))
+            if identificador is None or criado is None:
+                continue
+            identificador = int(identificador)
+            autor = _texto(_campo(evento, 'actor.login')) or usuario
+            codigo_autor = self._codigos['usuario'].get(autor, -1)
+            if identificador in vistos or identificador <= ultimos.get(codigo_autor, -1):
+                continue
+            vistos.add(identificador)
+            selecionados.append((identificador, criado, _texto(evento.get('type')),
+                                 _texto(_campo(evento, 'repo.name')), autor))
+        if not selecionados:
+            return 0
+
+        ids, criados, tipos, repos, autores = zip(*selecionados)
+        novos_valores = []
+        colunas = {
+            'id': np.array(ids, dtype=np.int64),
+            'created_at': epoch(criados),
+            'tipo': self._codificar('tipo', tipos, novos_valores),
+            'repo': self._codificar('repo', repos, novos_valores),
+            'usuario': self._codificar('usuario', autores, novos_valores),
+        }
+        ordem = np.argsort(colunas['created_at'], kind='stable')
+        colunas = {coluna: valores[ordem] for coluna, valores in colunas.items()}
+
+        gravados = self._gravar_segmentos(colunas)
+        try:
+            with self._conexao:
+                self._conexao.executemany('INSERT INTO dicionarios VALUES (?, ?, ?)', novos_valores)
+                self._conexao.executemany('INSERT INTO segmentos VALUES (?, ?, ?, ?)', gravados)
+                self._somar_contagens(colunas)
+                maiores = {}
+                for autor, identificador in zip(colunas['usuario'].tolist(), colunas['id'].tolist()):
+                    maiores[autor] = max(identificador, maiores.get(autor, identificador))
+                self._conexao.executemany(
+                    'INSERT INTO ultimo_evento VALUES (?, ?) ON CONFLICT (usuario) '
+                    'DO UPDATE SET id = MAX(id, excluded.id)', maiores.items())
+        except sqlite3.Error:
+            # o catálogo é a fonte da verdade: segmentos fora dele são descartados
+            for nome, *_ in gravados:
+                shutil.rmtree(self._caminho(nome), ignore_errors=True)
+            for coluna, codigo, valor in novos_valores:
+                del self._codigos[coluna][valor]
+                self._valores[coluna].pop()
+            raise
+        return len(selecionados)
+
+    def _somar_contagens(self, colunas):
+        for granularidade, segundos in GRANULARIDADES.items():
+            chaves = np.stack([colunas['created_at'] // segundos * segundos,
+                               colunas['usuario'].astype(np.int64), colunas['tipo'].astype(np.int64)])
+            unicas, quantidades = np.unique(chaves, axis=1, return_counts=True)
+            self._conexao.executemany(
+                'INSERT INTO contagens VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (granularidade, balde, usuario, tipo) '
+                'DO UPDATE SET eventos = eventos + excluded.eventos',
+                [(granularidade, *map(int, chave), int(n)) for chave, n in zip(unicas.T, quantidades)])
+
+    def compactar(self):
+        """Regrava tudo em segmentos cheios e sem sobreposição de tempo; devolve quantos restaram"""
+        antigos = [nome for (nome,) in self._conexao.execute('SELECT nome FROM segmentos')]
+        if len(antigos) < 2:
+            return len(antigos)
+        partes = [self._abrir(nome) for nome in antigos]
+        colunas = {coluna: np.concatenate([p[coluna] for p in partes]) for coluna in COLUNAS}
+        ordem = np.argsort(colunas['created_at'], kind='stable')
+        gravados = self._gravar_segmentos({c: v[ordem] for c, v in colunas.items()})
+        del partes, colunas
+
+        with self._conexao:
+            self._conexao.execute('DELETE FROM segmentos')
+            self._conexao.executemany('INSERT INTO segmentos VALUES (?, ?, ?, ?)', gravados)
+        for nome in antigos:
+            shutil.rmtree(self._caminho(nome), ignore_errors=True)
+        return len(gravados)
+
+    # consultas ---------------------------------------------------------------
+
+    def filtrar(self, inicio=None, fim=None, tipo=None, usuario=None, repo=None):
+        """Colunas (códigos) dos eventos em [inicio, fim) que atendem aos filtros"""
+        filtros = {}
+        for coluna, valor in (('tipo', tipo), ('usuario', usuario), ('repo', repo)):
+            if valor is not None:
+                codigo = self.codigo(coluna, valor)
+                if codigo is None:
+                    return {c: np.empty(0, dtype=d) for c, d in COLUNAS.items()}
+                filtros[coluna] = codigo
+
+        partes = []
+        for _, segmento in self.segmentos(inicio, fim):
+            tempos = segmento['created_at']
+            # segmentos são ordenados por created_at: o período vira um recorte contíguo
+            de = np.searchsorted(tempos, inicio, 'left') if inicio is not None else 0
+            ate = np.searchsorted(tempos, fim, 'left') if fim is not None else len(tempos)
+            mascara = np.ones(ate - de, dtype=bool)
+            for coluna, codigo in filtros.items():
+                mascara &= segmento[coluna][de:ate] == codigo
+            partes.append({c: np.asarray(segmento[c][de:ate][mascara]) for c in COLUNAS})
+
+        if not partes:
+            return {c: np.empty(0, dtype=d) for c, d in COLUNAS.items()}
+        return {c: np.concatenate([p[c] for p in partes]) for c in COLUNAS}
+
+    def contar_por(self, coluna, inicio=None, fim=None, **filtros):
+        """Ex.: contar_por('repo', tipo='PushEvent', inicio=...) -> Counter {repo: eventos}"""
+        codigos = self.filtrar(inicio, fim, **filtros)[coluna]
+        codigos = codigos[codigos >= 0]
+        if not len(codigos):
+            return Counter()
+        contagem = np.bincount(codigos)
+        presentes = np.nonzero(contagem)[0]
+        return Counter(dict(zip(self.decodificar(coluna, presentes), contagem[presentes].tolist())))
+
+    def contagens(self, granularidade='dia', inicio=None, fim=None, usuario=None, tipo=None):
+        """Contagens pré-agregadas na ingestão: [(balde, usuário, tipo, eventos)]"""
+        condicoes, parametros = ['granularidade = ?'], [granularidade]
+        if inicio is not None:
+            condicoes.append('balde >= ?')
+            parametros.append(inicio // GRANULARIDADES[granularidade] * GRANULARIDADES[granularidade])
+        if fim is not None:
+            condicoes.append('balde < ?')
+            parametros.append(fim)
+        for coluna, valor in (('usuario', usuario), ('tipo', tipo)):
+            if valor is not None:
+                condicoes.append(f'{coluna} = ?')
+                parametros.append(self.codigo(coluna, valor) if self.codigo(coluna, valor) is not None else -2)
+        linhas = self._conexao.execute(
+            f'SELECT balde, usuario, tipo, eventos FROM contagens WHERE {" AND ".join(condicoes)} '
+            f'ORDER BY balde, usuario, tipo', parametros).fetchall()
+        return [(balde, self._valores['usuario'][u] if u >= 0 else None,
+                 self._valores['tipo'][t] if t >= 0 else None, eventos)
+                for balde, u, t, eventos in linhas]
+
+    def para_dataframe(self, colunas):
+        """Resultado de `filtrar` como DataFrame, com categorias em vez de repetir strings"""
+        import pandas as pd
+
+        dados = {
+            'id': colunas['id'],
+            'created_at': pd.to_datetime(colunas['created_at'], unit='s', utc=True),
+        }
+        for coluna in DICIONARIOS:
+            dados[coluna] = pd.Categorical.from_codes(colunas[coluna].astype(np.int64),
+                                                      categories=self._valores[coluna])
+        return pd.DataFrame(dados)
+
+    def resumo(self):
+        segmentos, linhas = self._conexao.execute(
+            'SELECT COUNT(*), COALESCE(SUM(linhas), 0) FROM segmentos').fetchone()
+        return (f'{linhas} eventos em {segmentos} segmentos | {len(self._valores["tipo"])} tipos, '
+                f'{len(self._valores["repo"])} repositórios, {len(self._valores["usuario"])} usuários')
+
+    def fechar(self):
+        self._conexao.close()
+
+
+def _instante(texto):
+    return int(datetime.fromisoformat(texto).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _periodo(args):
+    fim = _instante(args.ate) if args.ate else None
+    if args.dias:
+        referencia = fim if fim is not None else int(time.time())
+        return referencia - args.dias * 86400, fim
+    return (_instante(args.desde) if args.desde else None), fim
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Armazém colunar de eventos do GitHub')
+    parser.add_argument('--armazem', default='armazem_eventos', help='diretório do armazém')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    ingerir = comandos.add_parser('ingerir', help='ingere arquivos .ndjson/.json de eventos')
+    ingerir.add_argument('arquivos', nargs='+')
+
+    periodo = argparse.ArgumentParser(add_help=False)
+    periodo.add_argument('--desde', help='data/hora ISO (UTC)')
+    periodo.add_argument('--ate', help='data/hora ISO (UTC), exclusiva')
+    periodo.add_argument('--dias', type=int, help='últimos N dias (até --ate ou agora)')
+    periodo.add_argument('--tipo')
+    periodo.add_argument('--usuario')
+
+    contar = comandos.add_parser('contar', parents=[periodo], help='eventos agrupados por uma coluna')
+    contar.add_argument('--por', choices=DICIONARIOS, default='repo')
+    contar.add_argument('--repo')
+    contar.add_argument('--limite', type=int, default=20)
+
+    contagens = comandos.add_parser('contagens', parents=[periodo], help='contagens por hora ou dia')
+    contagens.add_argument('--granularidade', choices=GRANULARIDADES, default='dia')
+
+    comandos.add_parser('compactar', help='regrava os segmentos sem sobreposição de tempo')
+    comandos.add_parser('resumo')
+    args = parser.parse_args()
+
+    armazem = ArmazemEventos(args.armazem)
+    try:
+        if args.comando == 'ingerir':
+            for caminho in args.arquivos:
+                print(f'{caminho}: {armazem.ingerir(ler_eventos(caminho))} eventos novos')
+        elif args.comando == 'contar':
+            inicio, fim = _periodo(args)
+            contagem = armazem.contar_por(args.por, inicio, fim, tipo=args.tipo,
+                                          usuario=args.usuario, repo=args.repo)
+            for valor, eventos in contagem.most_common(args.limite):
+                print(f'{eventos:>8}  {valor}')
+        elif args.comando == 'contagens':
+            inicio, fim = _periodo(args)
+            for balde, usuario, tipo, eventos in armazem.contagens(args.granularidade, inicio, fim,
+                                                                   args.usuario, args.tipo):
+                momento = datetime.fromtimestamp(balde, timezone.utc).strftime('%Y-%m-%d %H:%M')
+                print(f"{momento}  {usuario or '-':<20} {tipo or '-':<20} {eventos:>6}")
+        elif args.comando == 'compactar':
+            print(f'{armazem.compactar()} segmentos após compactação')
+        print(armazem.resumo())
+    finally:
+        armazem.fechar()
+
+
+if __name__ == '__main__':
+    main()
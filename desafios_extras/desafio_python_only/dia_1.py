@@ -1,26 +1,186 @@
+import argparse
+import os
+import sys
+import time
 
+import numpy as np
 
-def area_circulo(raio):
-    pi = 3.14159
-    area = pi * (raio ** 2)
-    return area
+PI = 3.14159
+TAMANHO_CHUNK = 1_000_000
 
 
-raio = float(input("Digite o raio do círculo: "))
-area = area_circulo(raio)
-print(f"A área do círculo é: {area:.2f}")
+def _resultado(valor):
+    # escalar entra, escalar sai: mantém o uso original com float(input(...))
+    return valor.item() if isinstance(valor, (np.ndarray, np.generic)) and np.ndim(valor) == 0 else valor
 
-def f_para_c(f):
-    c = (f - 32) * 5/9
-    return c
-fahrenheit = float(input("Digite a temperatura em Fahrenheit: "))
-celsius = f_para_c(fahrenheit)
-print(f"A temperatura em Celsius é: {celsius:.2f}")
 
-def numero_par(numero):
-    return numero % 2 == 0
+def _no_lugar(parcial):
+    # para entrada escalar a ufunc devolve um escalar numpy, que não serve de `out`
+    return parcial if isinstance(parcial, np.ndarray) else None
 
-x = int(input("Digite um número: "))
-y = "é" if numero_par(x) else "não é"
-print(f"O número {x} {y} par")
 
+def area_circulo(raio, out=None):
+    """Área de um raio ou de um array de raios (composição de ufuncs, aceita `out`)"""
+    area = np.square(raio, out=out, dtype=np.float64)
+    return _resultado(np.multiply(area, PI, out=_no_lugar(area)))
+
+
+def f_para_c(f, out=None):
+    """Fahrenheit para Celsius, elemento a elemento; com `out` não aloca nada"""
+    c = np.subtract(f, 32, out=out, dtype=np.float64)
+    return _resultado(np.multiply(c, 5 / 9, out=_no_lugar(c)))
+
+
+def numero_par(numero, out=None):
+    """True onde o número é par; aceita inteiros ou arrays de inteiros"""
+    return _resultado(np.equal(np.remainder(numero, 2), 0, out=out))
+
+
+# função, dtype da saída e nome da coluna gerada no CSV
+FUNCOES = {
+    'area_circulo': (area_circulo, np.float64, 'area'),
+    'f_para_c': (f_para_c, np.float64, 'celsius'),
+    'numero_par': (numero_par, np.bool_, 'par'),
+}
+
+
+def converter_binario(entrada, saida, funcao, dtype_entrada=np.float64, tamanho_chunk=TAMANHO_CHUNK):
+    """Aplica `funcao` a um arquivo binário cru, chunk a chunk, entre dois np.memmap.
+
+    A entrada é mapeada só para leitura e cada chunk é escrito direto na fatia
+    correspondente da saída (parâmetro `out`), então a memória usada não cresce
+    com o tamanho do arquivo. Devolve o número de valores convertidos.
+    """
+    calcular, dtype_saida, _ = FUNCOES[funcao]
+    total = os.path.getsize(entrada) // np.dtype(dtype_entrada).itemsize
+    if total == 0:
+        open(saida, 'wb').close()
+        return 0
+
+    origem = np.memmap(entrada, dtype=dtype_entrada, mode='r', shape=(total,))
+    destino = np.memmap(saida, dtype=dtype_saida, mode='w+', shape=(total,))
+    for inicio in range(0, total, tamanho_chunk):
+        fatia = slice(inicio, inicio + tamanho_chunk)
+        calcular(origem[fatia], out=destino[fatia])
+    destino.flush()
+    del origem, destino
+    return total
+
+
+def converter_csv(entrada, saida, funcao, coluna=None, tamanho_chunk=TAMANHO_CHUNK):
+    """Lê o CSV em chunks, acrescenta a coluna calculada às originais e grava cada chunk ao chegar"""
+    import pandas as pd
+
+    calcular, dtype_saida, nome_saida = FUNCOES[funcao]
+    buffer = np.empty(tamanho_chunk, dtype=dtype_saida)
+    total = 0
+    # todas as colunas seguem para a saída (ids, timestamps); só `coluna` entra no cálculo
+    leitor = pd.read_csv(entrada, chunksize=tamanho_chunk)
+    for numero, chunk in enumerate(leitor):
+        valores = chunk[coluna or chunk.columns[0]].to_numpy()
+        # o mesmo buffer serve a todos os chunks; só o último pode ser menor
+        resultado = calcular(valores, out=buffer[:len(valores)])
+        chunk[nome_saida] = resultado
+        chunk.to_csv(saida, mode='w' if numero == 0 else 'a', header=numero == 0, index=False)
+        total += len(chunk)
+    return total
+
+
+# versões originais, um escalar por chamada: a referência do benchmark
+ESCALARES = {
+    'area_circulo': lambda raio: PI * (raio ** 2),
+    'f_para_c': lambda f: (f - 32) * 5 / 9,
+    'numero_par': lambda numero: numero % 2 == 0,
+}
+
+
+def _medir(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def benchmark(quantidade=1_000_000, repeticoes=3, semente=42):
+    """Loop Python com a versão escalar original contra uma chamada sobre o array inteiro"""
+    gerador = np.random.default_rng(semente)
+    entradas = {
+        'area_circulo': gerador.uniform(0, 100, quantidade),
+        'f_para_c': gerador.uniform(-40, 120, quantidade),
+        'numero_par': gerador.integers(0, 1_000_000, quantidade),
+    }
+    resultados = []
+    for nome, valores in entradas.items():
+        calcular, dtype_saida, _ = FUNCOES[nome]
+        escalar = ESCALARES[nome]
+        escalares = valores.tolist()
+        saida = np.empty(quantidade, dtype=dtype_saida)
+
+        laco = _medir(lambda: [escalar(v) for v in escalares], repeticoes)
+        vetor = _medir(lambda: calcular(valores, out=saida), repeticoes)
+        if not np.allclose(np.array([escalar(v) for v in escalares], dtype=dtype_saida), saida):
+            raise AssertionError(f'{nome}: resultado vetorizado difere do escalar')
+        resultados.append((nome, laco, vetor))
+    return resultados
+
+
+def interativo():
+    raio = float(input("Digite o raio do círculo: "))
+    area = area_circulo(raio)
+    print(f"A área do círculo é: {area:.2f}")
+
+    fahrenheit = float(input("Digite a temperatura em Fahrenheit: "))
+    celsius = f_para_c(fahrenheit)
+    print(f"A temperatura em Celsius é: {celsius:.2f}")
+
+    x = int(input("Digite um número: "))
+    y = "é" if numero_par(x) else "não é"
+    print(f"O número {x} {y} par")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interativo()
+        return 0
+
+    parser = argparse.ArgumentParser(description='Funções numéricas do dia 1 sobre arquivos grandes')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    converter = comandos.add_parser('converter', help='aplica uma função a um CSV ou binário em chunks')
+    converter.add_argument('entrada')
+    converter.add_argument('saida')
+    converter.add_argument('--funcao', choices=FUNCOES, default='f_para_c')
+    converter.add_argument('--formato', choices=['csv', 'binario'],
+                           help='padrão: pela extensão (.csv ou binário cru)')
+    converter.add_argument('--coluna', help='coluna do CSV (padrão: a primeira)')
+    converter.add_argument('--dtype', default='float64', help='dtype do binário de entrada')
+    converter.add_argument('--tamanho-chunk', type=int, default=TAMANHO_CHUNK)
+
+    bench = comandos.add_parser('bench', help='loop escalar contra a versão vetorizada')
+    bench.add_argument('--quantidade', type=int, default=1_000_000)
+    bench.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'converter':
+        formato = args.formato or ('csv' if args.entrada.endswith('.csv') else 'binario')
+        inicio = time.perf_counter()
+        if formato == 'csv':
+            total = converter_csv(args.entrada, args.saida, args.funcao, args.coluna, args.tamanho_chunk)
+        else:
+            total = converter_binario(args.entrada, args.saida, args.funcao, np.dtype(args.dtype),
+                                      args.tamanho_chunk)
+        decorrido = time.perf_counter() - inicio
+        print(f"{total} valores convertidos em {decorrido:.2f}s "
+              f"({total / decorrido if decorrido else 0:,.0f} valores/s) -> {args.saida}")
+    else:
+        print(f"{'função':<14} {'loop escalar':>14} {'vetorizado':>12} {'ganho':>9}")
+        for nome, laco, vetor in benchmark(args.quantidade, args.repeticoes):
+            print(f"{nome:<14} {laco:>13.3f}s {vetor:>11.4f}s {laco / vetor:>8.0f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,212 @@
 import os
+import sys
+import argparse
 import requests as r
 import json as js
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
-def main():
-    while True:
-        user = input('Digite o nome do usuário do GitHub: ')
-        url = f'https://api.github.com/users/{user}/events'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from cache_http import adicionar_argumentos, cache_dos_argumentos  # noqa: E402
+from armazem_eventos import ArmazemEventos  # noqa: E402
+
+URL_API = 'https://api.github.com'
+ARQUIVO_ESTADO = 'estado_eventos_github.json'
+
+
+def carregar_estado(caminho):
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            estado = js.load(arquivo)
+    except (OSError, ValueError):
+        estado = {}
+    estado.setdefault('etags', {})
+    estado.setdefault('ultimo_evento', {})
+    return estado
+
+
+def salvar_estado(caminho, estado):
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        js.dump(estado, arquivo, indent=2)
+    os.replace(temporario, caminho)
+
+
+def criar_sessao(workers, token=None):
+    sessao = r.Session()
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    sessao.headers['Accept'] = 'application/vnd.github+json'
+    if token:
+        sessao.headers['Authorization'] = f'Bearer {token}'
+    return sessao
+
+
+class ColetorEventos:
+    """Coleta /users/{user}/events de vários usuários em paralelo numa sessão compartilhada.
+
+    Cada página vai com If-None-Match; um 304 na primeira página significa feed
+    inalterado e nenhum parsing. A paginação segue o cabeçalho Link e para ao
+    alcançar eventos já gravados, que são anexados em NDJSON por usuário. Com
+    `cache`, as ETags ficam no CacheHTTP e páginas ainda frescas nem vão à rede,
+    mas passam pelo mesmo filtro das baixadas; com `armazem`, os eventos novos
+    também vão para o ArmazemEventos colunar.
+    """
+
+    def __init__(self, sessao, estado, diretorio_saida='.', url_api=URL_API, timeout=10, cache=None,
+                 armazem=None):
+        self.sessao = sessao
+        self.estado = estado
+        self.cache = cache
+        self.armazem = armazem
+        self.diretorio_saida = diretorio_saida
+        self.url_api = url_api
+        self.timeout = timeout
+        self._trava_estado = Lock()
+        self.progresso = None
+
+    def _atualizar_progresso(self, bytes_lidos=0, eventos=0):
+        if self.progresso is None:
+            return
+        self.progresso.update(bytes_lidos)
+        if eventos:
+            with self._trava_estado:
+                self.eventos_total += eventos
+                self.progresso.set_postfix(eventos=self.eventos_total)
+
+    def _buscar_pagina(self, url):
+        if self.cache is not None:
+            resposta = self.cache.obter(self.sessao, url, timeout=self.timeout)
+            resposta.raise_for_status()
+            if resposta.origem == 'rede':
+                self._atualizar_progresso(bytes_lidos=len(resposta.conteudo))
+            # página do cache também é processada: o filtro por ultimo_id descarta o que já foi gravado
+            return resposta.dados or [], resposta.links.get('next', {}).get('url'), resposta
+
+        with self._trava_estado:
+            etag = self.estado['etags'].get(url)
+        cabecalhos = {'If-None-Match': etag} if etag else {}
+
+        resposta = self.sessao.get(url, headers=cabecalhos, timeout=self.timeout)
+        if resposta.status_code == 304:
+            return None, None, resposta
 
-        try:
-            print('Buscando eventos...')
-            resposta = r.get(url)
+        resposta.raise_for_status()
+        conteudo = resposta.content
+        self._atualizar_progresso(bytes_lidos=len(conteudo))
 
-            if resposta.status_code == 200 and resposta.json():
-                for _ in tqdm(range(10)):
-                    pass
+        with self._trava_estado:
+            if resposta.headers.get('ETag'):
+                self.estado['etags'][url] = resposta.headers['ETag']
+        proxima = resposta.links.get('next', {}).get('url')
+        return js.loads(conteudo) if conteudo else [], proxima, resposta
 
-                df = pd.DataFrame(resposta.json())
-                df.to_json(f'usuario_{user}_events.json', index=False)
-                print(f'Dados salvos em usuario_{user}_events.json\n')
+    def coletar_usuario(self, user):
+        with self._trava_estado:
+            ultimo_id = int(self.estado['ultimo_evento'].get(user, 0))
+
+        url = f'{self.url_api}/users/{user}/events'
+        novos = []
+        primeira_pagina = True
+
+        while url:
+            eventos, proxima, resposta = self._buscar_pagina(url)
+            if eventos is None:
+                if primeira_pagina:
+                    return user, 0, 'inalterado (304)'
+                break
+            primeira_pagina = False
+
+            # o feed vem do mais novo para o mais antigo; o resto da paginação já foi gravado
+            recentes = [e for e in eventos if int(e['id']) > ultimo_id]
+            novos.extend(recentes)
+            self._atualizar_progresso(eventos=len(recentes))
+            if len(recentes) < len(eventos):
                 break
-            else:
-                print('Usuário não encontrado ou sem eventos públicos. Tente novamente.\n')
+            url = proxima
+
+        if novos:
+            novos.sort(key=lambda e: int(e['id']))
+            caminho = os.path.join(self.diretorio_saida, f'usuario_{user}_events.ndjson')
+            with open(caminho, 'a', encoding='utf-8') as arquivo:
+                for evento in novos:
+                    arquivo.write(js.dumps(evento, ensure_ascii=False) + '\n')
+            with self._trava_estado:
+                self.estado['ultimo_evento'][user] = int(novos[-1]['id'])
+                if self.armazem is not None:
+                    self.armazem.ingerir(novos, user)
+
+        return user, len(novos), f'{len(novos)} eventos novos'
+
+    def coletar(self, usuarios, workers=8):
+        self.eventos_total = 0
+        resultados = {}
+        with tqdm(unit='B', unit_scale=True, desc='Baixando eventos') as self.progresso:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futuros = {executor.submit(self.coletar_usuario, u): u for u in usuarios}
+                for futuro in as_completed(futuros):
+                    user = futuros[futuro]
+                    try:
+                        _, _, situacao = futuro.result()
+                    except Exception as e:
+                        situacao = f'erro: {e}'
+                    resultados[user] = situacao
+        self.progresso = None
+        return resultados
+
+
+def ler_usuarios(args):
+    usuarios = list(args.usuarios)
+    if args.arquivo:
+        with open(args.arquivo, encoding='utf-8') as arquivo:
+            usuarios.extend(linha.strip() for linha in arquivo if linha.strip())
+    if not usuarios:
+        entrada = input('Digite os usuários do GitHub (separados por vírgula): ')
+        usuarios = [u.strip() for u in entrada.split(',') if u.strip()]
+    return list(dict.fromkeys(usuarios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coleta eventos públicos de usuários do GitHub')
+    parser.add_argument('usuarios', nargs='*', help='usuários do GitHub')
+    parser.add_argument('--arquivo', help='arquivo com um usuário por linha')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--saida-dir', default='.')
+    parser.add_argument('--estado', default=ARQUIVO_ESTADO, help='arquivo com ETags e último evento por usuário')
+    parser.add_argument('--armazem', help='diretório do armazém colunar de eventos (armazem_eventos.py)')
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    usuarios = ler_usuarios(args)
+    if not usuarios:
+        print('Nenhum usuário informado.')
+        return
+
+    os.makedirs(args.saida_dir, exist_ok=True)
+    estado = carregar_estado(args.estado)
+    sessao = criar_sessao(args.workers, os.getenv('GITHUB_TOKEN'))
+    cache = cache_dos_argumentos(args)
+    armazem = ArmazemEventos(args.armazem) if args.armazem else None
+
+    try:
+        print('Buscando eventos...')
+        coletor = ColetorEventos(sessao, estado, args.saida_dir, cache=cache, armazem=armazem)
+        resultados = coletor.coletar(usuarios, args.workers)
+        for user, situacao in resultados.items():
+            print(f'{user}: {situacao}')
+    finally:
+        salvar_estado(args.estado, estado)
+        sessao.close()
+        if cache is not None:
+            print(cache.resumo())
+            cache.fechar()
+        if armazem is not None:
+            print(armazem.resumo())
+            armazem.fechar()
 
-        except Exception as e:
-            print(f'Erro ao tentar buscar os dados: {e}\n')
 
 if __name__ == '__main__':
     main()